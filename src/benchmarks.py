@@ -0,0 +1,1181 @@
+import argparse
+import asyncio
+from datetime import datetime
+import importlib
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+import random
+import re
+import resource
+import statistics
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+import requests
+import torch
+from playwright.async_api import async_playwright
+
+from dom_extract import TILE_SELECTOR, extract_listing_tiles, extract_product_page
+import frappe_api
+from fixture_server import FixtureCatalogue, FixtureServer, ReplayServer, StubFrappeServer, ThrottledHost
+from frappe_sink import FrappeSink
+from frappe_bulk import BulkFrappeWriter, ProductIndex
+from frappe_client import AsyncFrappeClient, FrappeClient
+from change_store import ChangeStore, touch_payload
+from product_stream import NDJSONWriter, iter_products
+from product_categoriser import ProductClassifier
+from fuzzy_index import FuzzyIndex
+from taxonomy_mapper import TaxonomyMapper, breadcrumb_path
+from units import extract_unit_info
+from difflib import get_close_matches
+from sentence_transformers import util
+from scraper import PaknSaveScraper, ScraperConfig
+from fixture_scraper import fixture_config, legacy_extract_product_data
+from fixture_models import HashingEncoder, fixture_word_counts, fixture_words
+from metrics import Metrics, MetricsServer
+from page_waits import PageWaiter
+from resource_blocking import DEFAULT_BLOCKED_TYPES
+from rate_limiter import AdaptiveRateLimiter, HostRateLimiter
+from collections import deque
+
+# Configure logging
+logging.basicConfig(level=logging.WARNING)
+
+
+def browser_rss_mb() -> Optional[float]:
+    """Sum the resident memory of this process's descendants (the browser), in MB. Linux only."""
+    if not os.path.isdir('/proc'):
+        return None
+    children = {}
+    for pid in filter(str.isdigit, os.listdir('/proc')):
+        try:
+            with open(f'/proc/{pid}/stat') as f:
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+            children.setdefault(ppid, []).append(int(pid))
+        except (OSError, IndexError, ValueError):
+            continue
+
+    total_kb = 0
+    stack = list(children.get(os.getpid(), []))
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+def summarise(label: str, timings: List[float], peak_rss: Optional[float]):
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    rss = f"{peak_rss:.0f} MB" if peak_rss is not None else "n/a"
+    print(f"{label:<12} n={len(timings):<4} mean={statistics.mean(timings) * 1000:8.1f} ms  "
+          f"p95={p95 * 1000:8.1f} ms  peak browser RSS={rss}")
+
+
+async def legacy_product_details(scraper: PaknSaveScraper, page, product_url: str, sleep: float):
+    """The old strategy: load the page, then load it again in a fresh context and sleep."""
+    await scraper.safe_get(page, product_url)
+    context = await scraper.browser.new_context()
+    try:
+        second_page = await context.new_page()
+        await scraper.safe_get(second_page, product_url)
+        await asyncio.sleep(sleep)
+        raw = await extract_product_page(second_page)
+        scraper.build_category_data(raw['breadcrumbs'], raw['name'])
+    finally:
+        await context.close()
+
+
+async def bench_details(args):
+    """Compare per-product wall time and browser memory of the two detail fetch strategies."""
+    catalogue = FixtureCatalogue(categories=1, pages=1, products_per_page=args.products)
+    with FixtureServer(catalogue, latency=args.latency) as server:
+        scraper = PaknSaveScraper(fixture_config(server))
+
+        async with async_playwright() as p:
+            scraper.browser = await p.chromium.launch(headless=True)
+            urls = [f"{server.base_url}/shop/product/{number}_ea_000pns" for number in catalogue.products]
+
+            for label, fetch in (('legacy', legacy_product_details), ('single-pass', None)):
+                page = await scraper.new_page()
+                timings, peak_rss = [], browser_rss_mb()
+                for url in urls:
+                    started = time.perf_counter()
+                    if fetch:
+                        await fetch(scraper, page, url, args.legacy_sleep)
+                    else:
+                        await scraper.fetch_product_details(page, url)
+                    timings.append(time.perf_counter() - started)
+                    rss = browser_rss_mb()
+                    if rss is not None:
+                        peak_rss = max(peak_rss or 0, rss)
+                await page.close()
+                summarise(label, timings, peak_rss)
+
+            await scraper.browser.close()
+
+
+class RoundTripCounter:
+    """Wraps a Page or ElementHandle and counts every awaited call into the browser."""
+
+    def __init__(self, target, counts: List[int] = None):
+        self.target = target
+        self.counts = counts if counts is not None else [0]
+
+    @property
+    def round_trips(self) -> int:
+        return self.counts[0]
+
+    def wrap(self, value):
+        if isinstance(value, list):
+            return [self.wrap(item) for item in value]
+        if value is not None and hasattr(value, 'query_selector'):
+            return RoundTripCounter(value, self.counts)
+        return value
+
+    def __getattr__(self, name):
+        attr = getattr(self.target, name)
+        if not asyncio.iscoroutinefunction(attr):
+            return attr
+
+        async def counted(*args, **kwargs):
+            self.counts[0] += 1
+            return self.wrap(await attr(*args, **kwargs))
+        return counted
+
+
+async def bench_extraction(args):
+    """Count browser round-trips and time spent extracting a listing page and a product page."""
+    catalogue = FixtureCatalogue(categories=1, pages=1, products_per_page=args.tiles)
+    with FixtureServer(catalogue) as server:
+        scraper = PaknSaveScraper(fixture_config(server))
+        async with async_playwright() as p:
+            scraper.browser = await p.chromium.launch(headless=True)
+            page = await scraper.new_page()
+            slug = next(iter(catalogue.categories))
+            await page.goto(f"{server.base_url}/shop/category/{slug}?pg=1")
+
+            counted = RoundTripCounter(page)
+            started = time.perf_counter()
+            legacy = []
+            for element in await counted.query_selector_all(TILE_SELECTOR):
+                product = await legacy_extract_product_data(element)
+                url_element = await element.query_selector('a[href]')
+                if product and url_element:
+                    await url_element.get_attribute('href')
+                    legacy.append(product)
+            legacy_time = time.perf_counter() - started
+            print(f"listing per-element  tiles={len(legacy):<4} round-trips={counted.round_trips:<5} "
+                  f"time={legacy_time * 1000:8.1f} ms")
+
+            counted = RoundTripCounter(page)
+            started = time.perf_counter()
+            bulk = [scraper.tile_to_product(tile) for tile in await extract_listing_tiles(counted)]
+            bulk_time = time.perf_counter() - started
+            print(f"listing bulk         tiles={len(bulk):<4} round-trips={counted.round_trips:<5} "
+                  f"time={bulk_time * 1000:8.1f} ms")
+
+            await page.goto(f"{server.base_url}/shop/product/{next(iter(catalogue.products))}_ea_000pns")
+            counted = RoundTripCounter(page)
+            started = time.perf_counter()
+            await extract_product_page(counted)
+            print(f"product page bulk    fields=all  round-trips={counted.round_trips:<5} "
+                  f"time={(time.perf_counter() - started) * 1000:8.1f} ms")
+
+            await scraper.browser.close()
+
+
+def fake_frappe_products(count: int) -> List[Dict]:
+    return [{'product_id': f"pk{number}", 'productname': f"Product {number}", 'current_price': 1.0}
+            for number in range(count)]
+
+
+async def bench_sink(args):
+    """Scrape-side throughput with inline Frappe writes vs the queued sink, against a slow stub Frappe."""
+    logging.getLogger().setLevel(logging.ERROR)
+    with StubFrappeServer(latency=args.frappe_latency) as frappe:
+        frappe_api.FRAPPE_URL = frappe.resource_url
+
+        async def scrape_inline(products):
+            for product in products:
+                await asyncio.sleep(args.scrape_time)
+                frappe_api.test_write_to_frappe(product)
+
+        async def scrape_pipelined(products):
+            sink = FrappeSink(workers=args.workers, queue_size=args.queue_size)
+            for product in products:
+                await asyncio.sleep(args.scrape_time)
+                await sink.put(product)
+            scraped_at = time.perf_counter()
+            await sink.close()
+            return scraped_at
+
+        for label, scrape in (('inline', scrape_inline), ('pipelined', scrape_pipelined)):
+            products = fake_frappe_products(args.products)
+            started = time.perf_counter()
+            scraped_at = await scrape(products)
+            finished = time.perf_counter()
+            scrape_elapsed = (scraped_at or finished) - started
+            print(f"{label:<10} scrape throughput={args.products / scrape_elapsed:7.1f} products/s  "
+                  f"end-to-end={finished - started:6.2f} s")
+
+
+async def bench_bulk(args):
+    """Count Frappe requests for a create run and an update run, per-product vs bulk upsert."""
+    logging.getLogger().setLevel(logging.ERROR)
+    for label in ('per-product', 'bulk'):
+        with StubFrappeServer(latency=args.frappe_latency) as frappe:
+            frappe_api.FRAPPE_URL = frappe.resource_url
+            started = time.perf_counter()
+            for _ in range(2):
+                if label == 'bulk':
+                    writer = BulkFrappeWriter(ProductIndex())
+                    writer.prefetch()
+                    sink = FrappeSink(workers=1, batch_writer=writer.write_batch, batch_size=args.batch_size)
+                else:
+                    sink = FrappeSink(workers=args.workers)
+                for product in fake_frappe_products(args.products):
+                    await sink.put(product)
+                await sink.close()
+            elapsed = time.perf_counter() - started
+            requests_made = sum(frappe.hits.values())
+            print(f"{label:<12} products={args.products} x2 runs  requests={requests_made:<6} "
+                  f"time={elapsed:6.2f} s  {dict(frappe.hits)}")
+
+
+async def bench_http(args):
+    """Requests/sec for bare requests calls vs the pooled sync and async Frappe clients."""
+    logging.getLogger().setLevel(logging.ERROR)
+    with StubFrappeServer() as frappe:
+        url = f"{frappe.resource_url}?product_id=pk1"
+        client = FrappeClient(pool_size=args.concurrency)
+
+        for label, get in (('bare requests', lambda: requests.get(url)), ('FrappeClient', lambda: client.get(url))):
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+                for response in executor.map(lambda _: get(), range(args.requests)):
+                    response.raise_for_status()
+            print(f"{label:<18} {args.requests / (time.perf_counter() - started):8.1f} requests/s")
+        client.close()
+
+        async_client = AsyncFrappeClient(pool_size=args.concurrency)
+        slots = asyncio.Semaphore(args.concurrency)
+
+        async def fetch():
+            async with slots:
+                await async_client.request('GET', url)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(fetch() for _ in range(args.requests)))
+        print(f"{'AsyncFrappeClient':<18} {args.requests / (time.perf_counter() - started):8.1f} requests/s")
+        await async_client.close()
+
+
+async def bench_changes(args):
+    """Frappe requests for a second day's run when most of the catalogue is unchanged.
+
+    Writes go one product at a time (GET, then PUT or POST) like the scraper's default sink,
+    or in batches with --bulk.
+    """
+    logging.getLogger().setLevel(logging.ERROR)
+    for label in ('write all', 'skip unchanged'):
+        with StubFrappeServer() as frappe, tempfile.TemporaryDirectory() as tmp:
+            frappe_api.FRAPPE_URL = frappe.resource_url
+            store = ChangeStore(os.path.join(tmp, 'hashes.sqlite')) if label == 'skip unchanged' else None
+            for day in range(2):
+                on_written = store.record if store else None
+                if args.bulk:
+                    writer = BulkFrappeWriter(ProductIndex())
+                    writer.prefetch()
+                    sink = FrappeSink(workers=1, batch_writer=writer.write_batch, batch_size=args.batch_size,
+                                      on_written=on_written)
+                else:
+                    sink = FrappeSink(workers=args.workers, on_written=on_written)
+                for product in fake_frappe_products(args.products):
+                    product['last_checked'] = product['last_updated'] = f"day-{day}"
+                    if day and product['product_id'].endswith('7'):
+                        product['current_price'] += 1  # roughly 10% of products change price
+                    if store and store.is_unchanged(product):
+                        if args.touch:
+                            await sink.put(touch_payload(product))
+                        continue
+                    await sink.put(product)
+                await sink.close()
+                if day == 0:
+                    day_one = dict(frappe.hits)
+            day_two = {kind: count - day_one.get(kind, 0) for kind, count in frappe.hits.items()}
+            print(f"{label:<15} day-two requests={sum(day_two.values()):<5} {day_two}")
+            if store:
+                print(f"{'':<15} {store.changed - args.products} changed, {store.unchanged} unchanged on day two")
+                store.close()
+
+
+def scraped_products(count: int):
+    """Yield listing-shaped product dicts like the scraper produces."""
+    for number in range(count):
+        yield {
+            'productId': str(5000000 + number),
+            'name': f"Fixture Product {number}",
+            'subtitle': '500g',
+            'price': {'dollars': '4', 'cents': '99'},
+            'description': 'A product description of a realistic length. ' * 6,
+            'ingredients': 'Water, sugar, salt, flavour. ' * 4,
+            'nutritionalInfo': {'Energy': '1000kJ', 'Protein': '5g', 'Fat': '2g', 'Sugars': '10g'},
+            'categories': ['Fresh Foods', 'Fresh Foods > Bakery'],
+        }
+
+
+async def bench_stream(args):
+    """Peak Python heap writing and reading products: one JSON document vs streamed NDJSON."""
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'products.json')
+        ndjson_path = os.path.join(tmp, 'products.ndjson')
+
+        def whole_document():
+            products = list(scraped_products(args.products))
+            with open(json_path, 'w') as f:
+                json.dump(products, f, indent=4)
+            with open(json_path, 'r') as f:
+                return sum(1 for _ in json.load(f))
+
+        def streamed():
+            with NDJSONWriter(ndjson_path, append=False) as writer:
+                for product in scraped_products(args.products):
+                    writer.write(product)
+            return sum(1 for _ in iter_products(ndjson_path))
+
+        for label, run in (('json document', whole_document), ('ndjson stream', streamed)):
+            tracemalloc.start()
+            started = time.perf_counter()
+            count = run()
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{label:<15} products={count:<7} time={elapsed:.2f}s peak heap={peak / 2**20:.1f}MB")
+
+
+def legacy_semantic_match(classifier: ProductClassifier, word_embedding):
+    """The old per-keyword cos_sim loop, kept to check the vectorised match against."""
+    best_score = 0
+    best_match = None
+    for keyword, keyword_embedding in classifier.keyword_embeddings.items():
+        similarity = util.cos_sim(word_embedding, keyword_embedding).item()
+        if similarity > best_score:
+            best_score = similarity
+            best_match = keyword
+    return best_match, best_score
+
+
+async def bench_semantic(args):
+    """Per-product time of semantic matching: per-keyword loop vs one matrix-vector product."""
+    classifier = ProductClassifier(model=HashingEncoder(), cache_dir=None)
+    words = fixture_words(args.words)
+    names = [f"Fixture {words[i % len(words)]} {words[(i * 7 + 3) % len(words)]}" for i in range(args.products)]
+    product_words = [classifier.get_all_words(name) for name in names]
+    embeddings = {word: classifier.model.encode(word, convert_to_tensor=True)
+                  for word in {word for row in product_words for word in row}}
+
+    timings = {}
+    results = {}
+    for label, match in (('per-keyword', lambda e: legacy_semantic_match(classifier, e)),
+                         ('vectorised', lambda e: classifier.semantic_match(e)[0])):
+        started = time.perf_counter()
+        results[label] = [[match(embeddings[word]) for word in row] for row in product_words]
+        timings[label] = time.perf_counter() - started
+
+    mismatches = sum(
+        old[0] != new[0] or round(old[1], 3) != round(new[1], 3)
+        for old_row, new_row in zip(results['per-keyword'], results['vectorised'])
+        for old, new in zip(old_row, new_row)
+        if old[0] is not None
+    )
+    print(f"{len(classifier.keywords)} keywords, {len(names)} products")
+    for label, elapsed in timings.items():
+        print(f"{label:<12} {elapsed / len(names) * 1000:.3f}ms/product")
+    print(f"speedup {timings['per-keyword'] / timings['vectorised']:.1f}x, mismatched matches: {mismatches}")
+
+
+async def bench_encoding(args):
+    """Encoder calls and time for startup plus classification: one encode per string vs batched."""
+    words = fixture_words(args.words)
+    names = [f"Fixture {words[i % len(words)]} {words[(i * 7 + 3) % len(words)]}" for i in range(args.products)]
+
+    encoder = HashingEncoder()
+    started = time.perf_counter()
+    classifier = ProductClassifier(model=encoder, batch_size=args.batch_size, cache_dir=None)
+    batched_startup = time.perf_counter() - started
+    startup_calls = encoder.calls
+    started = time.perf_counter()
+    classifier.prepare_words(word for name in names for word in classifier.get_all_words(name))
+    batched_words = time.perf_counter() - started
+    batched_calls = encoder.calls
+
+    legacy = HashingEncoder()
+    started = time.perf_counter()
+    for keyword in classifier.keywords:
+        legacy.encode(keyword, convert_to_tensor=True)
+    legacy_startup = time.perf_counter() - started
+    started = time.perf_counter()
+    for name in names:
+        for word in classifier.get_all_words(name):
+            if word not in classifier.keyword_to_category:
+                legacy.encode(word, convert_to_tensor=True)
+    legacy_words = time.perf_counter() - started
+
+    print(f"{len(classifier.keywords)} keywords, {len(names)} products, {len(classifier.semantic_matches)} distinct words")
+    print(f"{'per string':<11} startup={legacy_startup:.2f}s words={legacy_words:.2f}s encode calls={legacy.calls}")
+    print(f"{'batched':<11} startup={batched_startup:.2f}s words={batched_words:.2f}s "
+          f"encode calls={batched_calls} ({startup_calls} at startup)")
+
+
+async def bench_cache(args):
+    """ProductClassifier startup with a cold, then a warm, on-disk embedding cache."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label in ('cold', 'warm', 'warm'):
+            encoder = HashingEncoder()
+            started = time.perf_counter()
+            ProductClassifier(model_name='hashing-stub', model=encoder, cache_dir=cache_dir)
+            elapsed = time.perf_counter() - started
+            print(f"{label:<5} startup={elapsed * 1000:.1f}ms encode calls={encoder.calls}")
+
+
+def typo_words(keywords: List[str]) -> List[str]:
+    """Misspelt keywords (a dropped, a doubled and a swapped letter) as a fixture of near misses."""
+    words = []
+    for number, keyword in enumerate(keywords):
+        cut = number % max(1, len(keyword) - 1)
+        words.append(keyword[:cut] + keyword[cut + 1:])
+        words.append(keyword[:cut] + keyword[cut] + keyword[cut:])
+        words.append(keyword[:cut] + keyword[cut + 1:cut + 2] + keyword[cut:cut + 1] + keyword[cut + 2:])
+    return words
+
+
+async def bench_fuzzy(args):
+    """get_close_matches over every keyword vs the prebuilt FuzzyIndex, checking they agree."""
+    classifier = ProductClassifier(model=HashingEncoder(), cache_dir=None)
+    keywords = classifier.keywords
+    started = time.perf_counter()
+    index = FuzzyIndex(keywords)
+    build = time.perf_counter() - started
+
+    for label, words in (('unmatched words', fixture_words(args.words)), ('keyword typos', typo_words(keywords))):
+        timings = {}
+        results = {}
+        for method, close_matches in (('difflib', lambda word: get_close_matches(word, list(keywords), n=1, cutoff=0.8)),
+                                      ('index', lambda word: index.close_matches(word, n=1, cutoff=0.8))):
+            started = time.perf_counter()
+            results[method] = [close_matches(word) for word in words]
+            timings[method] = time.perf_counter() - started
+        mismatches = sum(old != new for old, new in zip(results['difflib'], results['index']))
+        print(f"{label} ({len(words)} words, {sum(map(bool, results['index']))} matched):")
+        for method, elapsed in timings.items():
+            print(f"  {method:<8} {elapsed / len(words) * 1e6:.0f}us/word")
+        print(f"  speedup {timings['difflib'] / timings['index']:.1f}x, mismatches: {mismatches}")
+
+    # Other n and cutoff values go through the same bounds, so check those agree too
+    words = fixture_words(args.words) + typo_words(keywords)[::7]
+    mismatches = sum(
+        get_close_matches(word, keywords, n=n, cutoff=cutoff) != index.close_matches(word, n=n, cutoff=cutoff)
+        for word in words for n in (1, 3) for cutoff in (0.0, 0.6, 0.8, 1.0)
+    )
+    print(f"index built in {build * 1000:.1f}ms; n/cutoff sweep mismatches: {mismatches}")
+
+
+async def bench_memo(args):
+    """Per-product classification time with and without the word memo, on repetitive product names."""
+    # Repeat each word as often as it was seen unmatched, like a real catalogue does
+    counts = fixture_word_counts(args.words)
+    names = [f"Fixture {word}" for word, count in counts for _ in range(count * args.repeat)]
+    print(f"{len(names)} products, {len(counts)} distinct words")
+    for label, memo_size in (('no memo', 0), ('memo', 100000)):
+        classifier = ProductClassifier(model=HashingEncoder(), cache_dir=None, memo_size=memo_size)
+        started = time.perf_counter()
+        for name in names:
+            classifier.classify_product({'name': name})
+        elapsed = time.perf_counter() - started
+        print(f"{label:<8} {elapsed / len(names) * 1e6:.0f}us/product  {classifier.memo.summary()}")
+
+
+async def bench_parallel(args):
+    """classify_products throughput in one process vs a process pool, checking the output matches."""
+    workers = args.workers or os.cpu_count() or 1
+    words = fixture_words(args.words)
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'products.ndjson')
+        with NDJSONWriter(input_path, append=False) as writer:
+            for number in range(args.products):
+                writer.write({'productId': str(number),
+                              'name': f"Fixture {words[number % len(words)]} {words[(number * 7 + 3) % len(words)]}"})
+
+        outputs = {}
+        for label, count in (('1 process', 1), (f"{workers} workers", workers)):
+            classifier = ProductClassifier(model_name='hashing-stub', model=HashingEncoder(),
+                                           cache_dir=os.path.join(tmp, 'cache'), memo_size=args.memo_size)
+            outputs[label] = os.path.join(tmp, f"classified-{count}.ndjson")
+            started = time.perf_counter()
+            classifier.classify_products(input_path, outputs[label], workers=count, chunk_size=args.chunk_size)
+            elapsed = time.perf_counter() - started
+            print(f"{label:<11} {args.products / elapsed:.0f} products/s")
+
+        first, second = (list(iter_products(path)) for path in outputs.values())
+        print(f"cpus={os.cpu_count()} outputs identical: {first == second}")
+
+
+async def bench_taxonomy(args):
+    """Breadcrumb -> Google taxonomy mapping: embed and score per product vs per distinct path."""
+    catalogue = FixtureCatalogue(categories=args.categories, pages=args.pages, products_per_page=args.per_page)
+    products = [{'category_data': {'breadcrumbs': product['breadcrumbs']}} for product in catalogue.products.values()]
+
+    encoder = HashingEncoder()
+    mapper = TaxonomyMapper(model_name='hashing-stub', model=encoder, cache_dir=None)
+    setup_calls = encoder.calls
+
+    started = time.perf_counter()
+    naive = []
+    for product in products:
+        query = util.normalize_embeddings(torch.atleast_2d(encoder.encode(breadcrumb_path(product), convert_to_tensor=True)))
+        scores, rows = torch.topk(query @ mapper.matrix.T, mapper.top_k, dim=1)
+        naive.append([mapper.nodes[row] for row in rows[0].tolist()])
+    per_product = time.perf_counter() - started
+    per_product_calls = encoder.calls - setup_calls
+
+    started = time.perf_counter()
+    mapped = list(mapper.map_products(products))
+    per_path = time.perf_counter() - started
+    per_path_calls = encoder.calls - setup_calls - per_product_calls
+
+    same = all(mapper.taxonomy.find(product['googleCategories'][0]['path']) == nodes[0]
+               for product, nodes in zip(mapped, naive))
+    print(f"{len(products)} products, {len(mapper.matches)} distinct breadcrumb paths, {len(mapper.nodes)} taxonomy nodes")
+    print(f"{'per product':<12} {per_product:.2f}s encode calls={per_product_calls}")
+    print(f"{'per path':<12} {per_path:.2f}s encode calls={per_path_calls}  same best node: {same}")
+
+
+def tiny_nli_model(directory: str, texts: List[str]):
+    """Save a small, randomly initialised BERT NLI model and word-level tokenizer to `directory`.
+
+    Its predictions are meaningless, but it does the same work per token as a real
+    model, so it is enough to compare batching strategies offline.
+    """
+    from tokenizers import Tokenizer, models, normalizers, pre_tokenizers, processors
+    from transformers import BertConfig, BertForSequenceClassification, PreTrainedTokenizerFast
+
+    specials = ['[PAD]', '[UNK]', '[CLS]', '[SEP]']
+    words = sorted({word for text in texts for word in pre_tokenizers.BertPreTokenizer().pre_tokenize_str(text.lower())
+                    for word in [word[0]]})
+    vocab = {token: index for index, token in enumerate(specials + words)}
+    tokenizer = Tokenizer(models.WordLevel(vocab=vocab, unk_token='[UNK]'))
+    tokenizer.normalizer = normalizers.Lowercase()
+    tokenizer.pre_tokenizer = pre_tokenizers.BertPreTokenizer()
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single='[CLS] $A [SEP]', pair='[CLS] $A [SEP] $B:1 [SEP]:1',
+        special_tokens=[('[CLS]', vocab['[CLS]']), ('[SEP]', vocab['[SEP]'])]
+    )
+    PreTrainedTokenizerFast(tokenizer_object=tokenizer, unk_token='[UNK]', pad_token='[PAD]', cls_token='[CLS]',
+                            sep_token='[SEP]', model_max_length=128).save_pretrained(directory)
+
+    labels = {0: 'contradiction', 1: 'neutral', 2: 'entailment'}
+    config = BertConfig(vocab_size=len(vocab), hidden_size=256, num_hidden_layers=4, num_attention_heads=4,
+                        intermediate_size=1024, num_labels=3, id2label=labels,
+                        label2id={label: index for index, label in labels.items()})
+    torch.manual_seed(0)
+    BertForSequenceClassification(config).save_pretrained(directory)
+
+
+async def bench_zero_shot(args):
+    """class.py throughput: the old per-product pipeline vs batched NLI vs label embeddings."""
+    from sentence_transformers import SentenceTransformer
+    from transformers import pipeline
+
+    zero_shot = importlib.import_module('class')
+    labels = list(zero_shot.SUBCATEGORIES)
+    names = [f"Fixture {word} {labels[number % len(labels)].lower()}"
+             for number, word in enumerate(fixture_words(args.words) * (args.products // 100 + 1))][:args.products]
+
+    with tempfile.TemporaryDirectory() as directory:
+        tiny_nli_model(directory, names + [f"This example is {label}." for label in labels])
+        legacy = pipeline('zero-shot-classification', model=directory, tokenizer=directory, device=-1)
+        nli = zero_shot.NLIClassifier(model_name=directory, labels=labels, batch_size=args.batch_size, device='cpu')
+        embedding = zero_shot.EmbeddingClassifier(labels=labels, model=SentenceTransformer(directory, device='cpu'))
+
+        def run_legacy(batch):
+            return [list(zip(result['labels'], result['scores'])) for result in (legacy(name, labels) for name in batch)]
+
+        # NLI scores every (product, label) pair, so it gets a smaller sample than the embeddings
+        results = {}
+        legacy_count = min(args.legacy_products, len(names))
+        for label, classify, batch in (('per-product pipeline', run_legacy, names[:legacy_count]),
+                                       ('batched NLI', nli.classify, names[:args.nli_products]),
+                                       ('label embeddings', embedding.classify, names)):
+            started = time.perf_counter()
+            results[label] = classify(batch)
+            rate = len(batch) / (time.perf_counter() - started)
+            print(f"{label:<21} {rate:8.1f} products/s  (20k products: {20000 / rate / 60:.1f} min)")
+
+        same = all(old[0][0] == new[0][0] and abs(old[0][1] - new[0][1]) < 1e-4
+                   for old, new in zip(results['per-product pipeline'], results['batched NLI']))
+        print(f"{len(labels)} labels; batched NLI agrees with the pipeline on the first {legacy_count} products: {same}")
+
+
+def legacy_extract_unit_info(name: str, subtitle: str) -> Dict:
+    """The old PaknSaveScraper.extract_unit_info, kept to compare the shared parser against."""
+    units = {
+        'kg': ['kg', 'kilo', 'kilogram'],
+        'g': ['g', 'gram'],
+        'l': ['l', 'liter', 'litre'],
+        'ml': ['ml', 'milliliter', 'millilitre'],
+        'ea': ['ea', 'each', 'unit', '']
+    }
+    unit_info = {'size': '', 'unit_name': 'ea', 'unit_price': None}
+    matches = re.findall(r'(\d+(?:\.\d+)?)\s*([a-zA-Z]+)', f"{name} {subtitle}".lower())
+    for value, unit in matches:
+        for std_unit, variations in units.items():
+            if unit in variations:
+                unit_info['size'] = f"{value}{std_unit}"
+                unit_info['unit_name'] = std_unit
+                break
+    return unit_info
+
+
+# Subtitle shapes seen on the Pak'nSave site
+FIXTURE_SUBTITLES = ['500g', '1kg', '2L', '1.5L', '330ml', '6 x 330ml', '24 x 375ml', '12pk', '6 pack', 'ea',
+                     'kg', '250 gm', '3 litre', '750mL', '4 x 125g', '1.25l', '100 Grams', '10 each', '2 x 1L', '']
+
+
+def unit_corpus(path: Optional[str], words_path: str, count: int) -> List[tuple]:
+    """(name, subtitle, price) rows: from a scraped products file if given, else built from the fixture words."""
+    if path:
+        rows = []
+        for product in iter_products(path):
+            try:
+                price = float(product.get('price', 0))
+            except (TypeError, ValueError):
+                price = 0.0
+            rows.append((product.get('name', ''), product.get('subtitle', ''), price))
+        return rows
+    words = fixture_words(words_path)
+    return [(f"Fixture {words[i % len(words)].title()}", FIXTURE_SUBTITLES[i % len(FIXTURE_SUBTITLES)], 1 + (i % 900) / 100)
+            for i in range(count)]
+
+
+async def bench_units(args):
+    """Per-product time and coverage of the old extract_unit_info vs the shared units parser."""
+    rows = unit_corpus(args.corpus, args.words, args.products)
+    results = {}
+    for label, parse in (('legacy', lambda name, subtitle, price: legacy_extract_unit_info(name, subtitle)),
+                         ('units', extract_unit_info)):
+        started = time.perf_counter()
+        results[label] = [parse(name, subtitle, price) for name, subtitle, price in rows]
+        elapsed = time.perf_counter() - started
+        parsed = results[label]
+        print(f"{label:<7} {elapsed / len(rows) * 1e6:.1f}us/product  sizes={sum(bool(info['size']) for info in parsed)}"
+              f"  unit prices={sum(info['unit_price'] is not None for info in parsed)}"
+              f"  multipacks={sum(info.get('pack_count', 1) > 1 for info in parsed)}")
+    changed = sum(old['size'] != new['size'] for old, new in zip(results['legacy'], results['units']))
+    print(f"{len(rows)} products; size differs from legacy on {changed}")
+    for (name, subtitle, price), old, new in list(zip(rows, results['legacy'], results['units']))[:len(FIXTURE_SUBTITLES)]:
+        print(f"  {subtitle!r:<14} ${price:<5.2f} legacy={old['size'] or '-':<8} units={new['size'] or '-':<9}"
+              f" {new['unit_price']}/{new['unit_name']}")
+
+
+def listing_tiles(count: int, per_page: int = 50):
+    """Yield pages of raw listing tiles and product-page fields, shaped like the dom_extract scripts' output."""
+    for start in range(0, count, per_page):
+        page = []
+        for number in range(start, min(count, start + per_page)):
+            tile = {'testid': f"product-{5000000 + number}-EA-000", 'name': f"Fixture Product {number}",
+                    'subtitle': FIXTURE_SUBTITLES[number % len(FIXTURE_SUBTITLES)],
+                    'imageUrl': f"https://example.com/images/{number}.png", 'dollars': str(number % 20), 'cents': '99',
+                    'href': f"/shop/product/{number}_ea_000pns"}
+            raw = {'breadcrumbs': ['Fresh Foods & Bakery', 'Bakery', 'Bread'], 'name': tile['name'],
+                   'description': 'A product description of a realistic length. ' * 6,
+                   'ingredients': 'Water, sugar, salt, flavour. ' * 4, 'brand': 'Fixture', 'promotion': None,
+                   'nutrition': [['Energy', '1000kJ'], ['Protein', '5g'], ['Fat', '2g'], ['Sugars', '10g']],
+                   'dollars': tile['dollars'], 'cents': '99', 'subtitle': tile['subtitle'],
+                   'imageUrl': tile['imageUrl']}
+            page.append((tile, raw))
+        yield page
+
+
+def product_details(scraper: PaknSaveScraper, raw: Dict) -> Dict:
+    """fetch_product_details without the browser: the details dict built from product-page fields."""
+    details = {'category_data': scraper.build_category_data(raw['breadcrumbs'], raw['name'])}
+    for field in ('name', 'description', 'ingredients', 'brand', 'subtitle', 'imageUrl', 'promotion'):
+        if raw[field] is not None:
+            details[field] = raw[field]
+    details['nutritionalInfo'] = {key.strip(): value.strip() for key, value in raw['nutrition']}
+    details['price'] = f"{raw['dollars']}.{raw['cents']}"
+    return details
+
+
+def legacy_tile_to_product(tile: Dict) -> Dict:
+    """The old dict-based tile_to_product, with its own timestamp per product."""
+    checked_at = datetime.now().isoformat()
+    product = {"sourceSite": "paknsave.co.nz", "lastChecked": checked_at, "lastUpdated": checked_at}
+    product["name"] = tile['name'].strip() or None
+    product["subtitle"] = tile['subtitle'].strip()
+    product["imageUrl"] = tile['imageUrl']
+    product["price"] = f"{tile['dollars']}.{tile.get('cents') or '00'}"
+    match = re.search(r'product-(\d+)-', tile['testid'])
+    product["product_id"] = f"pk{match.group(1)}" if match else None
+    return product
+
+
+def legacy_transform(scraper: PaknSaveScraper, product: Dict) -> Dict:
+    """The old dict-based transform_to_frappe_format."""
+    try:
+        current_price = float(product.get('price', '0.00'))
+    except ValueError:
+        current_price = 0.00
+    unit_info = extract_unit_info(product.get('name', ''), product.get('subtitle', ''), current_price)
+    return {
+        "product_id": product.get("product_id"), "productname": product.get("name"),
+        "category": product.get("category"), "source_site": product.get("sourceSite"),
+        "size": unit_info['size'], "image_url": product.get('imageUrl', ''),
+        "unit_price": unit_info['unit_price'] or current_price, "unit_name": unit_info['unit_name'],
+        "original_unit_quantity": unit_info['quantity'], "current_price": current_price, "price_history": '',
+        "last_updated": product['lastUpdated'], "last_checked": product['lastChecked'],
+        "product_categories": scraper.build_category_hierarchy(product.get('category', ''))
+    }
+
+
+async def bench_records(args):
+    """Per-product memory and time of the scrape pipeline with loose dicts vs slotted ProductRecords."""
+    logging.disable(logging.INFO)
+    scraper = PaknSaveScraper(ScraperConfig(base_url='https://example.com', skip_unchanged=False,
+                                            checkpoint_path=None, proxy_list=[]))
+
+    def legacy_pipeline():
+        products = []
+        for page in listing_tiles(args.products):
+            for tile, raw in page:
+                product = legacy_tile_to_product(tile)
+                details = product_details(scraper, raw)
+                checked_at = datetime.now().isoformat()
+                details['lastChecked'] = checked_at
+                details['lastUpdated'] = checked_at
+                product.update(details)
+                legacy_transform(scraper, product)
+                products.append(product)
+        return products
+
+    def record_pipeline():
+        products = []
+        for page in listing_tiles(args.products):
+            checked_at = datetime.now().isoformat()
+            for tile, raw in page:
+                product = scraper.tile_to_product(tile, checked_at)
+                product.update(product_details(scraper, raw))
+                scraper.frappe_payload(product)
+                products.append(product)
+        return products
+
+    results = {}
+    for label, run in (('dicts', legacy_pipeline), ('records', record_pipeline)):
+        tracemalloc.start()
+        started = time.perf_counter()
+        products = run()
+        elapsed = time.perf_counter() - started
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[label] = products
+        print(f"{label:<8} {elapsed / len(products) * 1e6:6.1f}us/product  retained={retained / len(products):6.0f}B/product"
+              f"  peak heap={peak / 2**20:6.1f}MB")
+        del products
+    same = all(old == {**new.to_dict(), 'lastChecked': old['lastChecked'], 'lastUpdated': old['lastUpdated']}
+               for old, new in zip(results['dicts'], results['records']))
+    print(f"{args.products} products; record to_dict() matches the legacy dicts: {same}")
+    logging.disable(logging.NOTSET)
+
+
+async def bench_metrics(args):
+    """Cost of a timed stage and a counter bump, and a live scrape of the metrics endpoint."""
+    metrics = Metrics()
+    stages = ['navigate', 'extract', 'detail_fetch', 'transform', 'sink_write']
+
+    started = time.perf_counter()
+    for number in range(args.calls):
+        pass
+    baseline = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for number in range(args.calls):
+        with metrics.timer(stages[number % 5]):
+            pass
+    timed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for number in range(args.calls):
+        metrics.inc('products')
+    counted = time.perf_counter() - started
+
+    print(f"timer   {(timed - baseline) / args.calls * 1e9:6.0f}ns/stage")
+    print(f"counter {(counted - baseline) / args.calls * 1e9:6.0f}ns/increment")
+    # A product goes through about six timed stages and two counters
+    per_product = 6 * (timed - baseline) / args.calls + 2 * (counted - baseline) / args.calls
+    print(f"about {per_product * 1e6:.1f}us of instrumentation per product, "
+          f"against seconds of navigation and sleeps per product")
+
+    server = MetricsServer(metrics, port=0)
+    server.start()
+    try:
+        started = time.perf_counter()
+        response = await asyncio.to_thread(requests.get, server.url, timeout=5)
+        elapsed = time.perf_counter() - started
+    finally:
+        server.stop()
+    print(f"/metrics: HTTP {response.status_code}, {len(response.text.splitlines())} lines in {elapsed * 1000:.1f}ms")
+    print(json.dumps(metrics.summary()['stages']['navigate']))
+
+
+async def bench_replay(args):
+    """A full PaknSaveScraper crawl of local pages into a stub Frappe: throughput, per-product latency, peak RSS."""
+    logging.disable(logging.INFO)
+    if args.recording:
+        site = ReplayServer(args.recording, latency=args.latency, jitter=args.jitter)
+    else:
+        catalogue = FixtureCatalogue(categories=args.categories, pages=args.pages, products_per_page=args.per_page)
+        site = FixtureServer(catalogue, latency=args.latency, jitter=args.jitter)
+
+    with site as server, StubFrappeServer(latency=args.frappe_latency) as frappe, tempfile.TemporaryDirectory() as tmp:
+        frappe_api.FRAPPE_URL = frappe.resource_url
+        config = fixture_config(server)
+        config.checkpoint_path = None
+        config.change_store_path = os.path.join(tmp, 'hashes.sqlite')
+        config.output_path = os.path.join(tmp, 'products.ndjson')
+        config.metrics_path = os.path.join(tmp, 'metrics.json')
+        config.frappe_bulk = args.bulk
+        config.concurrent_categories = args.concurrent_categories
+        config.pages_per_category = args.pages_per_category
+        scraper = PaknSaveScraper(config)
+
+        # Per-product latency: from starting a product (pool wait included) to it being queued for Frappe
+        latencies = []
+        scrape_product = scraper.scrape_product
+
+        async def timed_scrape_product(pool, product, product_url):
+            started = time.perf_counter()
+            try:
+                return await scrape_product(pool, product, product_url)
+            finally:
+                latencies.append(time.perf_counter() - started)
+
+        scraper.scrape_product = timed_scrape_product
+
+        peak_rss = [None]
+
+        async def sample_rss():
+            while True:
+                rss = browser_rss_mb()
+                if rss is not None:
+                    peak_rss[0] = max(peak_rss[0] or 0, rss)
+                await asyncio.sleep(0.25)
+
+        async with async_playwright() as p:
+            sampler = asyncio.create_task(sample_rss())
+            started = time.perf_counter()
+            await scraper.scrape_all_categories(p)
+            elapsed = time.perf_counter() - started
+            sampler.cancel()
+
+        products = scraper.metrics.counters.get('products', 0)
+        print(f"{products} products in {elapsed:.1f}s: {products / elapsed:.2f} products/s "
+              f"(listing latency {args.latency * 1000:.0f}ms + up to {args.jitter * 1000:.0f}ms jitter)")
+        if latencies:
+            latencies.sort()
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            print(f"per-product latency p50={statistics.median(latencies) * 1000:.0f}ms p95={p95 * 1000:.0f}ms")
+        rss = f"{peak_rss[0]:.0f}MB" if peak_rss[0] is not None else "n/a"
+        print(f"peak RSS: browser {rss}, python {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f}MB")
+        print(f"site hits {server.hits}, frappe hits {frappe.hits}")
+        for stage, stats in sorted(scraper.metrics.summary()['stages'].items(), key=lambda item: -item[1]['total_s']):
+            print(f"  {stage:<13} {stats['count']:>6} calls {stats['total_s']:>8.2f}s total {stats['mean_ms']:>8.1f}ms mean")
+    logging.disable(logging.NOTSET)
+
+
+async def bench_politeness(args):
+    """Crawl time and dead time against a throttling host: fixed sleeps vs AIMD rate control (simulated clock)."""
+    scale = args.time_scale
+    url = 'https://www.paknsave.co.nz/shop/product/1'
+
+    async def crawl(label, limiter, sleep_range, retry_sleep):
+        host = ThrottledHost(args.capacity, args.latency, scale, args.burst)
+        urls = deque(range(args.requests))
+        slept = [0.0]
+        waited = [0.0]
+
+        async def worker():
+            while urls:
+                urls.popleft()
+                while True:
+                    if sleep_range:
+                        delay = random.uniform(*sleep_range) * scale
+                        slept[0] += delay
+                        await asyncio.sleep(delay)
+                    started = time.perf_counter()
+                    await limiter.acquire(url)
+                    waited[0] += time.perf_counter() - started
+                    started = time.perf_counter()
+                    status = await host.get()
+                    limiter.record(url, time.perf_counter() - started, ok=status == 200, throttled=status == 429)
+                    if status == 200:
+                        break
+                    if retry_sleep:
+                        slept[0] += retry_sleep * scale
+                        await asyncio.sleep(retry_sleep * scale)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.workers)))
+        elapsed = time.perf_counter() - started
+        budget = args.workers * elapsed
+        print(f"{label:<14} {elapsed / scale:7.1f} site-s  {args.requests / (elapsed / scale):5.2f} pages/s  "
+              f"fixed sleeps={slept[0] / budget:5.1%}  limiter waits={waited[0] / budget:5.1%}  429s={host.throttled}")
+
+    print(f"{args.requests} pages, {args.workers} pages in flight, host capacity {args.capacity}/s "
+          f"queueing up to {args.burst} (floor {args.requests / args.capacity:.0f} site-s)")
+    await crawl('fixed sleeps', HostRateLimiter(2.0 / scale), (1, 3), 7)
+    # The scraper's default limiter, with its rates and times in simulated seconds
+    await crawl('adaptive', AdaptiveRateLimiter(ScraperConfig.host_requests_per_second / scale, min_rate=0.2 / scale,
+                                                max_rate=args.max_rate / scale, increase=0.25 / scale,
+                                                slow_seconds=ScraperConfig.slow_response_seconds * scale,
+                                                queue_seconds=ScraperConfig.queue_delay_seconds * scale,
+                                                ceiling_seconds=60.0 * scale), None, 0)
+
+
+async def bench_waits(args):
+    """Per-page latency of paginating with networkidle vs the readiness waits, on pages with analytics beacons."""
+    catalogue = FixtureCatalogue(categories=1, pages=args.pages, products_per_page=args.per_page)
+    with FixtureServer(catalogue, latency=args.latency, beacon_ms=args.beacon_ms) as server:
+        slug = next(iter(catalogue.categories))
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            for label in ('networkidle', 'readiness'):
+                page = await browser.new_page()
+                metrics = Metrics()
+                waiter = PageWaiter(metrics, timeout=args.timeout)
+                await page.goto(f"{server.base_url}/shop/category/{slug}?pg=1", wait_until='domcontentloaded')
+                timings = []
+                while True:
+                    next_page = await page.query_selector('a[data-testid="pagination-increment"]')
+                    if not next_page:
+                        break
+                    started = time.perf_counter()
+                    if label == 'networkidle':
+                        await next_page.click()
+                        try:
+                            await page.wait_for_load_state('networkidle', timeout=args.timeout * 1000)
+                        except Exception:
+                            metrics.inc('wait_listing_timeout')
+                    else:
+                        await waiter.paginate(page, next_page)
+                    timings.append(time.perf_counter() - started)
+                    assert len(await extract_listing_tiles(page)) == args.per_page
+                await page.close()
+                summarise(label, timings, None)
+                print(f"{'':<12} outcomes {metrics.counters}")
+            await browser.close()
+
+
+async def legacy_route_blocking(page, block_types):
+    """The old policy: abort by resource type through page.route, which turns off the page's HTTP cache."""
+    async def handle(route):
+        if route.request.resource_type in block_types:
+            await route.abort('blockedbyclient')
+        else:
+            await route.continue_()
+
+    await page.route('**/*', handle)
+
+
+async def bench_blocking(args):
+    """Bytes served and page-load time on one pooled page: no blocking, page.route blocking, DevTools blocking."""
+    catalogue = FixtureCatalogue(categories=1, pages=args.pages, products_per_page=args.per_page)
+    with FixtureServer(catalogue, latency=args.latency, image_bytes=args.image_kb * 1024,
+                       script_bytes=args.script_kb * 1024) as server:
+        slug = next(iter(catalogue.categories))
+        urls = [f"{server.base_url}/shop/category/{slug}?pg={number}" for number in range(1, args.pages + 1)]
+        urls += [f"{server.base_url}/shop/product/{number}_ea_000pns" for number in catalogue.products]
+        async with async_playwright() as p:
+            for label in ('no blocking', 'page.route', 'devtools'):
+                config = fixture_config(server)
+                if label != 'devtools':
+                    config.block_resources, config.block_trackers = (), False
+                scraper = PaknSaveScraper(config)
+                scraper.browser = await p.chromium.launch(headless=True)
+                # new_page measures what the page downloads either way; it only blocks in 'devtools'
+                page = await scraper.new_page()
+                if label == 'page.route':
+                    await legacy_route_blocking(page, DEFAULT_BLOCKED_TYPES)
+                sent = server.bytes_sent
+                timings = []
+                for url in urls:
+                    started = time.perf_counter()
+                    await page.goto(url, wait_until='load')
+                    timings.append(time.perf_counter() - started)
+                await scraper.browser.close()
+                summarise(label, timings, None)
+                print(f"{'':<12} {(server.bytes_sent - sent) / 2**20:.1f} MB served for {len(urls)} pages; "
+                      f"{scraper.resource_policy.summary()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline scraper benchmarks against local fixture pages")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    details = subparsers.add_parser('details', help="single-pass vs legacy product detail fetch")
+    details.add_argument('--products', type=int, default=20)
+    details.add_argument('--latency', type=float, default=0.05, help="server latency per request in seconds")
+    details.add_argument('--legacy-sleep', type=float, default=5.0, help="fixed sleep of the legacy strategy")
+    details.set_defaults(run=bench_details)
+
+    extraction = subparsers.add_parser('extraction', help="per-element vs bulk DOM extraction round-trips")
+    extraction.add_argument('--tiles', type=int, default=50)
+    extraction.set_defaults(run=bench_extraction)
+
+    sink = subparsers.add_parser('sink', help="inline vs pipelined Frappe writes against a stub Frappe")
+    sink.add_argument('--products', type=int, default=200)
+    sink.add_argument('--scrape-time', type=float, default=0.01, help="simulated scrape time per product")
+    sink.add_argument('--frappe-latency', type=float, default=0.05, help="stub Frappe latency per request")
+    sink.add_argument('--workers', type=int, default=8)
+    sink.add_argument('--queue-size', type=int, default=100)
+    sink.set_defaults(run=bench_sink)
+
+    bulk = subparsers.add_parser('bulk', help="per-product vs bulk upsert request counts against a stub Frappe")
+    bulk.add_argument('--products', type=int, default=1000)
+    bulk.add_argument('--frappe-latency', type=float, default=0.005)
+    bulk.add_argument('--workers', type=int, default=8)
+    bulk.add_argument('--batch-size', type=int, default=100)
+    bulk.set_defaults(run=bench_bulk)
+
+    http = subparsers.add_parser('http', help="requests/sec of bare requests vs the pooled Frappe clients")
+    http.add_argument('--requests', type=int, default=2000)
+    http.add_argument('--concurrency', type=int, default=8)
+    http.set_defaults(run=bench_http)
+
+    changes = subparsers.add_parser('changes', help="day-two Frappe traffic with and without change detection")
+    changes.add_argument('--products', type=int, default=2000)
+    changes.add_argument('--bulk', action='store_true', help="write in batches, like ScraperConfig.frappe_bulk")
+    changes.add_argument('--batch-size', type=int, default=100)
+    changes.add_argument('--workers', type=int, default=4)
+    changes.add_argument('--touch', action='store_true', help="send last_checked touches for unchanged products")
+    changes.set_defaults(run=bench_changes)
+
+    stream = subparsers.add_parser('stream', help="peak memory of whole-file JSON vs streamed NDJSON output")
+    stream.add_argument('--products', type=int, default=20000)
+    stream.set_defaults(run=bench_stream)
+
+    semantic = subparsers.add_parser('semantic', help="per-keyword vs vectorised semantic matching in ProductClassifier")
+    semantic.add_argument('--products', type=int, default=500)
+    semantic.add_argument('--words', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'unmatched_keywords.txt'))
+    semantic.set_defaults(run=bench_semantic)
+
+    encoding = subparsers.add_parser('encoding', help="per-string vs batched embedding in ProductClassifier")
+    encoding.add_argument('--products', type=int, default=2000)
+    encoding.add_argument('--batch-size', type=int, default=256)
+    encoding.add_argument('--words', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'unmatched_keywords.txt'))
+    encoding.set_defaults(run=bench_encoding)
+
+    cache = subparsers.add_parser('cache', help="ProductClassifier startup with a cold vs warm embedding cache")
+    cache.set_defaults(run=bench_cache)
+
+    fuzzy = subparsers.add_parser('fuzzy', help="difflib.get_close_matches vs the prebuilt fuzzy index")
+    fuzzy.add_argument('--words', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'unmatched_keywords.txt'))
+    fuzzy.set_defaults(run=bench_fuzzy)
+
+    memo = subparsers.add_parser('memo', help="classification with and without the word memo")
+    memo.add_argument('--repeat', type=int, default=10)
+    memo.add_argument('--words', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'unmatched_keywords.txt'))
+    memo.set_defaults(run=bench_memo)
+
+    parallel = subparsers.add_parser('parallel', help="classify_products in one process vs a process pool")
+    parallel.add_argument('--products', type=int, default=20000)
+    parallel.add_argument('--workers', type=int, default=0, help="default: one per CPU")
+    parallel.add_argument('--chunk-size', type=int, default=500)
+    parallel.add_argument('--memo-size', type=int, default=0, help="0 measures the uncached matching cost")
+    parallel.add_argument('--words', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'unmatched_keywords.txt'))
+    parallel.set_defaults(run=bench_parallel)
+
+    taxonomy = subparsers.add_parser('taxonomy', help="per-product vs per-distinct-path taxonomy mapping")
+    taxonomy.add_argument('--categories', type=int, default=5)
+    taxonomy.add_argument('--pages', type=int, default=20)
+    taxonomy.add_argument('--per-page', type=int, default=50)
+    taxonomy.set_defaults(run=bench_taxonomy)
+
+    zero_shot = subparsers.add_parser('zero-shot', help="class.py per-product pipeline vs batched NLI vs embeddings (tiny local model)")
+    zero_shot.add_argument('--products', type=int, default=2000)
+    zero_shot.add_argument('--nli-products', type=int, default=40)
+    zero_shot.add_argument('--legacy-products', type=int, default=5)
+    zero_shot.add_argument('--batch-size', type=int, default=64)
+    zero_shot.add_argument('--words', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'unmatched_keywords.txt'))
+    zero_shot.set_defaults(run=bench_zero_shot)
+
+    units = subparsers.add_parser('units', help="legacy extract_unit_info vs the shared units parser")
+    units.add_argument('--products', type=int, default=100000)
+    units.add_argument('--corpus', help="scraped products (NDJSON or JSON array) to parse instead of the fixture corpus")
+    units.add_argument('--words', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'unmatched_keywords.txt'))
+    units.set_defaults(run=bench_units)
+
+    records = subparsers.add_parser('records', help="scrape pipeline memory with loose dicts vs slotted ProductRecords")
+    records.add_argument('--products', type=int, default=50000)
+    records.set_defaults(run=bench_records)
+
+    metrics = subparsers.add_parser('metrics', help="overhead of the crawl metrics and a scrape of their endpoint")
+    metrics.add_argument('--calls', type=int, default=1000000)
+    metrics.set_defaults(run=bench_metrics)
+
+    replay = subparsers.add_parser('replay', help="end-to-end crawl of fixture or recorded pages into a stub Frappe")
+    replay.add_argument('--recording', help="directory written by page_recorder.py (default: the synthetic catalogue)")
+    replay.add_argument('--categories', type=int, default=3)
+    replay.add_argument('--pages', type=int, default=2)
+    replay.add_argument('--per-page', type=int, default=20)
+    replay.add_argument('--latency', type=float, default=0.1, help="site latency per request in seconds")
+    replay.add_argument('--jitter', type=float, default=0.1, help="extra random site latency, up to this many seconds")
+    replay.add_argument('--frappe-latency', type=float, default=0.02)
+    replay.add_argument('--concurrent-categories', type=int, default=3)
+    replay.add_argument('--pages-per-category', type=int, default=4)
+    replay.add_argument('--bulk', action='store_true', help="write through the bulk Frappe writer")
+    replay.set_defaults(run=bench_replay)
+
+    politeness = subparsers.add_parser('politeness', help="fixed politeness sleeps vs AIMD rate control against a throttling host")
+    politeness.add_argument('--requests', type=int, default=300)
+    politeness.add_argument('--workers', type=int, default=8)
+    politeness.add_argument('--capacity', type=float, default=4.0, help="requests per second the host serves before 429s")
+    politeness.add_argument('--latency', type=float, default=0.3, help="host response time in seconds")
+    politeness.add_argument('--burst', type=int, default=10, help="requests the host queues before answering 429")
+    politeness.add_argument('--max-rate', type=float, default=ScraperConfig.max_requests_per_second)
+    politeness.add_argument('--time-scale', type=float, default=0.05, help="real seconds per simulated second")
+    politeness.set_defaults(run=bench_politeness)
+
+    waits = subparsers.add_parser('waits', help="pagination with networkidle vs readiness waits, with analytics beacons")
+    waits.add_argument('--pages', type=int, default=10)
+    waits.add_argument('--per-page', type=int, default=20)
+    waits.add_argument('--latency', type=float, default=0.05)
+    waits.add_argument('--beacon-ms', type=int, default=400, help="beacon interval on listing pages; 0 for none")
+    waits.add_argument('--timeout', type=float, default=10.0)
+    waits.set_defaults(run=bench_waits)
+
+    blocking = subparsers.add_parser('blocking', help="bytes and page-load time with and without resource blocking")
+    blocking.add_argument('--pages', type=int, default=3)
+    blocking.add_argument('--per-page', type=int, default=20)
+    blocking.add_argument('--image-kb', type=int, default=60)
+    blocking.add_argument('--script-kb', type=int, default=300, help="size of the cacheable script bundle and stylesheet")
+    blocking.add_argument('--latency', type=float, default=0.05, help="server latency per request, images included")
+    blocking.set_defaults(run=bench_blocking)
+
+    args = parser.parse_args()
+    asyncio.run(args.run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import hashlib
+import json
+import logging
+import sqlite3
+from typing import Dict, Iterable
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Fields that change on every run without the product itself changing
+VOLATILE_FIELDS = {'last_updated', 'last_checked', 'price_history'}
+
+# A touch payload only moves last_checked on a product Frappe already has
+TOUCH_FIELDS = {'product_id', 'last_checked'}
+
+
+def content_hash(product: Dict) -> str:
+    """Stable hash of the write-relevant fields of a Frappe-formatted product."""
+    relevant = {key: value for key, value in product.items() if key not in VOLATILE_FIELDS}
+    encoded = json.dumps(relevant, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+def touch_payload(product: Dict) -> Dict:
+    return {'product_id': product['product_id'], 'last_checked': product['last_checked']}
+
+
+def is_touch(product: Dict) -> bool:
+    return product.keys() == TOUCH_FIELDS
+
+
+class ChangeStore:
+    """Remembers the content hash last written to Frappe for each product_id (SQLite)."""
+
+    def __init__(self, path: str = 'product_hashes.sqlite'):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS product_hashes (product_id TEXT PRIMARY KEY, hash TEXT NOT NULL)'
+        )
+        self.conn.commit()
+        self.changed = 0
+        self.unchanged = 0
+
+    def is_unchanged(self, product: Dict) -> bool:
+        """True if the product hashes the same as the last successful write."""
+        row = self.conn.execute(
+            'SELECT hash FROM product_hashes WHERE product_id = ?', (product['product_id'],)
+        ).fetchone()
+        unchanged = row is not None and row[0] == content_hash(product)
+        if unchanged:
+            self.unchanged += 1
+        else:
+            self.changed += 1
+        return unchanged
+
+    def record(self, products: Iterable[Dict]):
+        """Store hashes for products Frappe has accepted; touches are skipped."""
+        rows = [(product['product_id'], content_hash(product)) for product in products
+                if product.get('product_id') and not is_touch(product)]
+        if rows:
+            self.conn.executemany('INSERT OR REPLACE INTO product_hashes (product_id, hash) VALUES (?, ?)', rows)
+            self.conn.commit()
+
+    def close(self):
+        logging.info(f"Change detection: {self.changed} changed, {self.unchanged} unchanged products")
+        self.conn.close()
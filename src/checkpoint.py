@@ -0,0 +1,160 @@
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Category states: running -> done (every product of every listing page written)
+RUNNING, DONE = 'running', 'done'
+
+
+@dataclass
+class ListingPage:
+    """A listing page of the current run and the products on it Frappe has not accepted yet."""
+    url: str
+    pending: Set[str] = field(default_factory=set)
+    listed: bool = False
+
+    @property
+    def complete(self) -> bool:
+        return self.listed and not self.pending
+
+
+class CheckpointStore:
+    """Crawl progress in SQLite so a killed crawl can pick up where it stopped.
+
+    It records, per category, the first listing page that still has products
+    Frappe has not accepted, which categories are finished, and which product ids
+    Frappe has accepted. Progress only moves when a write is confirmed through
+    `mark_processed`, so products still queued for Frappe when the process dies
+    are crawled again. A crawl that completes clears it.
+
+    A crawl that never completes, say because Frappe keeps rejecting one product,
+    must not pin every later crawl to its product list: a checkpoint older than
+    `max_age_hours` is discarded and the crawl starts from scratch.
+    """
+
+    def __init__(self, path: str = 'crawl_checkpoint.sqlite', max_age_hours: Optional[float] = 12.0):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS categories (
+                url TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                position TEXT
+            );
+            CREATE TABLE IF NOT EXISTS products (product_id TEXT PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS run (started_at REAL NOT NULL, output_path TEXT);
+        ''')
+        self.conn.commit()
+        row = self.conn.execute('SELECT started_at FROM run').fetchone()
+        if row and max_age_hours is not None and time.time() - row[0] > max_age_hours * 3600:
+            logging.warning(f"Discarding checkpoint from {time.ctime(row[0])}, older than {max_age_hours} hours")
+            self.finish()
+            row = None
+        if row is None:
+            self.conn.execute('INSERT INTO run (started_at) VALUES (?)', (time.time(),))
+            self.conn.commit()
+        # This run's listing pages per category, oldest first, and the categories waiting on each product
+        self.pages: Dict[str, List[ListingPage]] = {}
+        self.waiting: Dict[str, Set[str]] = {}
+        self.scraped: Set[str] = set()
+        done, products = self.summary()
+        if done or products:
+            logging.info(f"Resuming crawl: {done} categories done, {products} products already written")
+
+    def summary(self):
+        done = self.conn.execute('SELECT COUNT(*) FROM categories WHERE state = ?', (DONE,)).fetchone()[0]
+        products = self.conn.execute('SELECT COUNT(*) FROM products').fetchone()[0]
+        return done, products
+
+    def output_path(self, path: Optional[str]) -> Optional[str]:
+        """The run's output file: the one recorded when it started, so a resumed crawl appends to it."""
+        recorded = self.conn.execute('SELECT output_path FROM run').fetchone()[0]
+        if recorded:
+            return recorded
+        self.conn.execute('UPDATE run SET output_path = ?', (path,))
+        self.conn.commit()
+        return path
+
+    def is_done(self, category_url: str) -> bool:
+        row = self.conn.execute('SELECT state FROM categories WHERE url = ?', (category_url,)).fetchone()
+        return row is not None and row[0] == DONE
+
+    def resume_url(self, category_url: str) -> Optional[str]:
+        """The first listing page with unwritten products when the last run stopped, if any."""
+        row = self.conn.execute('SELECT position FROM categories WHERE url = ?', (category_url,)).fetchone()
+        return row[0] if row else None
+
+    def start_page(self, category_url: str, page_url: str):
+        """Start on a listing page. The first one of a run is where the category resumes until its products are written."""
+        if category_url not in self.pages:
+            self.conn.execute(
+                'INSERT OR IGNORE INTO categories (url, state, position) VALUES (?, ?, ?)',
+                (category_url, RUNNING, page_url)
+            )
+            self.conn.commit()
+        self.pages.setdefault(category_url, []).append(ListingPage(page_url))
+
+    def page_listed(self, category_url: str, product_ids: Iterable[str]):
+        """The current listing page's products to write are known; the page is complete once all are accepted."""
+        page = self.pages[category_url][-1]
+        for product_id in product_ids:
+            if product_id:
+                page.pending.add(product_id)
+                self.waiting.setdefault(product_id, set()).add(category_url)
+        page.listed = True
+        self.advance(category_url)
+
+    def category_scraped(self, category_url: str):
+        """Every listing page of the category has been read; it is done once its products are written."""
+        self.scraped.add(category_url)
+        self.advance(category_url)
+
+    def advance(self, category_url: str):
+        """Move the category's resume position past listing pages whose products are all written."""
+        pages = self.pages.get(category_url)
+        if pages is None:
+            return
+        scraped = category_url in self.scraped
+        # The last page stays the position until the next one starts, unless there is no next one
+        moved = False
+        while pages and pages[0].complete and (len(pages) > 1 or scraped):
+            pages.pop(0)
+            moved = True
+        if not moved:
+            return
+        if pages:
+            self.conn.execute('UPDATE categories SET position = ? WHERE url = ?', (pages[0].url, category_url))
+        else:
+            self.conn.execute('UPDATE categories SET state = ?, position = NULL WHERE url = ?', (DONE, category_url))
+            del self.pages[category_url]
+        self.conn.commit()
+
+    def processed(self, product_id: str) -> bool:
+        return self.conn.execute('SELECT 1 FROM products WHERE product_id = ?', (product_id,)).fetchone() is not None
+
+    def mark_processed(self, product_ids: Iterable[str]):
+        """Frappe accepted these products, or they needed no write: never crawl them again."""
+        product_ids = [product_id for product_id in product_ids if product_id]
+        self.conn.executemany('INSERT OR IGNORE INTO products (product_id) VALUES (?)', [(pid,) for pid in product_ids])
+        self.conn.commit()
+        categories = set()
+        for product_id in product_ids:
+            for category_url in self.waiting.pop(product_id, ()):
+                for page in self.pages.get(category_url, ()):
+                    page.pending.discard(product_id)
+                categories.add(category_url)
+        for category_url in categories:
+            self.advance(category_url)
+
+    def finish(self):
+        """The crawl completed; forget it so the next run starts from scratch."""
+        self.conn.executescript('DELETE FROM categories; DELETE FROM products; DELETE FROM run;')
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -1,7 +1,12 @@
-from transformers import pipeline
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
 
-# Initialize zero-shot classifier
-classifier = pipeline("zero-shot-classification")
+import torch
+from sentence_transformers import SentenceTransformer, util
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
 
 # Define the categories dictionary
 categories = {
@@ -61,33 +66,124 @@ def flatten_categories(categories):
             subcategories.append(subcategory)
     return subcategories
 
+# Candidate labels, flattened once rather than on every call; a tuple, so it is its own classifier key
+SUBCATEGORIES = tuple(flatten_categories(categories))
+DEFAULT_CATEGORIES = categories
+
+
+def filter_results(results: List[Tuple[str, float]], threshold: float) -> List[Tuple[str, float]]:
+    """Keep (label, score) pairs at or above the threshold, or all of them if none are."""
+    filtered_results = [(label, score) for label, score in results if score >= threshold]
+    return filtered_results or results
+
+
+class NLIClassifier:
+    """Zero-shot classification with an NLI model, run over padded batches of (product, label) pairs.
+
+    Scores match transformers' zero-shot-classification pipeline in single-label mode:
+    the entailment logits are softmaxed across the candidate labels of each product.
+    """
+
+    def __init__(self, model_name: str = 'facebook/bart-large-mnli', labels: Sequence[str] = SUBCATEGORIES,
+                 hypothesis_template: str = "This example is {}.", batch_size: int = 64,
+                 model=None, tokenizer=None, device: Optional[str] = None):
+        self.tokenizer = tokenizer or AutoTokenizer.from_pretrained(model_name)
+        self.model = model or AutoModelForSequenceClassification.from_pretrained(model_name)
+        self.device = device or ('cuda' if torch.cuda.is_available() else 'cpu')
+        self.model.to(self.device).eval()
+        self.labels = list(labels)
+        self.hypotheses = [hypothesis_template.format(label) for label in self.labels]
+        self.batch_size = batch_size
+        self.entailment_id = next(
+            (index for label, index in self.model.config.label2id.items() if label.lower().startswith('entail')), -1
+        )
+
+    @torch.inference_mode()
+    def entailment_logits(self, product_names: List[str]) -> torch.Tensor:
+        """One entailment logit per (product, label), as a products x labels matrix."""
+        pairs = [(name, hypothesis) for name in product_names for hypothesis in self.hypotheses]
+        logits = []
+        for start in range(0, len(pairs), self.batch_size):
+            batch = pairs[start:start + self.batch_size]
+            inputs = self.tokenizer([premise for premise, _ in batch], [hypothesis for _, hypothesis in batch],
+                                    padding=True, truncation='only_first', return_tensors='pt').to(self.device)
+            logits.append(self.model(**inputs).logits[:, self.entailment_id].float().cpu())
+        return torch.cat(logits).reshape(len(product_names), len(self.labels))
+
+    def classify(self, product_names: List[str]) -> List[List[Tuple[str, float]]]:
+        """(label, score) pairs for each product, best first."""
+        if not product_names:
+            return []
+        scores = torch.softmax(self.entailment_logits(product_names), dim=1)
+        return [ranked(self.labels, row) for row in scores]
+
+
+class EmbeddingClassifier:
+    """Scores products against label embeddings computed once; one encoder pass per product.
+
+    Scores are cosine similarities, so they are not on the same scale as NLI probabilities.
+    """
+
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', labels: Sequence[str] = SUBCATEGORIES,
+                 batch_size: int = 256, model=None):
+        self.model = model if model is not None else SentenceTransformer(model_name)
+        self.labels = list(labels)
+        self.batch_size = batch_size
+        self.label_matrix = self.encode(self.labels)
+
+    def encode(self, texts: List[str]) -> torch.Tensor:
+        return util.normalize_embeddings(self.model.encode(texts, batch_size=self.batch_size, convert_to_tensor=True))
+
+    def classify(self, product_names: List[str]) -> List[List[Tuple[str, float]]]:
+        """(label, score) pairs for each product, best first."""
+        if not product_names:
+            return []
+        scores = self.encode(list(product_names)) @ self.label_matrix.T
+        return [ranked(self.labels, row) for row in scores.cpu()]
+
+
+def ranked(labels: List[str], scores: torch.Tensor) -> List[Tuple[str, float]]:
+    order = torch.argsort(scores, descending=True).tolist()
+    values = scores.tolist()
+    return [(labels[index], values[index]) for index in order]
+
+
+CLASSIFIER_MODES = {'nli': NLIClassifier, 'embedding': EmbeddingClassifier}
+_classifiers: Dict[Tuple[str, Tuple[str, ...]], object] = {}
+
+
+def get_classifier(mode: str = 'nli', labels: Sequence[str] = SUBCATEGORIES):
+    """The shared classifier for a mode ('nli' or 'embedding') and label set, built on first use."""
+    if mode not in CLASSIFIER_MODES:
+        raise ValueError(f"Unknown classifier mode: {mode}")
+    key = (mode, tuple(labels))
+    if key not in _classifiers:
+        _classifiers[key] = CLASSIFIER_MODES[mode](labels=labels)
+    return _classifiers[key]
+
+
+# Function to classify a batch of product names
+def classify_products(product_names, categories=None, threshold=0.5, mode='nli'):
+    # Only a custom category table needs flattening here
+    if categories is None or categories is DEFAULT_CATEGORIES:
+        labels = SUBCATEGORIES
+    else:
+        labels = flatten_categories(categories)
+    classifier = get_classifier(mode, labels)
+    return [filter_results(results, threshold) for results in classifier.classify(list(product_names))]
+
 # Function to classify a product name
-def classify_product(product_name, categories, threshold=0.5):
-    # Flatten the categories to get subcategory names as candidate labels
-    subcategories = flatten_categories(categories)
-    
-    # Perform the classification
-    result = classifier(product_name, subcategories)
-    
-    # Debugging: print the raw result to see what is being returned
-    print("Raw Classification Result:", result)
-    
-    # Filter the results based on the threshold
-    filtered_results = [(label, score) for label, score in zip(result['labels'], result['scores']) if score >= threshold]
-    
-    # If no results meet the threshold, print all results
-    if not filtered_results:
-        print(f"No labels met the threshold of {threshold}. Showing all results instead:")
-        filtered_results = list(zip(result['labels'], result['scores']))
-    
-    return filtered_results
-
-# Example usage
-product_name = "Carbonated Cola Base"
-classification = classify_product(product_name, categories, threshold=0.5)
-
-# Print the classification result
-print(f"\nProduct: {product_name}")
-print("Filtered Classification Results:")
-for label, score in classification:
-    print(f"{label}: {score:.4f}")
+def classify_product(product_name, categories=None, threshold=0.5, mode='nli'):
+    return classify_products([product_name], categories, threshold, mode)[0]
+
+
+if __name__ == "__main__":
+    # Example usage
+    product_name = "Carbonated Cola Base"
+    classification = classify_product(product_name, categories, threshold=0.5)
+
+    # Print the classification result
+    print(f"\nProduct: {product_name}")
+    print("Filtered Classification Results:")
+    for label, score in classification:
+        print(f"{label}: {score:.4f}")
@@ -0,0 +1,76 @@
+from typing import Dict, List
+
+from playwright.async_api import Page
+
+TILE_SELECTOR = 'div[data-testid$="-EA-000"]'
+
+# Runs in the page: reads every product tile on a listing page in one go.
+LISTING_SCRIPT = """
+(selector) => Array.from(document.querySelectorAll(selector)).map((tile) => {
+    const text = (css) => {
+        const el = tile.querySelector(css);
+        return el ? el.innerText : null;
+    };
+    const img = tile.querySelector('img');
+    const link = tile.querySelector('a[href]');
+    return {
+        testid: tile.getAttribute('data-testid'),
+        name: text('p[data-testid="product-title"]'),
+        subtitle: text('p[data-testid="product-subtitle"]'),
+        imageUrl: img ? img.getAttribute('src') : null,
+        dollars: text('p[data-testid="price-dollars"]'),
+        cents: text('p[data-testid="price-cents"]'),
+        href: link ? link.getAttribute('href') : null,
+    };
+})
+"""
+
+# Runs in the page: reads every field of a product detail page in one go.
+PRODUCT_SCRIPT = """
+() => {
+    const text = (css) => {
+        const el = document.querySelector(css);
+        return el ? el.innerText : null;
+    };
+    const breadcrumbs = [];
+    if (document.querySelector('nav[aria-label="Breadcrumbs"]')) {
+        for (let i = 0; i < 3; i++) {
+            const crumb = text(`[data-testid="product-category-${i}"] p`);
+            if (crumb) breadcrumbs.push(crumb);
+        }
+    }
+    let nutrition = null;
+    const table = document.querySelector('table.fs-nutritional-info');
+    if (table) {
+        nutrition = [];
+        for (const row of table.querySelectorAll('tr')) {
+            const cols = row.querySelectorAll('td');
+            if (cols.length >= 2) nutrition.push([cols[0].innerText, cols[1].innerText]);
+        }
+    }
+    const img = document.querySelector('img[data-testid="product-image"]');
+    return {
+        breadcrumbs: breadcrumbs,
+        name: text('[data-testid="product-title"]'),
+        description: text('div.fs-product-details__description'),
+        nutrition: nutrition,
+        ingredients: text('div.fs-product-details__ingredients'),
+        brand: text('div.fs-product-details__brand'),
+        dollars: text('p[data-testid="price-dollars"]'),
+        cents: text('p[data-testid="price-cents"]'),
+        subtitle: text('[data-testid="product-subtitle"]'),
+        imageUrl: img ? img.getAttribute('src') : null,
+        promotion: text('div.fs-product-details__promotion'),
+    };
+}
+"""
+
+
+async def extract_listing_tiles(page: Page, selector: str = TILE_SELECTOR) -> List[Dict]:
+    """Return the raw fields of every product tile on the current listing page."""
+    return await page.evaluate(LISTING_SCRIPT, selector)
+
+
+async def extract_product_page(page: Page) -> Dict:
+    """Return the raw fields of the current product detail page."""
+    return await page.evaluate(PRODUCT_SCRIPT)
@@ -0,0 +1,66 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import warnings
+from typing import List, Optional, Tuple
+
+import numpy as np
+import torch
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+
+def table_hash(table) -> str:
+    """Stable hash of a JSON-serialisable table, e.g. the classifier's keyword table."""
+    encoded = json.dumps(table, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+def model_slug(model_name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+
+
+class EmbeddingCache:
+    """Embeddings stored as a .npy matrix plus a JSON index of the strings, one per row.
+
+    The matrix is loaded memory-mapped and read-only, so a warm start reads no more
+    than it touches and worker processes share the same page cache.
+    """
+
+    def __init__(self, directory: str, name: str, key: str = ''):
+        self.key = key
+        self.matrix_path = os.path.join(directory, f"{name}.npy")
+        self.index_path = os.path.join(directory, f"{name}.json")
+        os.makedirs(directory, exist_ok=True)
+
+    def load(self) -> Tuple[List[str], Optional[torch.Tensor]]:
+        """The cached strings and their embeddings, or ([], None) if missing or stale."""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            matrix = np.load(self.matrix_path, mmap_mode='r')
+        except (OSError, ValueError) as e:
+            logging.debug(f"No usable embedding cache at {self.matrix_path}: {e}")
+            return [], None
+        # The index is written after the matrix, so a mismatch means a write was interrupted
+        if index.get('key') != self.key or len(index.get('strings', [])) != matrix.shape[0]:
+            return [], None
+        with warnings.catch_warnings():
+            # The tensor is never written to, so sharing the read-only map is safe
+            warnings.simplefilter('ignore', UserWarning)
+            return index['strings'], torch.from_numpy(matrix)
+
+    def save(self, strings: List[str], embeddings: torch.Tensor):
+        matrix = embeddings.detach().cpu().numpy().astype(np.float32, copy=False)
+        tmp_matrix = f"{self.matrix_path}.tmp.npy"
+        np.save(tmp_matrix, matrix)
+        os.replace(tmp_matrix, self.matrix_path)
+
+        tmp_index = f"{self.index_path}.tmp"
+        with open(tmp_index, 'w', encoding='utf-8') as f:
+            json.dump({'key': self.key, 'strings': list(strings)}, f, ensure_ascii=False)
+        os.replace(tmp_index, self.index_path)
+        logging.info(f"Cached {len(strings)} embeddings in {self.matrix_path}")
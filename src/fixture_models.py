@@ -0,0 +1,43 @@
+import zlib
+from typing import List
+
+import torch
+
+# Offline stand-ins for the classifier's model and word lists, shared by benchmarks.py and the tests
+
+
+class HashingEncoder:
+    """A deterministic stand-in for SentenceTransformer: signed hashes of character trigrams, no download."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self.calls = 0
+
+    def encode(self, sentences, convert_to_tensor: bool = False, batch_size: int = 32, **kwargs):
+        self.calls += 1
+        single = isinstance(sentences, str)
+        batch = [sentences] if single else list(sentences)
+        vectors = torch.zeros(len(batch), self.dim)
+        for row, sentence in enumerate(batch):
+            padded = f"  {sentence.lower()} "
+            for start in range(len(padded) - 2):
+                digest = zlib.crc32(padded[start:start + 3].encode('utf-8'))
+                vectors[row, digest % self.dim] += 1.0 if digest & 0x10000 else -1.0
+        result = vectors[0] if single else vectors
+        return result if convert_to_tensor else result.numpy()
+
+
+def fixture_word_counts(path: str) -> List[tuple]:
+    """(word, count) pairs from unmatched_keywords.txt, most common first."""
+    counts = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if ':' in line and not line.startswith('#'):
+                word, count = line.rsplit(':', 1)
+                counts.append((word.strip(), int(count)))
+    return counts
+
+
+def fixture_words(path: str) -> List[str]:
+    """The words from unmatched_keywords.txt, most common first."""
+    return [word for word, _ in fixture_word_counts(path)]
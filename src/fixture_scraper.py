@@ -0,0 +1,44 @@
+import re
+from typing import Dict, Optional
+
+from fixture_server import FixtureServer
+from scraper import ScraperConfig
+
+# Scraper helpers shared by benchmarks.py and the tests
+
+
+def fixture_config(server: FixtureServer) -> ScraperConfig:
+    """A ScraperConfig pointed at the fixture server with politeness delays switched off."""
+    return ScraperConfig(base_url=server.base_url, page_load_delay=0, host_requests_per_second=0, proxy_list=[],
+                         navigation_delay=(0, 0), listing_delay=(0, 0), headless=True)
+
+
+async def legacy_extract_product_data(entry) -> Optional[Dict]:
+    """The old listing-tile extraction: a query_selector plus a read per field."""
+    product = {"sourceSite": "paknsave.co.nz"}
+    name_element = await entry.query_selector('p[data-testid="product-title"]')
+    if name_element:
+        product_name = await name_element.inner_text()
+        product["name"] = product_name.strip() if product_name else None
+
+    subtitle_element = await entry.query_selector('p[data-testid="product-subtitle"]')
+    if subtitle_element:
+        product["subtitle"] = (await subtitle_element.inner_text()).strip()
+
+    img_element = await entry.query_selector('img')
+    if img_element:
+        product["imageUrl"] = await img_element.get_attribute("src")
+
+    price_element = await entry.query_selector('p[data-testid="price-dollars"]')
+    if price_element:
+        price_dollars = await price_element.inner_text()
+        cents_element = await entry.query_selector('p[data-testid="price-cents"]')
+        price_cents = await cents_element.inner_text() if cents_element else "00"
+        product["price"] = f"{price_dollars}.{price_cents}"
+
+    data_testid = await entry.get_attribute("data-testid")
+    if data_testid:
+        match = re.search(r'product-(\d+)-', data_testid)
+        product["product_id"] = f"pk{match.group(1)}" if match else None
+
+    return product if product.get("name") else None
@@ -0,0 +1,443 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs, unquote
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# A recording is a directory of HTML files plus this manifest of page key -> file name
+MANIFEST_NAME = 'manifest.json'
+
+CATEGORY_NAMES = ['Fresh Foods & Bakery', 'Chilled, Frozen & Desserts', 'Pantry', 'Drinks', 'Household & Cleaning']
+
+
+def page_key(url: str) -> str:
+    """The path and query of a URL, which is how recorded pages are looked up."""
+    parsed = urlparse(url)
+    return f"{parsed.path or '/'}?{parsed.query}" if parsed.query else (parsed.path or '/')
+
+
+def category_slug(name: str) -> str:
+    """Build the category slug the same way PaknSaveScraper.fetch_categories does."""
+    url_name = re.sub(r'[^a-zA-Z0-9 ]', '', name.lower()).replace(" & ", "-and-").replace(" ", "-")
+    return url_name.replace("--", "-and-")
+
+
+class FixtureCatalogue:
+    """A deterministic fake Pak'nSave catalogue rendered as static HTML."""
+
+    def __init__(self, categories: int = 3, pages: int = 2, products_per_page: int = 10):
+        self.categories = {}
+        product_number = 5000000
+        for name in (CATEGORY_NAMES * ((categories // len(CATEGORY_NAMES)) + 1))[:categories]:
+            slug = category_slug(name)
+            if slug in self.categories:
+                name = f"{name} {len(self.categories)}"
+                slug = category_slug(name)
+            listing_pages = []
+            for _ in range(pages):
+                listing_pages.append(list(range(product_number, product_number + products_per_page)))
+                product_number += products_per_page
+            self.categories[slug] = {'name': name, 'pages': listing_pages}
+
+        self.products = {}
+        for slug, category in self.categories.items():
+            for page_products in category['pages']:
+                for number in page_products:
+                    self.products[number] = {
+                        'id': number,
+                        'name': f"Fixture Product {number} 500g",
+                        'subtitle': '500g',
+                        'dollars': str(number % 20 + 1),
+                        'cents': f"{number % 100:02d}",
+                        'breadcrumbs': [category['name'], f"Aisle {number % 7}", f"Shelf {number % 3}"],
+                    }
+
+    def total_products(self) -> int:
+        return len(self.products)
+
+    def render_menu(self) -> str:
+        buttons = ''.join(f'<button class="_177qnsx7">{c["name"]}</button>' for c in self.categories.values())
+        return f'<div><a><span>Groceries</span></a></div><div>{buttons}</div>'
+
+    def render_listing(self, slug: str, page_number: int) -> str:
+        category = self.categories[slug]
+        tiles = []
+        for number in category['pages'][page_number - 1]:
+            product = self.products[number]
+            tiles.append(
+                f'<div data-testid="product-{number}-EA-000">'
+                f'<a href="/shop/product/{number}_ea_000pns"><img src="/images/{number}.jpg"></a>'
+                f'<p data-testid="product-title">{product["name"]}</p>'
+                f'<p data-testid="product-subtitle">{product["subtitle"]}</p>'
+                f'<p data-testid="price-dollars">{product["dollars"]}</p>'
+                f'<p data-testid="price-cents">{product["cents"]}</p>'
+                f'</div>'
+            )
+        pagination = ''
+        if page_number < len(category['pages']):
+            pagination = f'<a data-testid="pagination-increment" href="/shop/category/{slug}?pg={page_number + 1}">Next</a>'
+        return self.wrap(category['name'], self.render_menu() + ''.join(tiles) + pagination)
+
+    def render_product(self, number: int) -> str:
+        product = self.products[number]
+        crumbs = ''.join(
+            f'<li data-testid="product-category-{i}"><p>{crumb}</p></li>'
+            for i, crumb in enumerate(product['breadcrumbs'])
+        )
+        body = (
+            f'<nav aria-label="Breadcrumbs"><ol>{crumbs}</ol></nav>'
+            f'<h1 data-testid="product-title">{product["name"]}</h1>'
+            f'<p data-testid="product-subtitle">{product["subtitle"]}</p>'
+            f'<img data-testid="product-image" src="/images/{number}.jpg">'
+            f'<p data-testid="price-dollars">{product["dollars"]}</p>'
+            f'<p data-testid="price-cents">{product["cents"]}</p>'
+            f'<div class="fs-product-details__description">Description of product {number}</div>'
+            f'<div class="fs-product-details__brand">Fixture Brand</div>'
+            f'<div class="fs-product-details__ingredients">Water, salt</div>'
+            f'<table class="fs-nutritional-info"><tr><td>Energy</td><td>{number % 900}kJ</td></tr>'
+            f'<tr><td>Protein</td><td>{number % 30}g</td></tr></table>'
+        )
+        return self.wrap(product['name'], body)
+
+    @staticmethod
+    def wrap(title: str, body: str) -> str:
+        return f'<!DOCTYPE html><html><head><title>{title}</title></head><body>{body}</body></html>'
+
+
+class BackgroundHTTPServer:
+    """A threaded local HTTP server with injectable latency, run on a background thread."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0, jitter: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.hits: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self.build_handler())
+        self.httpd.daemon_threads = True
+        self.httpd.bytes_sent = 0
+        self.httpd.bytes_lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def bytes_sent(self) -> int:
+        """Response body bytes sent so far."""
+        return self.httpd.bytes_sent
+
+    def record_hit(self, kind: str):
+        with self.lock:
+            self.hits[kind] = self.hits.get(kind, 0) + 1
+
+    def delay(self):
+        """Sleep for the configured latency plus up to `jitter` seconds."""
+        wait = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if wait > 0:
+            time.sleep(wait)
+
+    def build_handler(self):
+        raise NotImplementedError
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        logging.info(f"{type(self).__name__} listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class QuietHandler(BaseHTTPRequestHandler):
+    """Request handler that logs at debug level and can send JSON or HTML bodies."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def send_body(self, status: int, payload: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+        with self.server.bytes_lock:
+            self.server.bytes_sent += len(payload)
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_json(self, status: int, data):
+        self.send_body(status, json.dumps(data).encode('utf-8'), 'application/json')
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def log_message(self, format, *args):
+        logging.debug(format % args)
+
+
+class FixtureServer(BackgroundHTTPServer):
+    """Serve a FixtureCatalogue as Pak'nSave-like category and product pages.
+
+    Usage:
+        with FixtureServer(FixtureCatalogue()) as server:
+            config = ScraperConfig(base_url=server.base_url, proxy_list=[])
+    """
+
+    def __init__(self, catalogue: FixtureCatalogue, beacon_ms: int = 0, image_bytes: int = 0, script_bytes: int = 0,
+                 **kwargs):
+        self.catalogue = catalogue
+        # Size of every product image, to make blocked downloads show up in bytes_sent
+        self.image = b'\0' * image_bytes
+        # Every page loads a cacheable script bundle and stylesheet of this size, like a SPA (0: none)
+        self.script = b'/*' + b' ' * max(0, script_bytes - 4) + b'*/' if script_bytes else b''
+        self.assets = ('<link rel="stylesheet" href="/static/app.css"><script src="/static/app.js"></script>'
+                       if script_bytes else '')
+        # Listing pages ping /beacon this often, like analytics on the real site (0: never)
+        self.beacon_ms = beacon_ms
+        super().__init__(**kwargs)
+
+    def build_handler(self):
+        server = self
+
+        class Handler(QuietHandler):
+            def do_GET(self):
+                server.delay()
+                parsed = urlparse(self.path)
+                parts = [part for part in parsed.path.split('/') if part]
+                try:
+                    if parts[:2] == ['shop', 'category'] and len(parts) >= 3 and parts[2] in server.catalogue.categories:
+                        page_number = int(parse_qs(parsed.query).get('pg', ['1'])[0])
+                        body = server.catalogue.render_listing(parts[2], page_number)
+                        if server.beacon_ms:
+                            beacon = f"<script>setInterval(() => fetch('/beacon'), {server.beacon_ms});</script>"
+                            body = body.replace('</body>', f"{beacon}</body>")
+                        server.record_hit('listing')
+                    elif parts[:2] == ['shop', 'product'] and len(parts) == 3:
+                        body = server.catalogue.render_product(int(parts[2].split('_')[0]))
+                        server.record_hit('product')
+                    elif parts[:1] == ['static'] and server.script:
+                        server.record_hit('static')
+                        content_type = 'text/css' if parsed.path.endswith('.css') else 'application/javascript'
+                        self.send_body(200, server.script, content_type, {'Cache-Control': 'public, max-age=3600'})
+                        return
+                    elif parts[:1] == ['beacon']:
+                        server.record_hit('beacon')
+                        self.send_body(204, b'', 'text/plain')
+                        return
+                    elif parts[:1] == ['images']:
+                        server.record_hit('image')
+                        self.send_body(200, server.image, 'image/jpeg')
+                        return
+                    else:
+                        raise KeyError(parsed.path)
+                except (KeyError, IndexError, ValueError):
+                    self.send_body(404, b'Not found', 'text/plain')
+                    return
+
+                if server.assets:
+                    body = body.replace('</head>', f"{server.assets}</head>")
+                self.send_body(200, body.encode('utf-8'), 'text/html; charset=utf-8')
+
+        return Handler
+
+
+class ReplayServer(BackgroundHTTPServer):
+    """Serve pages recorded by page_recorder.py, exactly as captured.
+
+    Assets the recorder pointed at /external/ or /images/ get an empty 200, so a
+    replayed crawl never leaves the machine; anything not recorded is a 404.
+    """
+
+    def __init__(self, directory: str, **kwargs):
+        with open(os.path.join(directory, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.pages: Dict[str, bytes] = {}
+        for key, filename in manifest['pages'].items():
+            with open(os.path.join(directory, filename), 'rb') as f:
+                self.pages[key] = f.read()
+        logging.info(f"Loaded {len(self.pages)} recorded pages of {manifest.get('base_url')}")
+        super().__init__(**kwargs)
+
+    def page(self, path: str) -> Optional[bytes]:
+        return self.pages.get(page_key(path))
+
+    def build_handler(self):
+        server = self
+
+        class Handler(QuietHandler):
+            def do_GET(self):
+                server.delay()
+                body = server.page(self.path)
+                if body is not None:
+                    server.record_hit('product' if '/shop/product/' in self.path else 'listing')
+                    self.send_body(200, body, 'text/html; charset=utf-8')
+                elif self.path.startswith(('/external/', '/images/')):
+                    server.record_hit('asset')
+                    self.send_body(200, b'', 'application/octet-stream')
+                else:
+                    server.record_hit('missing')
+                    self.send_body(404, b'Not found', 'text/plain')
+
+        return Handler
+
+class StubFrappeServer(BackgroundHTTPServer):
+    """An in-memory stand-in for the Frappe `Product Item` REST resource."""
+
+    resource_path = '/api/resource/Product Item'
+
+    def __init__(self, **kwargs):
+        self.docs: Dict[str, Dict] = {}
+        super().__init__(**kwargs)
+
+    @property
+    def resource_url(self) -> str:
+        return f"{self.base_url}/api/resource/Product%20Item"
+
+    def find(self, filters) -> List[Dict]:
+        """Return docs matching Frappe-style filters ({field: value} or [[field, op, value], ...])."""
+        if isinstance(filters, dict):
+            filters = [[field, '=', value] for field, value in filters.items()]
+        matches = []
+        for doc in self.docs.values():
+            for field, op, value in (f[-3:] for f in filters):
+                if op == '=' and doc.get(field) != value:
+                    break
+                if op == 'in' and doc.get(field) not in value:
+                    break
+            else:
+                matches.append(doc)
+        return matches
+
+    def insert(self, doc: Dict) -> Dict:
+        with self.lock:
+            doc = dict(doc, name=f"PI-{len(self.docs) + 1:06d}")
+            doc.pop('doctype', None)
+            self.docs[doc['name']] = doc
+        return doc
+
+    def build_handler(self):
+        server = self
+
+        class Handler(QuietHandler):
+            def route(self):
+                parsed = urlparse(self.path)
+                path = unquote(parsed.path)
+                if not path.startswith(server.resource_path):
+                    return None, parsed
+                return path[len(server.resource_path):].strip('/'), parsed
+
+            def do_GET(self):
+                server.delay()
+                name, parsed = self.route()
+                if name is None:
+                    return self.send_json(404, {'exc_type': 'DoesNotExistError'})
+                server.record_hit('GET')
+                if name:
+                    doc = server.docs.get(name)
+                    return self.send_json(200, {'data': doc}) if doc else self.send_json(404, {'exc_type': 'DoesNotExistError'})
+
+                query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+                filters = json.loads(query['filters']) if 'filters' in query else {}
+                if 'product_id' in query:
+                    filters = {'product_id': query['product_id']}
+                fields = json.loads(query.get('fields', '["name"]'))
+                start = int(query.get('limit_start', 0))
+                length = int(query.get('limit_page_length', 20))
+                rows = server.find(filters)
+                rows = rows[start:start + length] if length else rows[start:]
+                self.send_json(200, {'data': [{field: row.get(field) for field in fields} for row in rows]})
+
+            def do_PUT(self):
+                server.delay()
+                name, _ = self.route()
+                server.record_hit('PUT')
+                if not name or name not in server.docs:
+                    return self.send_json(404, {'exc_type': 'DoesNotExistError'})
+                with server.lock:
+                    server.docs[name].update(self.read_json())
+                self.send_json(200, {'data': server.docs[name]})
+
+            def do_POST(self):
+                server.delay()
+                path = urlparse(self.path).path
+                if path == '/api/method/frappe.client.insert_many':
+                    server.record_hit('insert_many')
+                    docs = json.loads(self.read_json()['docs'])
+                    return self.send_json(200, {'message': [server.insert(doc)['name'] for doc in docs]})
+                if path == '/api/method/frappe.client.bulk_update':
+                    server.record_hit('bulk_update')
+                    failed_docs = []
+                    for doc in json.loads(self.read_json()['docs']):
+                        with server.lock:
+                            if doc.get('docname') in server.docs:
+                                server.docs[doc['docname']].update(doc)
+                            else:
+                                failed_docs.append({'doc': doc, 'exc': 'DoesNotExistError'})
+                    return self.send_json(200, {'message': {'failed_docs': failed_docs}})
+
+                name, _ = self.route()
+                server.record_hit('POST')
+                if name is None or name:
+                    return self.send_json(404, {'exc_type': 'DoesNotExistError'})
+                self.send_json(200, {'data': server.insert(self.read_json())})
+
+        return Handler
+
+
+if __name__ == "__main__":
+    fixture_server = FixtureServer(FixtureCatalogue(), port=8765)
+    fixture_server.start()
+    print(f"Serving {fixture_server.catalogue.total_products()} fixture products at {fixture_server.base_url}")
+    try:
+        fixture_server.thread.join()
+    except KeyboardInterrupt:
+        fixture_server.stop()
+
+
+class ThrottledHost:
+    """A simulated site that serves `capacity` requests per second, like nginx's limit_req.
+
+    Requests beyond that rate queue, so responses slow down, until `burst` are
+    waiting; past that it answers 429 at once. Times are in site-seconds of
+    `scale` real seconds each, so a long crawl runs in a few real seconds.
+    """
+
+    def __init__(self, capacity: float, latency: float, scale: float, burst: int = 10):
+        self.interval = scale / capacity
+        self.latency = latency * scale
+        self.burst = burst
+        self.next_free = 0.0
+        self.served = 0
+        self.throttled = 0
+
+    async def get(self) -> int:
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self.next_free)
+        if slot - now > self.burst * self.interval:
+            self.throttled += 1
+            await asyncio.sleep(self.latency / 10)
+            return 429
+        self.next_free = slot + self.interval
+        await asyncio.sleep(slot - now + self.latency * random.uniform(0.5, 1.5))
+        self.served += 1
+        return 200
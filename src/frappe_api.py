@@ -1,6 +1,9 @@
 import requests
+import json
 import os
 import logging
+from frappe_client import get_client
+from change_store import is_touch
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,7 +25,7 @@ def check_product_exists(product_id):
         headers = get_headers()
         logging.info(f"Checking if product exists with URL: {url}")
         
-        response = requests.get(url, headers=headers)
+        response = get_client().get(url, headers=headers)
         
         logging.info(f"Response Status Code: {response.status_code}")
         logging.info(f"Response Content: {response.content}")
@@ -43,29 +46,137 @@ def check_product_exists(product_id):
         return False, None
 
 def update_product(existing_product_id, product):
+    """Update a product, raising if Frappe did not accept it."""
+    response = None
     try:
-        response = requests.put(f"{FRAPPE_URL}/{existing_product_id}", json=product, headers=get_headers())
+        response = get_client().put(f"{FRAPPE_URL}/{existing_product_id}", json=product, headers=get_headers())
         response.raise_for_status()
-        logging.info(f"Successfully updated product in Frappe: {product['productname']}")
+        logging.info(f"Successfully updated product in Frappe: {product.get('productname', product['product_id'])}")
     except requests.exceptions.RequestException as e:
         logging.error(f"Failed to update product {existing_product_id}: {e}")
-        logging.error(f"Response content: {response.content if response else 'No response content'}")
+        logging.error(f"Response content: {response.content if response is not None else 'No response content'}")
+        raise
 
 def create_product(product):
+    """Create a product, raising if Frappe did not accept it."""
+    response = None
     try:
-        response = requests.post(FRAPPE_URL, json=product, headers=get_headers())
+        response = get_client().post(FRAPPE_URL, json=product, headers=get_headers())
         response.raise_for_status()
-        logging.info(f"Successfully created product in Frappe: {product['productname']}")
+        logging.info(f"Successfully created product in Frappe: {product.get('productname', product['product_id'])}")
     except requests.exceptions.RequestException as e:
         logging.error(f"Failed to create product: {e}")
-        logging.error(f"Response content: {response.content if response else 'No response content'}")
+        logging.error(f"Response content: {response.content if response is not None else 'No response content'}")
+        raise
 
 def test_write_to_frappe(product):
+    """Create or update a product. Write errors propagate, so a sink never counts a failed write as written."""
+    name = product.get('productname', product['product_id'])
     exists, existing_product = check_product_exists(product['product_id'])
     
     if exists:
-        logging.info(f"Product {product['productname']} already exists. Updating...")
+        logging.info(f"Product {name} already exists. Updating...")
         update_product(existing_product['name'], product)
+    elif is_touch(product):
+        logging.warning(f"Skipping last_checked touch for unknown product {name}")
     else:
-        logging.info(f"Product {product['productname']} does not exist. Creating new entry...")
+        logging.info(f"Product {name} does not exist. Creating new entry...")
         create_product(product)
+
+async def write_to_frappe_async(client, product):
+    """Create or update a product through an AsyncFrappeClient, like test_write_to_frappe."""
+    name = product.get('productname', product['product_id'])
+    status, data = await client.request('GET', FRAPPE_URL, params={'product_id': product['product_id']}, headers=get_headers())
+    if status == 200 and data and data.get('data'):
+        logging.info(f"Product {name} already exists. Updating...")
+        status, data = await client.request('PUT', f"{FRAPPE_URL}/{data['data'][0]['name']}", json=product, headers=get_headers())
+    elif is_touch(product):
+        logging.warning(f"Skipping last_checked touch for unknown product {name}")
+        return
+    else:
+        logging.info(f"Product {name} does not exist. Creating new entry...")
+        status, data = await client.request('POST', FRAPPE_URL, json=product, headers=get_headers())
+
+    if status >= 400:
+        raise RuntimeError(f"Failed to write product {name}: {status} - {data}")
+    logging.info(f"Successfully wrote product to Frappe: {name}")
+
+
+# Bulk API: list/insert_many/bulk_update calls that move many products per request
+
+FRAPPE_DOCTYPE = 'Product Item'
+FRAPPE_MAX_BATCH = 200  # frappe.client.insert_many refuses more than 200 docs
+
+
+def get_method_url(method):
+    base_url = FRAPPE_URL.split('/api/resource/')[0]
+    return f"{base_url}/api/method/{method}"
+
+def fetch_product_index(page_size=1000):
+    """Return {product_id: docname} for every existing Product Item, one page per request.
+
+    Request errors are raised so callers can fall back to a saved index.
+    """
+    index = {}
+    start = 0
+    while True:
+        params = {
+            'fields': json.dumps(['name', 'product_id']),
+            'limit_start': start,
+            'limit_page_length': page_size
+        }
+        response = get_client().get(FRAPPE_URL, params=params, headers=get_headers())
+        response.raise_for_status()
+        rows = response.json().get('data', [])
+        for row in rows:
+            if row.get('product_id'):
+                index[row['product_id']] = row['name']
+        if len(rows) < page_size:
+            break
+        start += page_size
+    logging.info(f"Fetched {len(index)} existing product names from Frappe")
+    return index
+
+def fetch_docnames(product_ids):
+    """Return {product_id: docname} for the given product ids in a single list call."""
+    if not product_ids:
+        return {}
+    params = {
+        'fields': json.dumps(['name', 'product_id']),
+        'filters': json.dumps([['product_id', 'in', list(product_ids)]]),
+        'limit_page_length': 0
+    }
+    try:
+        response = get_client().get(FRAPPE_URL, params=params, headers=get_headers())
+        response.raise_for_status()
+        return {row['product_id']: row['name'] for row in response.json().get('data', [])}
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Failed to look up docnames: {e}")
+        return {}
+
+def insert_products(products):
+    """Create up to FRAPPE_MAX_BATCH products in one request."""
+    docs = [dict(product, doctype=FRAPPE_DOCTYPE) for product in products]
+    try:
+        response = get_client().post(get_method_url('frappe.client.insert_many'), json={'docs': json.dumps(docs)}, headers=get_headers())
+        response.raise_for_status()
+        logging.info(f"Successfully created {len(docs)} products in Frappe")
+        return True
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Failed to create {len(docs)} products: {e}")
+        return False
+
+def bulk_update_products(updates):
+    """Update up to FRAPPE_MAX_BATCH products in one request; `updates` is a list of (docname, product)."""
+    docs = [dict(product, doctype=FRAPPE_DOCTYPE, docname=docname) for docname, product in updates]
+    try:
+        response = get_client().post(get_method_url('frappe.client.bulk_update'), json={'docs': json.dumps(docs)}, headers=get_headers())
+        response.raise_for_status()
+        failed_docs = response.json().get('message', {}).get('failed_docs', [])
+        for failed in failed_docs:
+            logging.error(f"Failed to update product {failed.get('doc', {}).get('docname')}: {failed.get('exc')}")
+        logging.info(f"Successfully updated {len(docs) - len(failed_docs)} products in Frappe")
+        return not failed_docs
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Failed to update {len(docs)} products: {e}")
+        return False
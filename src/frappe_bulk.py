@@ -0,0 +1,99 @@
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+import requests
+
+import frappe_api
+from change_store import is_touch
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+
+class ProductIndex:
+    """A product_id -> Frappe docname map, persisted as JSON between runs."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.names: Dict[str, str] = {}
+        self.lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.names = json.load(f)
+            logging.info(f"Loaded {len(self.names)} product names from {path}")
+
+    def __contains__(self, product_id: str) -> bool:
+        return product_id in self.names
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def get(self, product_id: str) -> Optional[str]:
+        return self.names.get(product_id)
+
+    def update(self, names: Dict[str, str]):
+        with self.lock:
+            self.names.update(names)
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.names, f)
+            os.replace(tmp_path, self.path)
+        logging.info(f"Saved {len(self.names)} product names to {self.path}")
+
+
+class BulkFrappeWriter:
+    """Writes products to Frappe in batches, using a ProductIndex instead of a GET per product.
+
+    Meant to be the batch_writer of a single-worker FrappeSink: one writer keeps two
+    batches from racing to create the same product.
+    """
+
+    def __init__(self, index: ProductIndex, batch_size: int = frappe_api.FRAPPE_MAX_BATCH):
+        self.index = index
+        self.batch_size = min(batch_size, frappe_api.FRAPPE_MAX_BATCH)
+
+    def prefetch(self):
+        """Refresh the index from Frappe, keeping the saved copy if Frappe can't be reached."""
+        try:
+            self.index.update(frappe_api.fetch_product_index())
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Could not prefetch product names, using {len(self.index)} saved names: {e}")
+
+    def write_batch(self, products: List[Dict]):
+        """Create new products and update known ones, a batch of each per request."""
+        # The same product can show up in several categories; the last copy wins
+        latest = {product['product_id']: product for product in products}
+
+        creates = [product for product_id, product in latest.items() if product_id not in self.index]
+        updates = [(self.index.get(product_id), product) for product_id, product in latest.items() if product_id in self.index]
+
+        # A touch only carries last_checked, so it can't create a missing product
+        for product in creates:
+            if is_touch(product):
+                logging.warning(f"Skipping last_checked touch for unknown product {product['product_id']}")
+        creates = [product for product in creates if not is_touch(product)]
+
+        ok = True
+        for start in range(0, len(updates), self.batch_size):
+            ok = frappe_api.bulk_update_products(updates[start:start + self.batch_size]) and ok
+
+        for start in range(0, len(creates), self.batch_size):
+            chunk = creates[start:start + self.batch_size]
+            if frappe_api.insert_products(chunk):
+                self.index.update(frappe_api.fetch_docnames([product['product_id'] for product in chunk]))
+            else:
+                ok = False
+
+        if not ok:
+            raise RuntimeError(f"Some of a batch of {len(latest)} products were not written")
+
+    def close(self):
+        self.index.save()
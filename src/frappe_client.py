@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+from typing import Dict, Optional, Tuple
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Safe to send twice. A POST (create, insert_many) that timed out or lost its response
+# may already have been written, so it is only resent when it never reached Frappe.
+RETRY_METHODS = frozenset(['GET', 'PUT', 'DELETE'])
+
+# aiohttp errors raised before any of the request was sent
+CONNECT_ERRORS = (aiohttp.ClientConnectorError, aiohttp.ConnectionTimeoutError)
+
+
+class FrappeRetry(Retry):
+    """Retry 429/5xx and read errors with jittered backoff; a POST only on connect errors and 429."""
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method == 'POST':
+            # A 429 means Frappe turned the request away without acting on it
+            return status_code == 429
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+class FrappeClient:
+    """A keep-alive requests.Session with a sized connection pool, retries and timeouts."""
+
+    def __init__(self, pool_size: int = 10, retries: int = 3, backoff_factor: float = 0.5,
+                 backoff_jitter: float = 0.5, timeout: Tuple[float, float] = (5, 30)):
+        self.timeout = timeout
+        retry = FrappeRetry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=RETRY_METHODS,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request('PUT', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_client: Optional[FrappeClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> FrappeClient:
+    """Return the process-wide FrappeClient, sized by FRAPPE_POOL_SIZE."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = FrappeClient(pool_size=int(os.environ.get('FRAPPE_POOL_SIZE', 10)))
+        return _client
+
+
+class AsyncFrappeClient:
+    """The asyncio counterpart of FrappeClient, on a pooled aiohttp session.
+
+    Create it inside the running event loop and close it when done.
+    """
+
+    def __init__(self, pool_size: int = 10, retries: int = 3, backoff_factor: float = 0.5,
+                 backoff_jitter: float = 0.5, timeout: float = 30, connect_timeout: float = 5):
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_jitter = backoff_jitter
+        # A separate connect timeout, so a POST that never connected can be told from one that timed out later
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=pool_size),
+            timeout=aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        )
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff_factor * (2 ** attempt) + random.uniform(0, self.backoff_jitter)
+
+    async def request(self, method: str, url: str, **kwargs) -> Tuple[int, Optional[Dict]]:
+        """Send a request and return (status, parsed JSON body or None), retrying 429/5xx and connection errors.
+
+        A POST is only retried on 429 and on errors from before it was sent, like FrappeRetry.
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                async with self.session.request(method, url, **kwargs) as response:
+                    retryable = response.status == 429 or (response.status in RETRY_STATUSES and method in RETRY_METHODS)
+                    if retryable and attempt < self.retries:
+                        delay = self.backoff(attempt, response.headers.get('Retry-After'))
+                        logging.warning(f"Frappe returned {response.status} for {method} {url}, retrying in {delay:.1f}s")
+                        await asyncio.sleep(delay)
+                        continue
+                    try:
+                        data = await response.json(content_type=None)
+                    except ValueError:
+                        data = None
+                    return response.status, data
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= self.retries or (method not in RETRY_METHODS and not isinstance(e, CONNECT_ERRORS)):
+                    raise
+                delay = self.backoff(attempt)
+                logging.warning(f"Request to {url} failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def close(self):
+        await self.session.close()
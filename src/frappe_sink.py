@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+from frappe_api import test_write_to_frappe
+from metrics import Metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+
+class FrappeSink:
+    """Decouples Frappe writes from scraping with a bounded queue and a pool of writer tasks.
+
+    `put` blocks while the queue is full, so a slow Frappe slows the scrapers down
+    instead of letting unwritten products pile up in memory. With a `batch_writer`
+    each worker hands over everything already queued, up to `batch_size` products.
+    `on_written` is called with every list of products Frappe accepted. `prepare`
+    turns whatever `put` is given into the Frappe payload to queue, or None to skip it.
+    With `metrics`, every write is timed as the 'sink_write' stage.
+    """
+
+    def __init__(self, writer: Callable[[Dict], object] = test_write_to_frappe, workers: int = 4, queue_size: int = 100,
+                 batch_writer: Optional[Callable[[List[Dict]], object]] = None, batch_size: int = 50,
+                 on_written: Optional[Callable[[List[Dict]], None]] = None,
+                 prepare: Optional[Callable[[object], Optional[Dict]]] = None,
+                 metrics: Optional[Metrics] = None):
+        self.writer = writer
+        self.prepare = prepare
+        self.metrics = metrics
+        self.batch_writer = batch_writer
+        self.batch_size = max(1, batch_size)
+        self.on_written = on_written
+        self.workers = max(1, workers)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+        self.tasks: List[asyncio.Task] = []
+        self.written = 0
+        self.failed = 0
+
+    def start(self):
+        """Start the writer tasks if they are not already running."""
+        if not self.tasks:
+            self.tasks = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+
+    async def put(self, product):
+        """Queue a product, waiting while the queue is full.
+
+        Without `prepare` the product must already be Frappe-formatted.
+        """
+        if self.prepare:
+            product = self.prepare(product)
+            if product is None:
+                return
+        self.start()
+        await self.queue.put(product)
+
+    async def call(self, func: Callable, arg):
+        if asyncio.iscoroutinefunction(func):
+            await func(arg)
+        else:
+            # The requests-based writers block, so keep them off the event loop
+            await asyncio.to_thread(func, arg)
+
+    async def take(self) -> List[Optional[Dict]]:
+        """Wait for one queued item, then grab whatever else is ready for a batch."""
+        items = [await self.queue.get()]
+        while self.batch_writer and items[-1] is not None and len(items) < self.batch_size and not self.queue.empty():
+            items.append(self.queue.get_nowait())
+        return items
+
+    async def worker(self):
+        while True:
+            items = await self.take()
+            products = [item for item in items if item is not None]
+            started = time.perf_counter()
+            try:
+                if self.batch_writer and products:
+                    await self.call(self.batch_writer, products)
+                elif products:
+                    await self.call(self.writer, products[0])
+                    logging.info(f"Successfully sent product to Frappe: {products[0].get('productname', products[0].get('product_id'))}")
+                self.written += len(products)
+                if self.metrics and products:
+                    self.metrics.observe('sink_write', time.perf_counter() - started)
+                    self.metrics.inc('frappe_written', len(products))
+                if self.on_written and products:
+                    self.on_written(products)
+            except Exception as e:
+                self.failed += len(products)
+                if self.metrics:
+                    self.metrics.inc('frappe_failed', len(products))
+                logging.error(f"Error writing {len(products)} product(s) to Frappe: {e}")
+            finally:
+                for _ in items:
+                    self.queue.task_done()
+            if len(products) < len(items):
+                return
+
+    async def close(self):
+        """Wait for every queued product to be written, then stop the writers."""
+        if not self.tasks:
+            return
+        for _ in self.tasks:
+            await self.queue.put(None)
+        await asyncio.gather(*self.tasks)
+        self.tasks = []
+        logging.info(f"Frappe sink finished: {self.written} written, {self.failed} failed")
@@ -1,4 +1,5 @@
 import requests
+from frappe_client import get_client
 import os
 import logging
 
@@ -15,7 +16,7 @@ def check_product_exists(product_id):
         'Authorization': f'token {FRAPPE_API_KEY}:{FRAPPE_API_SECRET}',
         'Content-Type': 'application/json'
     }
-    response = requests.get(f"{FRAPPE_URL}/{product_id}", headers=headers, verify=False)
+    response = get_client().get(f"{FRAPPE_URL}/{product_id}", headers=headers, verify=False)
     if response.status_code == 200:
         return True, response.json()
     elif response.status_code == 404:
@@ -29,7 +30,7 @@ def update_product(product_id, product):
         'Authorization': f'token {FRAPPE_API_KEY}:{FRAPPE_API_SECRET}',
         'Content-Type': 'application/json'
     }
-    response = requests.put(f"{FRAPPE_URL}/{product_id}", json=product, headers=headers)
+    response = get_client().put(f"{FRAPPE_URL}/{product_id}", json=product, headers=headers)
     response.raise_for_status()
     logging.info(f"Successfully updated product in Frappe: {product['productname']}")
 
@@ -39,7 +40,7 @@ def create_product(product):
         'Content-Type': 'application/json',
         'Expect': ''
     }
-    response = requests.post(FRAPPE_URL, json=product, headers=headers)
+    response = get_client().post(FRAPPE_URL, json=product, headers=headers)
     
     try:
         response.raise_for_status()
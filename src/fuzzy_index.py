@@ -0,0 +1,89 @@
+import heapq
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+
+def _ratio(matches: int, length: int) -> float:
+    # The same float arithmetic as difflib, so borderline scores compare the same way
+    if length:
+        return 2.0 * matches / length
+    return 1.0
+
+
+class FuzzyIndex:
+    """A prebuilt index that answers difflib.get_close_matches over a fixed list of strings.
+
+    It applies difflib's own upper bounds without a SequenceMatcher per string:
+    real_quick_ratio becomes a slice of the strings sorted by length, and quick_ratio
+    becomes shared character counts, read from a strings x characters count matrix.
+    Candidates reach SequenceMatcher.ratio best bound first, and the search stops
+    once no bound can beat the current n best. The result is exactly what
+    get_close_matches returns, ties included.
+    """
+
+    def __init__(self, strings: Iterable[str]):
+        self.strings: List[str] = sorted(dict.fromkeys(strings), key=len)
+        self.lengths = np.array([len(string) for string in self.strings], dtype=np.int64)
+        self.distinct_lengths = sorted(set(self.lengths.tolist()))
+        self.alphabet = {char: column for column, char in enumerate(sorted({c for s in self.strings for c in s}))}
+        self.counts = np.zeros((len(self.strings), len(self.alphabet)), dtype=np.int64)
+        for row, string in enumerate(self.strings):
+            for char, count in Counter(string).items():
+                self.counts[row, self.alphabet[char]] = count
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def window(self, word_length: int, cutoff: float) -> Tuple[int, int]:
+        """Rows whose length passes real_quick_ratio; the passing lengths form one interval."""
+        passing = [length for length in self.distinct_lengths
+                   if _ratio(min(length, word_length), length + word_length) >= cutoff]
+        if not passing:
+            return 0, 0
+        return (int(np.searchsorted(self.lengths, passing[0], side='left')),
+                int(np.searchsorted(self.lengths, passing[-1], side='right')))
+
+    def close_matches(self, word: str, n: int = 3, cutoff: float = 0.6) -> List[str]:
+        """Same arguments and result as difflib.get_close_matches(word, strings, n, cutoff)."""
+        if not n > 0:
+            raise ValueError(f"n must be > 0: {n!r}")
+        if not 0.0 <= cutoff <= 1.0:
+            raise ValueError(f"cutoff must be in [0.0, 1.0]: {cutoff!r}")
+
+        start, stop = self.window(len(word), cutoff)
+        if start == stop:
+            return []
+
+        word_counts = [(self.alphabet[char], count) for char, count in Counter(word).items() if char in self.alphabet]
+        if word_counts:
+            columns, counts = zip(*word_counts)
+            shared = np.minimum(self.counts[start:stop, list(columns)], np.array(counts)).sum(axis=1)
+        else:
+            shared = np.zeros(stop - start, dtype=np.int64)
+        # Float64 division rounds exactly as difflib's does
+        bounds = 2.0 * shared / (self.lengths[start:stop] + len(word))
+        rows = np.flatnonzero(bounds >= cutoff)
+
+        # Best upper bound first: once the bound drops below the n-th best ratio found,
+        # nothing left can make the list (an equal bound can still win a tie, so keep going)
+        matcher = SequenceMatcher()
+        matcher.set_seq2(word)
+        best: List[Tuple[float, str]] = []
+        for row in rows[np.argsort(-bounds[rows], kind='stable')].tolist():
+            if len(best) == n and bounds[row] < best[0][0]:
+                break
+            string = self.strings[start + row]
+            matcher.set_seq1(string)
+            ratio = matcher.ratio()
+            if ratio < cutoff:
+                continue
+            if len(best) < n:
+                heapq.heappush(best, (ratio, string))
+            elif (ratio, string) > best[0]:
+                heapq.heapreplace(best, (ratio, string))
+
+        # Like difflib, equal scores go to the larger string
+        return [string for _, string in sorted(best, reverse=True)]
@@ -0,0 +1,195 @@
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Upper bounds in seconds: 1ms to 2 minutes, roughly x2.5 apart
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram: observing is a bisect and three additions."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # the last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile as the upper bound of the bucket it falls in; None past the largest bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None  # JSON has no Infinity
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'total_s': round(self.sum, 3),
+            'mean_ms': round(self.sum / self.count * 1000, 2) if self.count else 0.0,
+            'p50_le_s': self.quantile(0.5),
+            'p95_le_s': self.quantile(0.95),
+        }
+
+
+class Metrics:
+    """Per-stage latency histograms and counters for one crawl.
+
+    Everything runs on the event loop thread, so updates take no lock. The
+    metrics endpoint reads from its own thread: it copies the dicts before
+    iterating them, since the loop can add a stage or counter mid-read, and a
+    histogram it reads may be one observation out of date.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {}
+        self.started = time.time()
+
+    def inc(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, stage: str, seconds: float):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+    def timer(self, stage: str) -> 'StageTimer':
+        """Time the body of a `with` block (async code included) into the `stage` histogram."""
+        return StageTimer(self, stage)
+
+    def summary(self) -> Dict:
+        return {
+            'started': self.started,
+            'elapsed_s': round(time.time() - self.started, 3),
+            'counters': dict(self.counters),
+            'stages': {stage: histogram.summary() for stage, histogram in list(self.histograms.items())},
+        }
+
+    def prometheus_text(self, prefix: str = 'scraper') -> str:
+        """The metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        # sorted() copies each dict before any of the loop runs, like summary() does
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        histograms = sorted(self.histograms.items())
+        if histograms:
+            metric = f"{prefix}_stage_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for stage, histogram in histograms:
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{metric}_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'{metric}_count{{stage="{stage}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def save(self, path: str):
+        """Write the JSON summary atomically."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=4)
+        os.replace(tmp_path, path)
+
+
+class StageTimer:
+    """A `with` block timer; a plain class because a generator-based context manager costs about twice as much."""
+    __slots__ = ('metrics', 'stage', 'started')
+
+    def __init__(self, metrics: Metrics, stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class MetricsServer:
+    """Serves a Metrics registry at /metrics (Prometheus text) and /metrics.json from a daemon thread."""
+
+    def __init__(self, metrics: Metrics, port: int = 9108, host: str = '127.0.0.1'):
+        self.metrics = metrics
+        self.httpd = ThreadingHTTPServer((host, port), self.build_handler())
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def build_handler(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body, content_type = metrics.prometheus_text(), 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body, content_type = json.dumps(metrics.summary()), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                payload = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        logging.info(f"Serving crawl metrics at {self.url}")
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 2:
+        print("Usage: python metrics.py crawl_metrics.json")
+        sys.exit(1)
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        summary = json.load(f)
+    print(f"Run took {summary['elapsed_s']}s")
+    for name, value in sorted(summary['counters'].items()):
+        print(f"  {name:<20} {value}")
+    for stage, stats in sorted(summary['stages'].items(), key=lambda item: -item[1]['total_s']):
+        print(f"  {stage:<20} {stats['count']:>7} calls  {stats['total_s']:>9.1f}s total  "
+              f"{stats['mean_ms']:>8.1f}ms mean  p95<={stats['p95_le_s'] or f'>{DEFAULT_BUCKETS[-1]}'}s")
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import logging
+import os
+import re
+from typing import Dict
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright
+
+from dom_extract import extract_listing_tiles
+from fixture_server import MANIFEST_NAME, page_key
+from scraper import PaknSaveScraper, ScraperConfig
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# The DOM is saved after the site's scripts have rendered it, so replays need none of them
+STRIP_TAGS = re.compile(r'<(script|noscript|iframe)\b[^>]*>.*?</\1\s*>|<link\b[^>]*>', re.I | re.S)
+ABSOLUTE_URL = re.compile(r'\b(src|href|srcset)="https?://([^"/]*)([^"]*)"', re.I)
+
+
+def localise(html: str, site_host: str) -> str:
+    """Strip scripts and make every absolute URL local, so a replay never touches the network."""
+    html = STRIP_TAGS.sub('', html)
+
+    def rewrite(match):
+        attribute, host, path = match.groups()
+        if host == site_host:
+            return f'{attribute}="{path or "/"}"'
+        return f'{attribute}="/external/{host}{path}"'
+
+    return ABSOLUTE_URL.sub(rewrite, html)
+
+
+class PageRecorder:
+    """Writes captured pages into a directory that fixture_server.ReplayServer can serve."""
+
+    def __init__(self, directory: str, base_url: str):
+        self.directory = directory
+        self.base_url = base_url
+        self.site_host = urlparse(base_url).netloc
+        os.makedirs(directory, exist_ok=True)
+        self.pages: Dict[str, str] = {}
+        manifest_path = os.path.join(directory, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                self.pages = json.load(f)['pages']
+
+    def __contains__(self, url: str) -> bool:
+        return page_key(url) in self.pages
+
+    def save(self, url: str, html: str):
+        key = page_key(url)
+        filename = self.pages.get(key) or f"{len(self.pages) + 1:05d}.html"
+        with open(os.path.join(self.directory, filename), 'w', encoding='utf-8') as f:
+            f.write(localise(html, self.site_host))
+        self.pages[key] = filename
+
+    def close(self):
+        with open(os.path.join(self.directory, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+            json.dump({'base_url': self.base_url, 'pages': self.pages}, f, indent=4)
+        logging.info(f"Recorded {len(self.pages)} pages into {self.directory}")
+
+
+async def record_site(base_url: str, directory: str, categories: int = 3, pages: int = 2,
+                      products_per_page: int = 10):
+    """Capture the category menu, a few listing pages per category and their product pages.
+
+    Navigation goes through PaknSaveScraper, so the recording is made with the same
+    politeness delays, rate limit and readiness waits as a real crawl.
+    """
+    config = ScraperConfig(base_url=base_url, proxy_list=[], checkpoint_path=None, skip_unchanged=False,
+                           metrics_path=None, headless=True)
+    scraper = PaknSaveScraper(config)
+    recorder = PageRecorder(directory, base_url)
+    async with async_playwright() as p:
+        scraper.browser = await scraper.initialize_browser(p)
+        try:
+            page = await scraper.new_page()
+            product_page = await scraper.new_page()
+
+            # fetch_categories leaves the menu open; this copy of the page is the one replays need
+            found = await scraper.fetch_categories(page)
+            recorder.save(page.url, await page.content())
+
+            for category in found[:categories]:
+                if not await scraper.safe_get(page, category['url']):
+                    continue
+                await scraper.waiter.listing(page)
+                for _ in range(pages):
+                    if page.url not in recorder:
+                        recorder.save(page.url, await page.content())
+                    tiles = [tile for tile in await extract_listing_tiles(page) if tile.get('href')]
+                    for tile in tiles[:products_per_page]:
+                        product_url = f"{base_url}{tile['href']}"
+                        if await scraper.safe_get(product_page, product_url):
+                            await scraper.waiter.product(product_page)
+                            recorder.save(product_url, await product_page.content())
+
+                    next_page = await page.query_selector('a[data-testid="pagination-increment"]')
+                    if not next_page or not await scraper.paginate(page, next_page):
+                        break
+        finally:
+            recorder.close()
+            await scraper.browser.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Record Pak'nSave pages for offline replay benchmarks")
+    parser.add_argument('directory')
+    parser.add_argument('--base-url', default='https://www.paknsave.co.nz')
+    parser.add_argument('--categories', type=int, default=3)
+    parser.add_argument('--pages', type=int, default=2)
+    parser.add_argument('--products-per-page', type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(record_site(args.base_url, args.directory, args.categories, args.pages, args.products_per_page))
@@ -0,0 +1,109 @@
+import logging
+import time
+from typing import Optional
+
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+
+from dom_extract import TILE_SELECTOR
+from metrics import Metrics
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Runs in the page on every poll: true once the tile count has held steady for `settleMs`,
+# the page has tiles, and the first tile is not the one from before the pagination click.
+TILES_SETTLED_SCRIPT = """
+([selector, previous, settleMs]) => {
+    const tiles = document.querySelectorAll(selector);
+    const first = tiles.length ? tiles[0].getAttribute('data-testid') : null;
+    const now = performance.now();
+    const state = window.__tileWait;
+    if (!state || state.count !== tiles.length || state.first !== first) {
+        window.__tileWait = {count: tiles.length, first: first, since: now};
+        return settleMs <= 0 && tiles.length > 0 && first !== previous;
+    }
+    return tiles.length > 0 && first !== previous && now - state.since >= settleMs;
+}
+"""
+
+
+class PageWaiter:
+    """Waits for pages to be ready by what they show, never for a fixed time.
+
+    Every wait is bounded by `timeout` seconds. Its duration goes into the
+    'wait_<name>' stage histogram and its outcome (ready, timeout or error) into
+    the 'wait_<name>_<outcome>' counter, so the metrics show how long pages take
+    to render. A timed-out wait is not an error: the caller reads what is there.
+    """
+
+    def __init__(self, metrics: Metrics, timeout: float = 10.0, settle: float = 0.3, poll_ms: int = 100):
+        self.metrics = metrics
+        self.timeout = timeout
+        self.settle = settle
+        self.poll_ms = poll_ms
+
+    def record(self, name: str, started: float, outcome: str) -> str:
+        self.metrics.observe(f"wait_{name}", time.perf_counter() - started)
+        self.metrics.inc(f"wait_{name}_{outcome}")
+        return outcome
+
+    async def first_tile(self, page: Page) -> Optional[str]:
+        """The data-testid of the first product tile, to tell a new listing page from the old one."""
+        try:
+            tile = await page.query_selector(TILE_SELECTOR)
+            return await tile.get_attribute('data-testid') if tile else None
+        except Exception:
+            return None
+
+    async def listing(self, page: Page, previous_first: Optional[str] = None) -> str:
+        """Wait until the listing's product tiles have rendered and stopped changing.
+
+        After a pagination click pass the first tile of the old page as `previous_first`,
+        so a SPA that swaps tiles in place is not mistaken for ready.
+        """
+        started = time.perf_counter()
+        try:
+            await page.wait_for_function(TILES_SETTLED_SCRIPT, arg=[TILE_SELECTOR, previous_first, self.settle * 1000],
+                                         polling=self.poll_ms, timeout=self.timeout * 1000)
+            return self.record('listing', started, 'ready')
+        except PlaywrightTimeoutError:
+            logging.warning(f"Listing tiles on {page.url} did not settle within {self.timeout}s")
+            return self.record('listing', started, 'timeout')
+        except Exception as e:
+            logging.error(f"Error waiting for listing tiles on {page.url}: {e}")
+            return self.record('listing', started, 'error')
+
+    async def selector(self, page: Page, selector: str, name: str) -> str:
+        """Wait until `selector` is attached to the page."""
+        started = time.perf_counter()
+        try:
+            await page.wait_for_selector(selector, state='attached', timeout=self.timeout * 1000)
+            return self.record(name, started, 'ready')
+        except PlaywrightTimeoutError:
+            logging.warning(f"{selector} did not appear on {page.url} within {self.timeout}s")
+            return self.record(name, started, 'timeout')
+        except Exception as e:
+            logging.error(f"Error waiting for {selector} on {page.url}: {e}")
+            return self.record(name, started, 'error')
+
+    async def product(self, page: Page) -> str:
+        """Wait until the product page has rendered its title."""
+        return await self.selector(page, '[data-testid="product-title"]', 'product')
+
+    async def paginate(self, page: Page, link, xhr: Optional[str] = None) -> str:
+        """Click a pagination link, then wait for the next listing page to be ready.
+
+        With `xhr` (part of the listing API URL) the wait also covers that response.
+        """
+        previous_first = await self.first_tile(page)
+        if xhr:
+            started = time.perf_counter()
+            try:
+                async with page.expect_response(lambda response: xhr in response.url, timeout=self.timeout * 1000):
+                    await link.click()
+                self.record('listing_xhr', started, 'ready')
+            except PlaywrightTimeoutError:
+                self.record('listing_xhr', started, 'timeout')
+        else:
+            await link.click()
+        return await self.listing(page, previous_first)
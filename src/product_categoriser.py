@@ -1,17 +1,28 @@
 import json
-from collections import Counter
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import torch
 from sentence_transformers import SentenceTransformer, util
-from difflib import get_close_matches
+from fuzzy_index import FuzzyIndex
+from product_stream import iter_products, open_writer
+from embedding_cache import EmbeddingCache, model_slug, table_hash
+from word_memo import WordMemo
 
 class ProductClassifier:
-    def __init__(self, model_name='all-MiniLM-L6-v2', threshold=0.6):
-        self.model = SentenceTransformer(model_name)
+    def __init__(self, model_name='all-MiniLM-L6-v2', threshold=0.6, model=None, batch_size=256,
+                 cache_dir='embedding_cache', memo_size=100000, memo_path=None):
+        # `model` can be any encoder with SentenceTransformer's encode(); it defaults to `model_name`.
+        # Embeddings are cached under `model_name`, so give an injected model a name of its own.
+        self.model = model if model is not None else SentenceTransformer(model_name)
+        self.model_name = model_name
+        # What a worker process needs to build its own copy; a named model is loaded there, not pickled
+        self.worker_kwargs = dict(model_name=model_name, threshold=threshold, model=model,
+                                  batch_size=batch_size, cache_dir=cache_dir, memo_size=memo_size)
         self.threshold = threshold
+        self.batch_size = batch_size
         self.ignore_words = {'pams', 'woolworths', 'value', 'kg', 'g', 'ml', 'l', 'pack', 'pk', 'ea'}
         
-        # Store embeddings for keywords
-        self.keyword_embeddings = {}
-        
         self.product_type_keywords = {
             # Dairy & Eggs
             'Dairy & Eggs': [
@@ -316,9 +327,101 @@ class ProductClassifier:
                     self.keyword_to_category[keyword[:-1] + 'ies'] = category
                 elif keyword.endswith('f'):
                     self.keyword_to_category[keyword[:-1] + 'ves'] = category
-                
-                # Create embedding for each keyword
-                self.keyword_embeddings[keyword] = self.model.encode(keyword, convert_to_tensor=True)
+
+        # One normalised row per keyword, so a word is scored against every keyword in one matmul
+        self.keywords = list(dict.fromkeys(
+            keyword for keywords in self.product_type_keywords.values() for keyword in keywords
+        ))
+        self.keyword_matrix = self.load_keyword_matrix(cache_dir)
+        self.keyword_embeddings = dict(zip(self.keywords, self.keyword_matrix))
+        self.fuzzy_index = FuzzyIndex(self.keywords)
+
+        # word -> (best keyword, score), filled in batches by prepare_words
+        self.semantic_matches = {}
+
+        # Query words embedded by earlier runs, and the ones this run adds
+        self.word_cache = None
+        self.word_rows = {}
+        self.word_matrix = None
+        self.new_words = []
+        self.new_word_embeddings = []
+        if cache_dir:
+            self.word_cache = EmbeddingCache(cache_dir, f"{model_slug(model_name)}-words", key=model_name)
+            cached_words, self.word_matrix = self.word_cache.load()
+            self.word_rows = {word: row for row, word in enumerate(cached_words)}
+
+        # word -> find_category result; only reloaded from `memo_path` if nothing it depends on changed
+        memo_key = table_hash([model_name, threshold, self.product_type_keywords])
+        self.memo = WordMemo(memo_size, memo_path, key=memo_key)
+
+    def load_keyword_matrix(self, cache_dir):
+        """Keyword embeddings from the cache, encoding them in one batched call on a miss."""
+        cache = None
+        if cache_dir:
+            key = table_hash([self.model_name, self.product_type_keywords])
+            cache = EmbeddingCache(cache_dir, f"{model_slug(self.model_name)}-keywords-{key[:16]}", key=key)
+            cached_keywords, matrix = cache.load()
+            if cached_keywords == self.keywords:
+                return matrix
+
+        embeddings = self.model.encode(self.keywords, batch_size=self.batch_size, convert_to_tensor=True)
+        matrix = util.normalize_embeddings(embeddings)
+        if cache:
+            cache.save(self.keywords, matrix)
+        return matrix
+
+    def semantic_match(self, word_embeddings):
+        """Best (keyword, cosine score) for each row of `word_embeddings`.
+
+        Ties go to the keyword listed first, as they did when keywords were scored one at a time.
+        """
+        queries = util.normalize_embeddings(torch.atleast_2d(word_embeddings).to(self.keyword_matrix))
+        scores = queries @ self.keyword_matrix.T
+        best = torch.argmax(scores, dim=1)
+        best_scores = scores.gather(1, best.unsqueeze(1)).squeeze(1)
+        return [(self.keywords[index], score) for index, score in zip(best.tolist(), best_scores.tolist())]
+
+    def prepare_words(self, words):
+        """Encode every new word the exact, memo and fuzzy lookups leave unresolved, in one batched call."""
+        pending = []
+        for word in dict.fromkeys(words):
+            if not word or word in self.keyword_to_category or word in self.semantic_matches or word in self.memo:
+                continue
+            fuzzy = self.fuzzy_match(word)
+            if fuzzy:
+                # Memoised, so find_category doesn't search the fuzzy index for it again
+                self.memo.put(word, fuzzy)
+                continue
+            pending.append(word)
+        cached = [word for word in pending if word in self.word_rows]
+        if cached:
+            self.match_words(cached, self.word_matrix[[self.word_rows[word] for word in cached]])
+
+        fresh = [word for word in pending if word not in self.word_rows]
+        if fresh:
+            embeddings = self.model.encode(fresh, batch_size=self.batch_size, convert_to_tensor=True)
+            self.match_words(fresh, embeddings)
+            if self.word_cache:
+                self.new_words.extend(fresh)
+                self.new_word_embeddings.append(embeddings.detach().cpu())
+
+    def match_words(self, words, embeddings):
+        # Score in slices so a large vocabulary never builds one huge words x keywords matrix
+        for start in range(0, len(words), self.batch_size):
+            matches = self.semantic_match(embeddings[start:start + self.batch_size])
+            self.semantic_matches.update(zip(words[start:start + self.batch_size], matches))
+
+    def save_embeddings(self):
+        """Add the query words embedded since the last save to the on-disk cache."""
+        if not self.word_cache or not self.new_words:
+            return
+        words = list(self.word_rows) + self.new_words
+        parts = ([self.word_matrix] if self.word_matrix is not None else []) + self.new_word_embeddings
+        self.word_cache.save(words, torch.cat([part.float() for part in parts]))
+        cached_words, self.word_matrix = self.word_cache.load()
+        self.word_rows = {word: row for row, word in enumerate(cached_words)}
+        self.new_words = []
+        self.new_word_embeddings = []
 
     def get_last_word(self, product_name):
         """Extract the last word from the product name, ignoring specified terms."""
@@ -339,6 +442,14 @@ class ProductClassifier:
         return words[-1] if words else ''
 
     def find_category(self, word):
+        """Find the category for a word, from the memo if it has been resolved before."""
+        result = self.memo.get(word)
+        if result is None:
+            result = self.resolve_category(word)
+            self.memo.put(word, result)
+        return result
+
+    def resolve_category(self, word):
         """Try to find category for a word using multiple methods."""
         # Method 1: Direct lookup including plural forms
         category = self.keyword_to_category.get(word)
@@ -346,30 +457,30 @@ class ProductClassifier:
             return category, word, 1.0, 'exact'
 
         # Method 2: Fuzzy string matching
-        all_keywords = list(self.keyword_embeddings.keys())
-        close_matches = get_close_matches(word, all_keywords, n=1, cutoff=0.8)
-        if close_matches:
-            matched_word = close_matches[0]
-            return self.keyword_to_category[matched_word], matched_word, 0.9, 'fuzzy'
+        fuzzy = self.fuzzy_match(word)
+        if fuzzy:
+            return fuzzy
 
         # Method 3: Semantic similarity using SBERT
         if word:
-            word_embedding = self.model.encode(word, convert_to_tensor=True)
-            best_score = 0
-            best_match = None
-            
-            for keyword, keyword_embedding in self.keyword_embeddings.items():
-                similarity = util.cos_sim(word_embedding, keyword_embedding).item()
-                if similarity > best_score:
-                    best_score = similarity
-                    best_match = keyword
-
-            if best_score > self.threshold:
+            if word not in self.semantic_matches:
+                self.prepare_words([word])
+            best_match, best_score = self.semantic_matches[word]
+
+            # A best score of 0 or less never matched, even with a negative threshold
+            if best_score > 0 and best_score > self.threshold:
                 return (self.keyword_to_category[best_match], best_match, 
                         best_score, 'semantic')
 
         return None, word, 0.0, 'none'
 
+    def fuzzy_match(self, word):
+        close_matches = self.fuzzy_index.close_matches(word, n=1, cutoff=0.8)
+        if close_matches:
+            matched_word = close_matches[0]
+            return self.keyword_to_category[matched_word], matched_word, 0.9, 'fuzzy'
+        return None
+
     def get_all_words(self, product_name):
         """Extract all relevant words from the product name, ignoring specified terms."""
         name = product_name.split('(')[0].strip()  # Remove anything in parentheses
@@ -383,58 +494,55 @@ class ProductClassifier:
         
         return words
 
-    def classify_products(self, input_file, output_file):
-        try:
-            with open(input_file, 'r', encoding='utf-8') as file:
-                products = json.load(file)
+    def classify_products(self, input_file, output_file, workers=1, chunk_size=500):
+        """Classify products streamed from an NDJSON (or JSON array) file.
 
-            matched_products = []
+        Products are written out as they are classified: NDJSON unless `output_file` ends in .json.
+        With `workers` > 1, chunks of `chunk_size` products are classified in a process pool
+        and written back in input order.
+        """
+        try:
+            # First pass: encode every distinct word in the input together. Saving them
+            # lets pool workers map the same embeddings instead of encoding again.
+            self.prepare_words(
+                word for product in iter_products(input_file) for word in self.get_all_words(product.get('name', ''))
+            )
+            self.save_embeddings()
+
+            if workers > 1:
+                classified = self.classify_in_pool(iter_products(input_file), workers, chunk_size)
+            else:
+                classified = (self.classify_product(product) for product in iter_products(input_file))
+
+            total = 0
+            matched = 0
+            match_types = Counter()
             unmatched_products = []
-            
-            for product in products:
-                name = product.get('name', '')
-                words = self.get_all_words(name)
-                
-                # Attempt to match the last word first
-                last_word = words[-1] if words else ''
-                category, matched_word, confidence, match_type = self.find_category(last_word)
-                
-                # If no match with the last word, attempt to match any other word
-                if not category:
-                    for word in words[:-1]:  # Exclude the last word already tried
-                        category, matched_word, confidence, match_type = self.find_category(word)
-                        if category:
-                            break  # Stop if we find a match
-
-                # Assign classification results
-                if category:
-                    product['classifiedType'] = category
-                    product['classificationConfidence'] = round(confidence, 3)
-                    product['matchedWord'] = matched_word
-                    product['originalWord'] = last_word
-                    product['matchType'] = match_type
-                    matched_products.append(product)
-                else:
-                    product['classifiedType'] = 'Unknown'
-                    product['classificationConfidence'] = 0.0
-                    product['matchedWord'] = last_word
-                    product['matchType'] = 'none'
-                    unmatched_products.append(product)
-
-            # Save results
-            with open(output_file, 'w', encoding='utf-8') as file:
-                json.dump(products, file, indent=4, ensure_ascii=False)
+
+            with open_writer(output_file) as writer:
+                for product in classified:
+                    total += 1
+                    writer.write(product)
+                    if product['matchType'] == 'none':
+                        # Only what the unmatched analysis needs, not the whole product
+                        unmatched_products.append({'name': product.get('name', ''), 'matchedWord': product['matchedWord']})
+                    else:
+                        matched += 1
+                        match_types[product['matchType']] += 1
 
             # Print statistics
-            total = len(products)
             print(f"\nClassification Results:")
             print(f"Total products: {total}")
-            print(f"Matched: {len(matched_products)} ({len(matched_products)/total*100:.1f}%)")
-            print("Match types:")
-            match_types = Counter(p['matchType'] for p in matched_products)
-            for match_type, count in match_types.items():
-                print(f"  - {match_type}: {count} ({count/total*100:.1f}%)")
-            print(f"Unmatched: {len(unmatched_products)} ({len(unmatched_products)/total*100:.1f}%)")
+            if total:
+                print(f"Matched: {matched} ({matched/total*100:.1f}%)")
+                print("Match types:")
+                for match_type, count in match_types.items():
+                    print(f"  - {match_type}: {count} ({count/total*100:.1f}%)")
+                print(f"Unmatched: {len(unmatched_products)} ({len(unmatched_products)/total*100:.1f}%)")
+
+            self.save_embeddings()
+            self.memo.save()
+            print(f"Word memo: {self.memo.summary()}")
 
             # Save unmatched analysis
             self.save_unmatched_analysis(unmatched_products)
@@ -443,6 +551,55 @@ class ProductClassifier:
             print(f"Error in classify_products: {str(e)}")
             raise
 
+    def classify_in_pool(self, products, workers, chunk_size):
+        """Yield classified products in input order, keeping a few chunks per worker in flight."""
+        products = iter(products)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.worker_kwargs,)) as pool:
+            pending = deque()
+            while True:
+                while len(pending) < workers * 2:
+                    chunk = list(islice(products, chunk_size))
+                    if not chunk:
+                        break
+                    pending.append(pool.submit(_classify_chunk, chunk))
+                if not pending:
+                    return
+                classified, hits, misses = pending.popleft().result()
+                self.memo.hits += hits
+                self.memo.misses += misses
+                yield from classified
+
+    def classify_product(self, product):
+        """Add the classification fields to one product in place."""
+        name = product.get('name', '')
+        words = self.get_all_words(name)
+
+        # Attempt to match the last word first
+        last_word = words[-1] if words else ''
+        category, matched_word, confidence, match_type = self.find_category(last_word)
+
+        # If no match with the last word, attempt to match any other word
+        if not category:
+            for word in words[:-1]:  # Exclude the last word already tried
+                category, matched_word, confidence, match_type = self.find_category(word)
+                if category:
+                    break  # Stop if we find a match
+
+        # Assign classification results
+        if category:
+            product['classifiedType'] = category
+            product['classificationConfidence'] = round(confidence, 3)
+            product['matchedWord'] = matched_word
+            product['originalWord'] = last_word
+            product['matchType'] = match_type
+        else:
+            product['classifiedType'] = 'Unknown'
+            product['classificationConfidence'] = 0.0
+            product['matchedWord'] = last_word
+            product['matchType'] = 'none'
+        return product
+
     def save_unmatched_analysis(self, unmatched_products):
         """Save unmatched keywords, their counts, and associated product names to a file."""
         try:
@@ -474,10 +631,29 @@ class ProductClassifier:
 
 
 
+_worker_classifier = None
+
+
+def _init_worker(kwargs):
+    """Build one classifier per pool process; cached embeddings are memory-mapped, not copied."""
+    global _worker_classifier
+    # One torch thread per process, or the workers fight over the cores
+    torch.set_num_threads(1)
+    _worker_classifier = ProductClassifier(**kwargs)
+
+
+def _classify_chunk(products):
+    classifier = _worker_classifier
+    hits, misses = classifier.memo.hits, classifier.memo.misses
+    classifier.prepare_words(word for product in products for word in classifier.get_all_words(product.get('name', '')))
+    classified = [classifier.classify_product(product) for product in products]
+    return classified, classifier.memo.hits - hits, classifier.memo.misses - misses
+
+
 # Example usage
 if __name__ == "__main__":
     classifier = ProductClassifier()
-    input_file = 'paknsave_products_2025-01-14_11-10-47.json'
-    output_file = 'classified_products_enhanced.json'
+    input_file = 'paknsave_products_2025-01-14_11-10-47.ndjson'
+    output_file = 'classified_products_enhanced.ndjson'
     
     classifier.classify_products(input_file, output_file)
\ No newline at end of file
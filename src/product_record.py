@@ -0,0 +1,73 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+# Scraped-product JSON key -> ProductRecord attribute. The keys are the ones the
+# scraper has always written, so NDJSON output and the tools reading it are unchanged.
+FIELD_KEYS = {
+    'sourceSite': 'source_site',
+    'name': 'name',
+    'subtitle': 'subtitle',
+    'imageUrl': 'image_url',
+    'price': 'price',
+    'product_id': 'product_id',
+    'category': 'category',
+    'description': 'description',
+    'ingredients': 'ingredients',
+    'brand': 'brand',
+    'promotion': 'promotion',
+    'nutritionalInfo': 'nutritional_info',
+    'category_data': 'category_data',
+}
+
+
+@dataclass(slots=True)
+class ProductRecord:
+    """One scraped product, from its listing tile to its Frappe payload.
+
+    Slotted, so each product costs a fixed handful of pointers instead of a dict,
+    and `checked_at` is one timestamp string shared by every product on a listing
+    page. Fields the site did not provide stay None and are left out of `to_dict`.
+    """
+    checked_at: str
+    source_site: str = 'paknsave.co.nz'
+    product_id: Optional[str] = None
+    name: Optional[str] = None
+    subtitle: Optional[str] = None
+    image_url: Optional[str] = None
+    price: Optional[str] = None
+    category: Optional[str] = None
+    description: Optional[str] = None
+    ingredients: Optional[str] = None
+    brand: Optional[str] = None
+    promotion: Optional[str] = None
+    nutritional_info: Optional[Dict[str, str]] = None
+    category_data: Optional[Dict] = None
+
+    @classmethod
+    def from_dict(cls, product: Dict) -> 'ProductRecord':
+        """Build a record from a scraped-product dict, e.g. a line of an NDJSON output file."""
+        record = cls(checked_at=product.get('lastChecked', ''))
+        record.update(product)
+        return record
+
+    def update(self, fields: Dict):
+        """Copy the known scraped-product keys of `fields` onto the record, skipping None values."""
+        for key, attribute in FIELD_KEYS.items():
+            value = fields.get(key)
+            if value is not None:
+                setattr(self, attribute, value)
+
+    def current_price(self) -> float:
+        try:
+            return float(self.price or '0.00')
+        except ValueError:
+            return 0.00
+
+    def to_dict(self) -> Dict:
+        """The record as a scraped-product dict, in the shape the scraper writes to disk."""
+        product = {'sourceSite': self.source_site, 'lastChecked': self.checked_at, 'lastUpdated': self.checked_at}
+        for key, attribute in FIELD_KEYS.items():
+            value = getattr(self, attribute)
+            if value is not None:
+                product[key] = value
+        return product
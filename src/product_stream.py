@@ -0,0 +1,113 @@
+import json
+import logging
+import textwrap
+from typing import Dict, Iterator
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+
+class NDJSONWriter:
+    """Appends products to a newline-delimited JSON file, one object per line.
+
+    The file is line-buffered, so every finished product is on disk even if the
+    crawl is killed. A resumed crawl appends to the same file when given the same
+    path, which PaknSaveScraper takes from its checkpoint.
+    """
+
+    def __init__(self, path: str, append: bool = True):
+        self.path = path
+        self.count = 0
+        self.file = open(path, 'a' if append else 'w', encoding='utf-8', buffering=1)
+
+    def write(self, product: Dict):
+        self.file.write(json.dumps(product, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+        logging.info(f"Wrote {self.count} products to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JSONArrayWriter:
+    """Writes products as a pretty-printed JSON array without holding them all in memory.
+
+    The output is the same as json.dump(products, f, indent=4, ensure_ascii=False).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self.file = open(path, 'w', encoding='utf-8')
+        self.file.write('[')
+
+    def write(self, product: Dict):
+        self.file.write(',\n' if self.count else '\n')
+        self.file.write(textwrap.indent(json.dumps(product, indent=4, ensure_ascii=False), '    '))
+        self.count += 1
+
+    def close(self):
+        self.file.write('\n]' if self.count else ']')
+        self.file.close()
+        logging.info(f"Wrote {self.count} products to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_writer(path: str, append: bool = False):
+    """A JSONArrayWriter for .json paths, an NDJSONWriter for anything else (.ndjson, .jsonl)."""
+    if path.endswith('.json'):
+        return JSONArrayWriter(path)
+    return NDJSONWriter(path, append=append)
+
+
+def iter_products(path: str) -> Iterator[Dict]:
+    """Yield products one at a time from an NDJSON file.
+
+    Older pretty-printed JSON array files are still accepted, but those are loaded whole.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        if first == '[':
+            f.seek(0)
+            yield from json.load(f)
+            return
+        f.seek(0)
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                # A crawl killed mid-write can leave a truncated last line
+                logging.warning(f"Skipping unreadable line {line_number} of {path}: {e}")
+
+
+def export_json(ndjson_path: str, json_path: str) -> int:
+    """Convert an NDJSON product file to a pretty-printed JSON array, streaming both sides."""
+    with JSONArrayWriter(json_path) as writer:
+        for product in iter_products(ndjson_path):
+            writer.write(product)
+        return writer.count
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        print("Usage: python product_stream.py products.ndjson products.json")
+        sys.exit(1)
+    export_json(sys.argv[1], sys.argv[2])
@@ -0,0 +1,129 @@
+import asyncio
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    """Spaces out requests to the same host by a minimum interval."""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self.next_slot: Dict[str, float] = {}
+        self.lock = asyncio.Lock()
+
+    async def acquire(self, url: str):
+        """Wait until the host of `url` may be hit again."""
+        host = urlparse(url).netloc
+        loop = asyncio.get_running_loop()
+        async with self.lock:
+            now = loop.time()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record(self, url: str, seconds: float, ok: bool = True, retry_after: Optional[float] = None,
+               throttled: bool = False):
+        """Feedback about one response; a fixed-rate limiter ignores it."""
+
+
+class AdaptiveRateLimiter(HostRateLimiter):
+    """Per-host AIMD rate control on top of HostRateLimiter's request spacing.
+
+    Each host starts at `requests_per_second`. Fast, clean responses add `increase`
+    requests/second, at most once per request interval, up to `max_rate`. These
+    multiply the rate by `decrease` (down to `min_rate`):
+    - a response slower than `slow_seconds`
+    - a response `queue_seconds` slower than the host's fastest, which means the
+      host has started queueing us; backing off then comes before its 429s
+    - a 429/503, a block page or an error
+    A Retry-After holds the host back for that long. A 429/503 also caps the host at
+    `headroom` times the rate that drew it; the cap expires after `ceiling_seconds`
+    without another, so the rate can probe upward again.
+    """
+
+    def __init__(self, requests_per_second: float, min_rate: float = 0.2, max_rate: float = 8.0,
+                 increase: float = 0.25, decrease: float = 0.5, slow_seconds: float = 5.0,
+                 queue_seconds: float = 2.0, headroom: float = 0.9, ceiling_seconds: float = 60.0):
+        super().__init__(requests_per_second)
+        self.initial_rate = requests_per_second
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_seconds = slow_seconds
+        self.queue_seconds = queue_seconds
+        self.headroom = headroom
+        self.ceiling_seconds = ceiling_seconds
+        self.rates: Dict[str, float] = {}
+        self.fastest: Dict[str, float] = {}
+        self.ceilings: Dict[str, Tuple[float, float]] = {}  # host -> (cap, when it was set)
+        self.last_increase: Dict[str, float] = {}
+        self.last_backoff: Dict[str, float] = {}
+        self.backoffs = 0
+
+    def rate(self, url: str) -> float:
+        return self.rates.get(urlparse(url).netloc, self.initial_rate)
+
+    def ceiling(self, host: str, now: float) -> float:
+        """The most the host may be sent right now: max_rate, or a recent 429's cap."""
+        cap, since = self.ceilings.get(host, (self.max_rate, now))
+        if now - since >= self.ceiling_seconds:
+            del self.ceilings[host]
+            return self.max_rate
+        return cap
+
+    async def acquire(self, url: str):
+        """Wait until the host of `url` may be hit again at its current rate.
+
+        A backoff while waiting cancels the slot, which was booked at the old rate.
+        """
+        host = urlparse(url).netloc
+        loop = asyncio.get_running_loop()
+        while True:
+            rate = self.rates.get(host, self.initial_rate)
+            interval = 1.0 / rate if rate > 0 else 0.0
+            async with self.lock:
+                now = loop.time()
+                slot = max(now, self.next_slot.get(host, now))
+                self.next_slot[host] = slot + interval
+            delay = slot - now
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+            if self.last_backoff.get(host, float('-inf')) <= now:
+                return
+
+    def record(self, url: str, seconds: float, ok: bool = True, retry_after: Optional[float] = None,
+               throttled: bool = False):
+        """Feed back one response: `ok` is False for 429/503s, block pages and errors; `throttled` marks 429/503s."""
+        if self.initial_rate <= 0:
+            return  # rate limiting is switched off
+        host = urlparse(url).netloc
+        rate = self.rates.get(host, self.initial_rate)
+        now = asyncio.get_running_loop().time()
+        if retry_after:
+            self.next_slot[host] = max(self.next_slot.get(host, now), now + retry_after)
+        # A request sent before the last backoff went out at the old rate, so its response says nothing new
+        if now - seconds < self.last_backoff.get(host, float('-inf')):
+            return
+        if ok:
+            fastest = self.fastest[host] = min(self.fastest.get(host, seconds), seconds)
+            if seconds < self.slow_seconds and seconds - fastest < self.queue_seconds:
+                # Responses to requests sent at the old rate arrive together: grow once per interval, not once each
+                if now - self.last_increase.get(host, float('-inf')) >= 1.0 / rate:
+                    self.rates[host] = min(self.ceiling(host, now), rate + self.increase)
+                    self.last_increase[host] = now
+                return
+        # Requests already in flight fail together: back off once per interval, not once per failure
+        if now - self.last_backoff.get(host, float('-inf')) < 1.0 / rate:
+            return
+        if throttled:
+            # Only the host saying so sets a cap; errors and slow pages say nothing about its limit
+            self.ceilings[host] = (max(self.min_rate, min(self.ceiling(host, now), rate * self.headroom)), now)
+        # Waiting requests book their slots again at the lower rate
+        self.next_slot[host] = now + retry_after if retry_after else now
+        self.rates[host] = max(self.min_rate, rate * self.decrease)
+        self.last_backoff[host] = now
+        self.backoffs += 1
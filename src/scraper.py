@@ -5,7 +5,7 @@ import json
 import random
 import asyncio
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from playwright.async_api import async_playwright, Browser, Page
 import aiohttp
@@ -14,7 +14,21 @@ import requests
 from concurrent.futures import ThreadPoolExecutor
 import time
 from itertools import cycle
-from frappe_api import test_write_to_frappe
+from contextlib import asynccontextmanager
+from frappe_sink import FrappeSink
+from frappe_bulk import BulkFrappeWriter, ProductIndex
+from frappe_client import AsyncFrappeClient
+from frappe_api import write_to_frappe_async
+from change_store import ChangeStore, touch_payload
+from checkpoint import CheckpointStore
+from product_stream import NDJSONWriter, JSONArrayWriter, export_json
+from rate_limiter import AdaptiveRateLimiter, HostRateLimiter
+from metrics import Metrics, MetricsServer
+from page_waits import PageWaiter
+from resource_blocking import ResourcePolicy
+from dom_extract import extract_listing_tiles, extract_product_page
+from units import extract_unit_info
+from product_record import ProductRecord
 
 # Configure logging
 logging.basicConfig(
@@ -89,6 +103,36 @@ class ScraperConfig:
     product_log_delay: float = 0.02
     max_retries: int = 3
     concurrent_categories: int = 3
+    pages_per_category: int = 4
+    max_concurrent_pages: int = 8
+    host_requests_per_second: float = 2.0  # starting rate per host; 0 switches rate limiting off
+    adaptive_rate: bool = True  # AIMD: speed up on fast clean responses, back off on slow ones, 429s and blocks
+    max_requests_per_second: float = 8.0
+    slow_response_seconds: float = 5.0
+    queue_delay_seconds: float = 2.0  # back off once responses take this much longer than the host's fastest
+    # Optional extra random sleeps, in seconds; the rate limiter does the pacing
+    navigation_delay: Tuple[float, float] = (0.0, 0.0)
+    listing_delay: Tuple[float, float] = (0.0, 0.0)
+    headless: bool = False
+    wait_timeout: float = 10.0  # upper bound on any readiness wait, in seconds
+    tile_settle_seconds: float = 0.3  # listing tiles must hold steady this long to count as rendered
+    listing_xhr: Optional[str] = None  # part of the listing API URL, to also wait for that response
+    block_resources: Tuple[str, ...] = ('image', 'media', 'font')  # resource types never downloaded, by file extension
+    block_trackers: bool = True  # block requests to analytics and tag-manager hosts
+    sink_workers: int = 4
+    sink_queue_size: int = 100
+    frappe_bulk: bool = False
+    frappe_batch_size: int = 50
+    frappe_index_path: str = 'frappe_product_index.json'
+    frappe_pool_size: int = 10
+    skip_unchanged: bool = True
+    touch_unchanged: bool = False  # send unchanged products as last_checked touches (a GET and a PUT each unless bulk)
+    change_store_path: str = 'product_hashes.sqlite'
+    checkpoint_path: Optional[str] = 'crawl_checkpoint.sqlite'
+    checkpoint_max_age_hours: Optional[float] = 12.0  # an unfinished crawl older than this starts over
+    output_path: Optional[str] = None  # NDJSON file; when set, all_products stays empty
+    metrics_port: Optional[int] = None  # serve /metrics on localhost while crawling
+    metrics_path: Optional[str] = 'crawl_metrics.json'  # JSON summary written at the end of the run
     proxy_list: List[str] = None
 
     def __post_init__(self):
@@ -101,30 +145,79 @@ class ScraperConfig:
 class ProxyManager:
     def __init__(self, proxies: List[str]):
         self.proxies = cycle(proxies)
-        self.current_proxy = next(self.proxies)
+        self.current_proxy = next(self.proxies, None)
         self.failed_attempts = {}
         self.lock = asyncio.Lock()
 
     async def get_next_proxy(self) -> str:
         """Get next working proxy with thread safety."""
         async with self.lock:
-            self.current_proxy = next(self.proxies)
+            self.current_proxy = next(self.proxies, None)
             return self.current_proxy
 
-    async def mark_proxy_failed(self, proxy: str):
-        """Mark a proxy as failed and get next one if too many failures."""
+    async def mark_proxy_failed(self, proxy: str) -> bool:
+        """Mark a proxy as failed and get next one if too many failures. Returns whether it rotated."""
         async with self.lock:
             self.failed_attempts[proxy] = self.failed_attempts.get(proxy, 0) + 1
             if self.failed_attempts[proxy] >= 3:
-                await self.get_next_proxy()
-
-
-
+                # get_next_proxy() takes the same lock, so rotate inline
+                self.current_proxy = next(self.proxies, None)
+                return True
+            return False
 
 
+class PagePool:
+    """A bounded set of reusable browser pages owned by one category."""
 
+    def __init__(self, scraper: 'PaknSaveScraper', size: int):
+        self.scraper = scraper
+        self.size = max(1, size)
+        self.idle_pages = asyncio.Queue()
+        self.pages = []
+        self.opened = 0  # pages open or being opened
 
+    async def checkout(self) -> Page:
+        """Return an idle page, opening a new one while the pool is below its size."""
+        while True:
+            if self.idle_pages.empty() and self.opened < self.size:
+                # Reserve the slot before awaiting, or concurrent borrowers would all see room
+                self.opened += 1
+                try:
+                    page = await self.scraper.new_page()
+                except Exception:
+                    self.opened -= 1
+                    # Wake a borrower that is waiting for a page, so it can try to open one instead
+                    self.idle_pages.put_nowait(None)
+                    raise
+                self.pages.append(page)
+                return page
+            page = await self.idle_pages.get()
+            if page is not None:
+                return page
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a page, then hold one of the scraper's global page slots while it is used.
+
+        The category's page comes first: a borrower queued on its own pool must not sit
+        on a global slot that another category could be using.
+        """
+        page = await self.checkout()
+        try:
+            async with self.scraper.page_slots:
+                yield page
+        finally:
+            self.idle_pages.put_nowait(page)
 
+    async def close(self):
+        """Close every page the pool opened."""
+        for page in self.pages:
+            try:
+                await page.close()
+            except Exception as e:
+                logging.debug(f"Error closing pooled page: {e}")
+        self.pages = []
+        self.opened = 0
 
 
 class PaknSaveScraper:
@@ -133,6 +226,41 @@ class PaknSaveScraper:
         self.all_products = []
         self.proxy_manager = ProxyManager(config.proxy_list)
         self.browser = None  # Will be set when scraping starts
+        self.page_slots = asyncio.Semaphore(max(1, config.max_concurrent_pages))
+        if config.adaptive_rate:
+            self.rate_limiter = AdaptiveRateLimiter(config.host_requests_per_second,
+                                                    max_rate=config.max_requests_per_second,
+                                                    slow_seconds=config.slow_response_seconds,
+                                                    queue_seconds=config.queue_delay_seconds)
+        else:
+            self.rate_limiter = HostRateLimiter(config.host_requests_per_second)
+        self.bulk_writer = None
+        self.frappe_client = None  # Created on first write, inside the running loop
+        self.change_store = ChangeStore(config.change_store_path) if config.skip_unchanged else None
+        self.checkpoint = None
+        if config.checkpoint_path:
+            self.checkpoint = CheckpointStore(config.checkpoint_path, config.checkpoint_max_age_hours)
+            # A resumed crawl appends to the file it started, not a freshly timestamped one
+            output_path = self.checkpoint.output_path(config.output_path)
+            if output_path != config.output_path:
+                logging.info(f"Resuming output in {output_path}")
+                config.output_path = output_path
+        self.output = NDJSONWriter(config.output_path) if config.output_path else None
+        self.metrics = Metrics()
+        self.metrics_server = None
+        self.waiter = PageWaiter(self.metrics, timeout=config.wait_timeout, settle=config.tile_settle_seconds)
+        self.resource_policy = ResourcePolicy(self.metrics, config.block_resources, config.block_trackers)
+        on_written = self.on_products_written
+        if config.frappe_bulk:
+            # One batching writer: concurrent batches could both create the same product
+            self.bulk_writer = BulkFrappeWriter(ProductIndex(config.frappe_index_path), config.frappe_batch_size)
+            self.sink = FrappeSink(workers=1, queue_size=config.sink_queue_size, on_written=on_written,
+                                   batch_writer=self.bulk_writer.write_batch, batch_size=config.frappe_batch_size,
+                                   prepare=self.frappe_payload, metrics=self.metrics)
+        else:
+            self.sink = FrappeSink(writer=self.write_product, workers=config.sink_workers,
+                                   queue_size=config.sink_queue_size, on_written=on_written,
+                                   prepare=self.frappe_payload, metrics=self.metrics)
 
         self.user_agents = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
@@ -144,26 +272,175 @@ class PaknSaveScraper:
     async def initialize_browser(self, playwright):
         """Initialize the browser instance."""
         if not self.browser:
-            self.browser = await playwright.chromium.launch(headless=False)
+            self.browser = await playwright.chromium.launch(headless=self.config.headless)
         return self.browser
 
+    async def new_page(self) -> Page:
+        """Open a new page in the shared browser, with the resource-blocking policy applied."""
+        return await self.resource_policy.apply(await self.browser.new_page())
+
+    def start_metrics(self):
+        """Serve live metrics if a metrics port is configured."""
+        if self.config.metrics_port is not None and self.metrics_server is None:
+            self.metrics_server = MetricsServer(self.metrics, self.config.metrics_port)
+            self.metrics_server.start()
+
+    def report_metrics(self):
+        """Write the run's metrics summary and stop the metrics endpoint."""
+        counters = self.metrics.counters
+        logging.info(f"Crawl metrics: {counters.get('pages', 0)} listing pages, {counters.get('products', 0)} products, "
+                     f"{counters.get('retries', 0)} retries, {counters.get('blocks', 0)} blocks")
+        logging.info(self.resource_policy.summary())
+        if self.config.metrics_path:
+            self.metrics.save(self.config.metrics_path)
+            logging.info(f"Metrics summary written to {self.config.metrics_path}")
+        if self.metrics_server:
+            self.metrics_server.stop()
+            self.metrics_server = None
+
+    async def open_sink(self):
+        """Prepare the Frappe sink before products start flowing."""
+        if self.bulk_writer:
+            await asyncio.to_thread(self.bulk_writer.prefetch)
+
+    async def close_sink(self):
+        """Flush queued products to Frappe and persist the product index. Safe to call twice."""
+        await self.sink.close()
+        if self.bulk_writer:
+            self.bulk_writer.close()
+        if self.frappe_client:
+            await self.frappe_client.close()
+            self.frappe_client = None
+        if self.change_store:
+            self.change_store.close()
+            self.change_store = None
+        if self.output:
+            self.output.close()
+            self.output = None
+
+    async def save_products_to_json(self, filename: str):
+        """Export scraped products as a pretty-printed JSON array."""
+        try:
+            if self.config.output_path:
+                export_json(self.config.output_path, filename)
+            else:
+                with JSONArrayWriter(filename) as writer:
+                    for product in self.all_products:
+                        writer.write(product.to_dict())
+            logging.info(f"Results written to {filename}")
+        except Exception as e:
+            logging.error(f"Error writing to JSON file: {e}")
+
+    def frappe_payload(self, record: ProductRecord) -> Optional[Dict]:
+        """The sink's prepare step: a record's Frappe payload, a touch payload, or None to send nothing."""
+        with self.metrics.timer('transform'):
+            payload = self.transform_to_frappe_format(record)
+        product_id = payload['product_id']
+        if self.change_store and product_id and self.change_store.is_unchanged(payload):
+            self.metrics.inc('unchanged')
+            if self.config.touch_unchanged:
+                return touch_payload(payload)
+            if self.checkpoint:
+                self.checkpoint.mark_processed([product_id])
+            return None
+        return payload
+
+    def on_products_written(self, products: List[Dict]):
+        """Called by the sink once Frappe has accepted a batch of products; checkpoint progress waits for this."""
+        if self.change_store:
+            self.change_store.record(products)
+        if self.checkpoint:
+            self.checkpoint.mark_processed(product.get('product_id') for product in products)
+
+    async def write_product(self, product: Dict):
+        """Write one Frappe-formatted product over the shared keep-alive connection pool."""
+        if self.frappe_client is None:
+            self.frappe_client = AsyncFrappeClient(pool_size=self.config.frappe_pool_size)
+        await write_to_frappe_async(self.frappe_client, product)
+
+    async def detect_blocking(self, page: Page) -> bool:
+        """Check whether the loaded page is a block or captcha page."""
+        try:
+            title = (await page.title()).lower()
+        except Exception:
+            return False
+        return any(marker in title for marker in ('access denied', 'captcha', 'attention required', 'just a moment'))
+
     async def safe_get(self, page: Page, url: str) -> bool:
         """Enhanced safe navigation with anti-detection measures."""
         for attempt in range(self.config.max_retries):
+            started = time.perf_counter()
             try:
-                await asyncio.sleep(random.uniform(1, 3))
-                await page.goto(url, wait_until="domcontentloaded")
-                
+                if attempt:
+                    self.metrics.inc('retries')
+                await self.politeness_sleep(self.config.navigation_delay)
+                with self.metrics.timer('rate_limit'):
+                    await self.rate_limiter.acquire(url)
+                started = time.perf_counter()
+                with self.metrics.timer('navigate'):
+                    response = await page.goto(url, wait_until="domcontentloaded")
+                elapsed = time.perf_counter() - started
+
+                # 429/503 mean slow down and try again; the rate limiter honours Retry-After
+                if response is not None and response.status in (429, 503):
+                    self.metrics.inc('throttled')
+                    self.feedback(url, elapsed, ok=False, retry_after=response.headers.get('retry-after'),
+                                  throttled=True)
+                    continue
+
                 if await self.detect_blocking(page):
-                    await self.proxy_manager.mark_proxy_failed(self.proxy_manager.current_proxy)
+                    self.metrics.inc('blocks')
+                    self.feedback(url, elapsed, ok=False)
+                    if await self.proxy_manager.mark_proxy_failed(self.proxy_manager.current_proxy):
+                        self.metrics.inc('proxy_rotations')
                     return False
-                
+
+                self.feedback(url, elapsed, ok=True)
                 return True
             except Exception as e:
+                self.metrics.inc('navigation_errors')
+                self.feedback(url, time.perf_counter() - started, ok=False)
                 logging.error(f"Error accessing {url} (attempt {attempt + 1}): {e}")
-                await asyncio.sleep(self.config.page_load_delay)
+                with self.metrics.timer('sleep'):
+                    await asyncio.sleep(self.config.page_load_delay)
         return False
 
+    async def paginate(self, page: Page, link) -> bool:
+        """Follow a pagination link under the same pacing and rate feedback as safe_get."""
+        url = page.url
+        await self.politeness_sleep(self.config.navigation_delay)
+        with self.metrics.timer('rate_limit'):
+            await self.rate_limiter.acquire(url)
+        started = time.perf_counter()
+        # networkidle can hang on analytics beacons; wait for the new tiles instead
+        with self.metrics.timer('navigate'):
+            outcome = await self.waiter.paginate(page, link, self.config.listing_xhr)
+        elapsed = time.perf_counter() - started
+        if await self.detect_blocking(page):
+            self.metrics.inc('blocks')
+            self.feedback(url, elapsed, ok=False)
+            return False
+        # Tiles that never showed up are most likely a throttled listing request
+        self.feedback(url, elapsed, ok=outcome == 'ready')
+        return True
+
+    def feedback(self, url: str, seconds: float, ok: bool, retry_after: Optional[str] = None,
+                 throttled: bool = False):
+        """Tell the rate limiter how a navigation went; `throttled` is for the site's own 429/503s."""
+        if not ok or seconds >= self.config.slow_response_seconds:
+            self.metrics.inc('rate_backoffs')
+        try:
+            retry_after = float(retry_after) if retry_after else None
+        except ValueError:
+            retry_after = None  # an HTTP date; the multiplicative decrease has to do
+        self.rate_limiter.record(url, seconds, ok=ok, retry_after=retry_after, throttled=throttled)
+
+    async def politeness_sleep(self, delay: Tuple[float, float]):
+        """Sleep a random time in the `delay` range, if it is not (0, 0)."""
+        if delay[1] > 0:
+            with self.metrics.timer('sleep'):
+                await asyncio.sleep(random.uniform(*delay))
+
 
     async def create_browser_context(self, playwright) -> Browser:
         """Create a new browser context with proxy and random user agent."""
@@ -179,152 +456,33 @@ class PaknSaveScraper:
             viewport={"width": 1920, "height": 1080},
             device_scale_factor=1,
         )
+        await self.resource_policy.apply(context)
         return browser, context
 
-
-
-    async def fetch_categories(self, page: Page) -> List[Dict[str, str]]:
-        """Enhanced category fetching with better selectors."""
-        try:
-            await self.safe_get(page, f"{self.config.base_url}/shop")
-            await asyncio.sleep(2)
-
-            # Wait for and click the category menu
-            await page.wait_for_selector('button[data-testid="category-nav-button"]')
-            await page.click('button[data-testid="category-nav-button"]')
-            
-            # Wait for category panel
-            await page.wait_for_selector('div[data-testid="category-panel"]')
-            
-            categories = []
-            category_elements = await page.query_selector_all('div[data-testid="category-panel"] a')
-            
-            for element in category_elements:
-                category_name = await element.inner_text()
-                href = await element.get_attribute('href')
-                
-                if href and category_name.strip():
-                    full_url = f"{self.config.base_url}{href}"
-                    categories.append({
-                        "name": category_name.strip(),
-                        "url": full_url,
-                        "parent": None
-                    })
-            
-            return categories
-        except Exception as e:
-            logging.error(f"Error in fetch_categories: {e}", exc_info=True)
-            return []
-
-    async def extract_product_data(self, entry) -> Optional[Dict]:
-        """Extract product data from the product entry."""
-        product = {
-            "sourceSite": "paknsave.co.nz",
-            "lastChecked": datetime.now().isoformat(),
-            "lastUpdated": datetime.now().isoformat()
-        }
-
-        try:
-            # Extract product name
-            name_element = await entry.query_selector('p[data-testid="product-title"]')
-            if name_element:
-                product_name = await name_element.inner_text()
-                product["name"] = product_name.strip() if product_name else None
-
-            # Extract product subtitle
-            subtitle_element = await entry.query_selector('p[data-testid="product-subtitle"]')
-            if subtitle_element:
-                product["subtitle"] = (await subtitle_element.inner_text()).strip()
-
-            # Extract image URL
-            img_element = await entry.query_selector('img')
-            if img_element:
-                product["imageUrl"] = await img_element.get_attribute("src")
-
-            # Extract price
-            price_element = await entry.query_selector('p[data-testid="price-dollars"]')
-            if price_element:
-                price_dollars = await price_element.inner_text()
-                cents_element = await entry.query_selector('p[data-testid="price-cents"]')
-                price_cents = await cents_element.inner_text() if cents_element else "00"
-                product["price"] = f"{price_dollars}.{price_cents}"
-
-            # Extract product ID
-            data_testid = await entry.get_attribute("data-testid")
-            if data_testid:
-                match = re.search(r'product-(\d+)-', data_testid)
-                product["product_id"] = f"pk{match.group(1)}" if match else None
-
-            return product if product.get("name") else None
-
-        except Exception as e:
-            logging.error(f"Error in extract_product_data: {e}")
-            return None
-
-    def transform_to_frappe_format(self, product: Dict) -> Dict:
-        """Transform scraped product data to Frappe format."""
-        try:
-            price_str = product.get('price', '0.00')
-            current_price = float(price_str)
-        except ValueError:
-            current_price = 0.00
-
-        product_id = product.get("product_id")
-        product_name = product.get("name")
-        category = product.get("category")
-        source_site = product.get("sourceSite")
-        
-        unit_info = self.extract_unit_info(product.get('name', ''), product.get('subtitle', ''))
+    def transform_to_frappe_format(self, record: ProductRecord) -> Dict:
+        """Transform a scraped product record to Frappe format."""
+        current_price = record.current_price()
+        unit_info = extract_unit_info(record.name or '', record.subtitle or '', current_price)
 
         transformed_product = {
-            "product_id": product_id,
-            "productname": product_name,
-            "category": category,
-            "source_site": source_site,
+            "product_id": record.product_id,
+            "productname": record.name,
+            "category": record.category,
+            "source_site": record.source_site,
             "size": unit_info['size'],
-            "image_url": product.get('imageUrl', ''),
+            "image_url": record.image_url or '',
             "unit_price": unit_info['unit_price'] or current_price,
             "unit_name": unit_info['unit_name'],
-            "original_unit_quantity": 1.0,
+            "original_unit_quantity": unit_info['quantity'],
             "current_price": current_price,
             "price_history": '',
-            "last_updated": product['lastUpdated'],
-            "last_checked": product['lastChecked'],
-            "product_categories": self.build_category_hierarchy(product.get('category', ''))
+            "last_updated": record.checked_at,
+            "last_checked": record.checked_at,
+            "product_categories": self.build_category_hierarchy(record.category or '')
         }
 
         return transformed_product
 
-    def extract_unit_info(self, name: str, subtitle: str) -> Dict:
-        """Extract unit information from product name and subtitle."""
-        units = {
-            'kg': ['kg', 'kilo', 'kilogram'],
-            'g': ['g', 'gram'],
-            'l': ['l', 'liter', 'litre'],
-            'ml': ['ml', 'milliliter', 'millilitre'],
-            'ea': ['ea', 'each', 'unit', '']
-        }
-        
-        unit_info = {
-            'size': '',
-            'unit_name': 'ea',
-            'unit_price': None
-        }
-        
-        full_text = f"{name} {subtitle}".lower()
-        pattern = r'(\d+(?:\.\d+)?)\s*([a-zA-Z]+)'
-        matches = re.findall(pattern, full_text)
-        
-        if matches:
-            for value, unit in matches:
-                for std_unit, variations in units.items():
-                    if unit in variations:
-                        unit_info['size'] = f"{value}{std_unit}"
-                        unit_info['unit_name'] = std_unit
-                        break
-        
-        return unit_info
-
     def build_category_hierarchy(self, category: str) -> List[str]:
         """Build a hierarchical category list."""
         if not category:
@@ -337,91 +495,154 @@ class PaknSaveScraper:
             
         return hierarchy
 
-    async def scrape_products(self, page, start_url: str) -> List[Dict]:
-            """Scrape products from the starting URL."""
-            products = []
-            try:
-                await self.safe_get(page, start_url)
-                
-                while True:
-                    await asyncio.sleep(random.uniform(2, 5))
-                    product_elements = await page.query_selector_all('div[data-testid$="-EA-000"]')
-
-                    for element in product_elements:
-                        product_data = await self.extract_product_data(element)
-                        if product_data:
-                            # Get product URL for fetching details
-                            url_element = await element.query_selector('a[href]')
-                            if url_element:
-                                href = await url_element.get_attribute('href')
-                                full_url = f"{self.config.base_url}{href}"
-                                
-                                # Use the existing browser instance
-                                product_page = await self.browser.new_page()
-                                
-                                # Fetch details including categories
-                                details = await self.fetch_product_details(product_page, full_url)
-                                product_data.update(details)
-                                
-                                await product_page.close()
-
-                                # Transform and write to Frappe
-                                frappe_product = self.transform_to_frappe_format(product_data)
-                                try:
-                                    test_write_to_frappe(frappe_product)
-                                    logging.info(f"Successfully sent product to Frappe: {frappe_product['productname']}")
-                                    products.append(product_data)
-                                except Exception as e:
-                                    logging.error(f"Error writing product to Frappe: {e}")
-
-                    next_page = await page.query_selector('a[data-testid="pagination-increment"]')
-                    if next_page:
-                        await next_page.click()
-                        await page.wait_for_load_state('networkidle')
+    async def scrape_products(self, page, start_url: str, pool: Optional[PagePool] = None,
+                              category_url: Optional[str] = None) -> List[ProductRecord]:
+        """Scrape products from the starting URL, fetching product pages concurrently.
+
+        With a `category_url`, progress is checkpointed under that key.
+        """
+        products = []
+        scraped = 0
+        owns_pool = pool is None
+        if owns_pool:
+            pool = PagePool(self, self.config.pages_per_category)
+        checkpoint = self.checkpoint if category_url else None
+        try:
+            await self.safe_get(page, start_url)
+            await self.waiter.listing(page)
+
+            while True:
+                if checkpoint:
+                    checkpoint.start_page(category_url, page.url)
+                self.metrics.inc('pages')
+                await self.politeness_sleep(self.config.listing_delay)
+
+                # Read every tile in one round-trip before fanning out to product pages
+                tiles = []
+                checked_at = datetime.now().isoformat()
+                with self.metrics.timer('extract'):
+                    listing_tiles = await extract_listing_tiles(page)
+                for tile in listing_tiles:
+                    product_data = self.tile_to_product(tile, checked_at)
+                    if not product_data or not tile.get('href'):
+                        continue
+                    if checkpoint and checkpoint.processed(product_data.product_id):
+                        continue
+                    tiles.append((product_data, f"{self.config.base_url}{tile['href']}"))
+                if checkpoint:
+                    # The page stays the resume position until Frappe has accepted all of these
+                    checkpoint.page_listed(category_url, [product_data.product_id for product_data, _ in tiles])
+
+                results = await asyncio.gather(
+                    *(self.scrape_product(pool, product_data, product_url) for product_data, product_url in tiles)
+                )
+                for product in results:
+                    if not product:
+                        continue
+                    scraped += 1
+                    self.metrics.inc('products')
+                    # Streamed products are on disk already; only keep them when there is no output file
+                    if self.output:
+                        self.output.write(product.to_dict())
                     else:
-                        break
+                        products.append(product)
 
-                return products
+                next_page = await page.query_selector('a[data-testid="pagination-increment"]')
+                if not next_page:
+                    break
+                if not await self.paginate(page, next_page):
+                    # Not marked scraped, so a checkpointed crawl resumes at this page
+                    logging.warning(f"Blocked paginating {page.url}; leaving {start_url} unfinished")
+                    return products
 
-            except Exception as e:
-                logging.error(f"Error scraping products: {e}")
-                return products
+            if checkpoint:
+                checkpoint.category_scraped(category_url)
+            logging.info(f"Scraped {scraped} products from {start_url}")
+            return products
+
+        except Exception as e:
+            logging.error(f"Error scraping products: {e}")
+            return products
+
+        finally:
+            if owns_pool:
+                await pool.close()
+
+    async def scrape_product(self, pool: PagePool, product_data: ProductRecord,
+                             product_url: str) -> Optional[ProductRecord]:
+        """Fetch details for one product on a pooled page and queue it for Frappe."""
+        try:
+            async with pool.page() as product_page:
+                with self.metrics.timer('detail_fetch'):
+                    details = await self.fetch_product_details(product_page, product_url)
+            product_data.update(details)
+
+            # The sink turns the record into its Frappe payload (see frappe_payload);
+            # put waits only when the Frappe writers have fallen behind
+            await self.sink.put(product_data)
+            return product_data
+        except Exception as e:
+            logging.error(f"Error processing product {product_url}: {e}")
+            return None
+
+    async def scrape_category(self, category: Dict[str, str]) -> List[ProductRecord]:
+        """Scrape one category with its own listing page and product page pool."""
+        listing_page = await self.new_page()
+        pool = PagePool(self, self.config.pages_per_category)
+        try:
+            start_url = category["url"]
+            if self.checkpoint and self.checkpoint.resume_url(category["url"]):
+                start_url = self.checkpoint.resume_url(category["url"])
+                logging.info(f"Resuming category {category['name']} at {start_url}")
+            else:
+                logging.info(f"Starting to scrape category: {category['name']}")
+            products = await self.scrape_products(listing_page, start_url, pool, category_url=category["url"])
+
+            # Products are already queued for Frappe in scrape_products
+            self.all_products.extend(products)
+            logging.info(f"Completed scraping {category['name']}")
+            return products
+        except Exception as e:
+            logging.error(f"Error scraping category {category['name']}: {e}")
+            return []
+        finally:
+            await pool.close()
+            await listing_page.close()
 
     async def scrape_all_categories(self, playwright):
-        """Scrape products from all categories."""
+        """Scrape products from all categories, several categories at a time."""
         try:
             # Initialize the main browser instance
+            self.start_metrics()
             self.browser = await self.initialize_browser(playwright)
-            
+
             # First browser session to fetch categories
-            category_page = await self.browser.new_page()
+            category_page = await self.new_page()
             categories = await self.fetch_categories(category_page)
             await category_page.close()
 
             if not categories:
                 logging.error("No categories found to process")
                 return []
-            
-            for category in categories:
-                try:
-                    logging.info(f"Starting to scrape category: {category['name']}")
-                    
-                    # Create new page in existing browser session
-                    product_page = await self.browser.new_page()
-                    
-                    products = await self.scrape_products(product_page, category["url"])
-                    
-                    # Products are already written to Frappe in scrape_products
-                    self.all_products.extend(products)
-                    logging.info(f"Completed scraping {len(products)} products from {category['name']}")
-                    
-                    # Close the page for this category
-                    await product_page.close()
-                    
-                except Exception as e:
-                    logging.error(f"Error scraping category {category['name']}: {e}")
-                    continue
-                    
+
+            if self.checkpoint:
+                categories = [category for category in categories if not self.checkpoint.is_done(category['url'])]
+                logging.info(f"{len(categories)} categories left to scrape")
+
+            await self.open_sink()
+            category_slots = asyncio.Semaphore(max(1, self.config.concurrent_categories))
+
+            async def run_category(category):
+                async with category_slots:
+                    return await self.scrape_category(category)
+
+            await asyncio.gather(*(run_category(category) for category in categories))
+
+            await self.close_sink()
+            if self.checkpoint and all(self.checkpoint.is_done(category['url']) for category in categories):
+                logging.info("Crawl complete, clearing checkpoint")
+                self.checkpoint.finish()
+
             # Close the browser when done
             await self.browser.close()
             return self.all_products
@@ -432,75 +653,31 @@ class PaknSaveScraper:
                 await self.browser.close()
             return []
 
+        finally:
+            await self.close_sink()
+            self.report_metrics()
+
     async def fetch_product_details(self, page, product_url: str) -> Dict:
-        """Fetch additional details from individual product page."""
+        """Fetch additional details from a single load of the product page."""
         details = {}
         try:
             await self.safe_get(page, product_url)
+            await self.waiter.product(page)
+
+            # Every field, breadcrumbs included, comes from one in-page script
+            with self.metrics.timer('extract'):
+                raw = await extract_product_page(page)
+            details['category_data'] = self.build_category_data(raw['breadcrumbs'], raw['name'])
 
-            # Fetch categories with new structure
-            category_data = await self.fetch_product_categories(product_url)
-            details['category_data'] = category_data
-
-            # Get product name
-            name_elem = await page.query_selector('[data-testid="product-title"]')
-            if name_elem:
-                details['name'] = await name_elem.inner_text()
-
-            # Get product description
-            description_elem = await page.query_selector("div.fs-product-details__description")
-            if description_elem:
-                details['description'] = await description_elem.inner_text()
-
-            # Get nutritional information
-            nutrition_table = await page.query_selector("table.fs-nutritional-info")
-            if nutrition_table:
-                nutrition_data = {}
-                rows = await nutrition_table.query_selector_all("tr")
-                for row in rows:
-                    cols = await row.query_selector_all("td")
-                    if len(cols) >= 2:
-                        key = await cols[0].inner_text()
-                        value = await cols[1].inner_text()
-                        nutrition_data[key.strip()] = value.strip()
-                details['nutritionalInfo'] = nutrition_data
-
-            # Get ingredients
-            ingredients_elem = await page.query_selector("div.fs-product-details__ingredients")
-            if ingredients_elem:
-                details['ingredients'] = await ingredients_elem.inner_text()
-
-            # Get brand information
-            brand_elem = await page.query_selector("div.fs-product-details__brand")
-            if brand_elem:
-                details['brand'] = await brand_elem.inner_text()
-
-            # Get price information
-            price_dollars = await page.query_selector('p[data-testid="price-dollars"]')
-            price_cents = await page.query_selector('p[data-testid="price-cents"]')
-            if price_dollars and price_cents:
-                dollars = await price_dollars.inner_text()
-                cents = await price_cents.inner_text()
-                details['price'] = f"{dollars}.{cents}"
-
-            # Get product subtitle (usually contains size/weight information)
-            subtitle_elem = await page.query_selector('[data-testid="product-subtitle"]')
-            if subtitle_elem:
-                details['subtitle'] = await subtitle_elem.inner_text()
-
-            # Get product image URL
-            img_elem = await page.query_selector('img[data-testid="product-image"]')
-            if img_elem:
-                details['imageUrl'] = await img_elem.get_attribute('src')
-
-            # Get any promotional information
-            promo_elem = await page.query_selector("div.fs-product-details__promotion")
-            if promo_elem:
-                details['promotion'] = await promo_elem.inner_text()
-
-            # Add timestamp information
-            details['lastChecked'] = datetime.now().isoformat()
-            details['lastUpdated'] = datetime.now().isoformat()
+            for field in ('name', 'description', 'ingredients', 'brand', 'subtitle', 'imageUrl', 'promotion'):
+                if raw[field] is not None:
+                    details[field] = raw[field]
+
+            if raw['nutrition'] is not None:
+                details['nutritionalInfo'] = {key.strip(): value.strip() for key, value in raw['nutrition']}
+
+            if raw['dollars'] is not None and raw['cents'] is not None:
+                details['price'] = f"{raw['dollars']}.{raw['cents']}"
 
             logging.info(f"Successfully fetched product details from {product_url}")
             return details
@@ -518,172 +695,91 @@ class PaknSaveScraper:
         finally:
             try:
                 # Ensure we've captured essential information even if there were errors
-                if 'lastChecked' not in details:
-                    details['lastChecked'] = datetime.now().isoformat()
-                if 'lastUpdated' not in details:
-                    details['lastUpdated'] = datetime.now().isoformat()
                 if 'category_data' not in details:
                     details['category_data'] = {'full_hierarchy': '', 'category': '', 'categories_list': []}
             except Exception as e:
                 logging.error(f"Error in finally block of fetch_product_details: {e}")
 
-    async def fetch_product_categories(self, product_url: str) -> Dict[str, str]:
-        """Fetch categories for a specific product using a fresh browser session."""
-        try:
-            context = await self.browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            )
-            
-            page = await context.new_page()
-            
-            try:
-                await self.safe_get(page, product_url)
-                await asyncio.sleep(5)
-                
-                category_data = {
-                    'categories_list': [],
-                    'category': '',
-                    'product_categories': []
-                }
-                
-                categories = []
-                
-                # Extract the categories
-                breadcrumbs = await page.query_selector('nav[aria-label="Breadcrumbs"]')
-                if breadcrumbs:
-                    for i in range(3):
-                        category = await page.query_selector(f'[data-testid="product-category-{i}"] p')
-                        if category:
-                            category_text = await category.inner_text()
-                            if category_text:
-                                categories.append(category_text.strip())
-                
-                # Get product name without 'ea' suffix
-                product_name = await page.query_selector('[data-testid="product-title"]')
-                if product_name:
-                    product_name_text = (await product_name.inner_text()).strip()
-                    product_name_cleaned = re.sub(r'\s*ea\s*$', '', product_name_text)  # Remove 'ea' suffix
-                    categories.append(product_name_cleaned)
-                
-                # Set the individual category names
-                for i, cat in enumerate(categories):
-                    category_data[f'category_name_{i+1}'] = cat
-                
-                # Set the 3rd category
-                if len(categories) >= 3:
-                    category_data['category'] = categories[2]  # 3rd category
-                
-                # Populate product_categories
-                category_data['product_categories'] = [{'doctype': 'Product Category', 'category_name': cat} for cat in categories]
-                
-                logging.info(f"Extracted categories: {categories}")
-                return category_data
-                
-            except Exception as e:
-                logging.error(f"Error fetching product categories: {e}")
-                return {}
-                
-            finally:
-                await context.close()
-        except Exception as e:
-            logging.error(f"Error creating browser context: {e}")
-            return {}
-
-    def extract_unit_info(self, name: str, subtitle: str) -> Dict:
-        """Extract unit information from product name and subtitle."""
-        units = {
-            'kg': ['kg', 'kilo', 'kilogram'],
-            'g': ['g', 'gram'],
-            'l': ['l', 'liter', 'litre'],
-            'ml': ['ml', 'milliliter', 'millilitre'],
-            'ea': ['ea', 'each', 'unit', '']
-        }
-        
-        unit_info = {
-            'size': '',
-            'unit_name': 'ea',
-            'unit_price': None
-        }
-        
-        full_text = f"{name} {subtitle}".lower()
-        pattern = r'(\d+(?:\.\d+)?)\s*([a-zA-Z]+)'
-        matches = re.findall(pattern, full_text)
-        
-        if matches:
-            for value, unit in matches:
-                for std_unit, variations in units.items():
-                    if unit in variations:
-                        unit_info['size'] = f"{value}{std_unit}"
-                        unit_info['unit_name'] = std_unit
-                        break
-        
-        return unit_info
-
-    async def extract_product_data(self, entry) -> Optional[Dict]:
-        """Extract product data from the product entry."""
-        product = {
-            "sourceSite": "paknsave.co.nz",
-            "lastChecked": datetime.now().isoformat(),
-            "lastUpdated": datetime.now().isoformat()
+    def build_category_data(self, breadcrumbs: List[str], product_name: Optional[str]) -> Dict:
+        """Build the category structure from breadcrumb texts and the product title."""
+        category_data = {
+            'categories_list': [],
+            'category': '',
+            'product_categories': []
         }
 
-        try:
-            name_element = await entry.query_selector('p[data-testid="product-title"]')
-            if name_element:
-                product_name = await name_element.inner_text()
-                product["name"] = product_name.strip() if product_name else None
-                logging.info(f"Extracted product name: {product['name']}")
-
-            subtitle_element = await entry.query_selector('p[data-testid="product-subtitle"]')
-            if subtitle_element:
-                product["subtitle"] = (await subtitle_element.inner_text()).strip()
-
-            img_element = await entry.query_selector('img')
-            if img_element:
-                product["imageUrl"] = await img_element.get_attribute("src")
-
-            price_element = await entry.query_selector('p[data-testid="price-dollars"]')
-            if price_element:
-                price_dollars = await price_element.inner_text()
-                cents_element = await entry.query_selector('p[data-testid="price-cents"]')
-                price_cents = await cents_element.inner_text() if cents_element else "00"
-                product["price"] = f"{price_dollars}.{price_cents}"
-
-            data_testid = await entry.get_attribute("data-testid")
-            if data_testid:
-                match = re.search(r'product-(\d+)-', data_testid)
-                product["product_id"] = f"pk{match.group(1)}" if match else None
-
-            return product if product.get("name") else None
+        categories = [crumb.strip() for crumb in breadcrumbs if crumb]
+        # The breadcrumbs alone, for mapping onto the Google taxonomy
+        category_data['breadcrumbs'] = list(categories)
 
-        except Exception as e:
-            logging.error(f"Error in extract_product_data: {e}")
-            return None
+        # Get product name without 'ea' suffix
+        if product_name:
+            categories.append(re.sub(r'\s*ea\s*$', '', product_name.strip()))
+
+        # Set the individual category names
+        for i, cat in enumerate(categories):
+            category_data[f'category_name_{i+1}'] = cat
+
+        # Set the 3rd category
+        if len(categories) >= 3:
+            category_data['category'] = categories[2]  # 3rd category
+
+        # Populate product_categories
+        category_data['product_categories'] = [{'doctype': 'Product Category', 'category_name': cat} for cat in categories]
+
+        logging.info(f"Extracted categories: {categories}")
+        return category_data
+
+    def tile_to_product(self, tile: Dict, checked_at: Optional[str] = None) -> Optional[ProductRecord]:
+        """Turn the raw fields of a listing tile into a product record.
+
+        Pass one `checked_at` for every tile of a listing page to share the timestamp.
+        """
+        product = ProductRecord(checked_at=checked_at or datetime.now().isoformat())
+
+        if tile.get('name') is not None:
+            product.name = tile['name'].strip() or None
+        if tile.get('subtitle') is not None:
+            product.subtitle = tile['subtitle'].strip()
+        if tile.get('imageUrl') is not None:
+            product.image_url = tile['imageUrl']
+        if tile.get('dollars') is not None:
+            product.price = f"{tile['dollars']}.{tile.get('cents') or '00'}"
+        if tile.get('testid'):
+            match = re.search(r'product-(\d+)-', tile['testid'])
+            product.product_id = f"pk{match.group(1)}" if match else None
+
+        return product if product.name else None
 
     async def scrape_all_products(self, playwright):
         """Scrape all products starting from the main shop page."""
         try:
             start_url = f"{self.config.base_url}/shop"
+            self.start_metrics()
+            await self.open_sink()
             
-            main_browser = await playwright.chromium.launch(headless=False)
-            main_page = await main_browser.new_page()
+            self.browser = await self.initialize_browser(playwright)
+            main_page = await self.new_page()
             
             products = await self.scrape_products(main_page, start_url)
             self.all_products.extend(products)
             
-            await main_browser.close()
+            await self.browser.close()
             return self.all_products
 
         except Exception as e:
             logging.error(f"Error in scrape_all_products: {e}")
             return []
+
+        finally:
+            await self.close_sink()
+            self.report_metrics()
             
          
     async def fetch_categories(self, page) -> List[Dict[str, str]]:
         """Fetch all available categories from the website."""
         try:
-            await self.safe_get(page, 'https://www.paknsave.co.nz/shop/category/fresh-foods-and-bakery?pg=1')
+            await self.safe_get(page, f"{self.config.base_url}/shop/category/fresh-foods-and-bakery?pg=1")
 
             # Close the tooltip if it appears
             try:
@@ -699,7 +795,7 @@ class PaknSaveScraper:
             if groceries_button:
                 await groceries_button.click()
                 logging.info("Clicked on the 'Groceries' menu item")
-                await asyncio.sleep(2)
+                await self.waiter.selector(page, 'button._177qnsx7', 'menu')
 
             categories = []
             category_elements = await page.query_selector_all('button._177qnsx7')
@@ -725,18 +821,22 @@ async def main():
     config = ScraperConfig(
         base_url="https://www.paknsave.co.nz",
         page_load_delay=int(os.environ.get("PAGE_LOAD_DELAY", 7)),
-        product_log_delay=float(os.environ.get("PRODUCT_LOG_DELAY", 0.02))
+        product_log_delay=float(os.environ.get("PRODUCT_LOG_DELAY", 0.02)),
+        frappe_bulk=os.environ.get("FRAPPE_BULK", "0") == "1",
+        metrics_port=int(os.environ["METRICS_PORT"]) if os.environ.get("METRICS_PORT") else None,
+        output_path=os.environ.get(
+            "OUTPUT_PATH", f"paknsave_products_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.ndjson"
+        )
     )
 
-    filename = f"paknsave_products_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
-    
     async with async_playwright() as p:
         scraper = PaknSaveScraper(config)
-        all_products = await scraper.scrape_all_categories(p)
-        
-        # Save final results
-        await scraper.save_products_to_json(filename)
-        logging.info(f"Scraping completed. Results written to {filename}")
+        await scraper.scrape_all_categories(p)
+        logging.info(f"Scraping completed. Results written to {config.output_path}")
+
+        # The pretty-printed export is optional now that results stream to NDJSON
+        if os.environ.get("EXPORT_JSON", "0") == "1":
+            await scraper.save_products_to_json(config.output_path.rsplit('.', 1)[0] + '.json')
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
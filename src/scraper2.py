@@ -9,6 +9,7 @@ from typing import List, Dict, Optional
 from dataclasses import dataclass
 from playwright.async_api import async_playwright
 from frappe_api import test_write_to_frappe
+from units import extract_unit_info
 
 # Configure logging
 logging.basicConfig(
@@ -210,7 +211,7 @@ class PaknSaveScraper:
             current_price = 0.00
 
         # Extract unit information
-        unit_info = self.extract_unit_info(product.get('name', ''), product.get('subtitle', ''))
+        unit_info = extract_unit_info(product.get('name', ''), product.get('subtitle', ''), current_price)
 
         # Process product categories to ensure they are in the correct format
         categories = []
@@ -229,7 +230,7 @@ class PaknSaveScraper:
             "image_url": product.get('imageUrl', ''),
             "unit_price": unit_info['unit_price'] or current_price,
             "unit_name": unit_info['unit_name'],
-            "original_unit_quantity": 1.0,
+            "original_unit_quantity": unit_info['quantity'],
             "current_price": current_price,
             "price_history": '',
             "last_updated": product['lastUpdated'],
@@ -361,36 +362,6 @@ class PaknSaveScraper:
 
 
 
-    def extract_unit_info(self, name: str, subtitle: str) -> Dict:
-        """Extract unit information from product name and subtitle."""
-        units = {
-            'kg': ['kg', 'kilo', 'kilogram'],
-            'g': ['g', 'gram'],
-            'l': ['l', 'liter', 'litre'],
-            'ml': ['ml', 'milliliter', 'millilitre'],
-            'ea': ['ea', 'each', 'unit', '']
-        }
-        
-        unit_info = {
-            'size': '',
-            'unit_name': 'ea',
-            'unit_price': None
-        }
-        
-        full_text = f"{name} {subtitle}".lower()
-        pattern = r'(\d+(?:\.\d+)?)\s*([a-zA-Z]+)'
-        matches = re.findall(pattern, full_text)
-        
-        if matches:
-            for value, unit in matches:
-                for std_unit, variations in units.items():
-                    if unit in variations:
-                        unit_info['size'] = f"{value}{std_unit}"
-                        unit_info['unit_name'] = std_unit
-                        break
-        
-        return unit_info
-
     async def extract_product_data(self, entry) -> Optional[Dict]:
         """Extract product data from the product entry."""
         product = {
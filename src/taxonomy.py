@@ -0,0 +1,136 @@
+import json
+import logging
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'taxonomy.en-US.txt')
+SEPARATOR = ' > '
+
+
+class Taxonomy:
+    """The Google product taxonomy as an id-indexed tree.
+
+    Node ids are positions in `names`/`parents` (file order, so a parent always comes
+    before its children); roots have parent -1. Ancestors and paths walk parent ids,
+    so they cost O(depth). Only names, parents and the version are serialised; every
+    index is rebuilt from them.
+    """
+
+    def __init__(self, names: List[str], parents: List[int], version: str = ''):
+        self.names = names
+        self.parents = parents
+        self.version = version
+        self.children: List[List[int]] = [[] for _ in names]
+        self.roots: List[int] = []
+        for node, parent in enumerate(parents):
+            (self.children[parent] if parent >= 0 else self.roots).append(node)
+
+        # Full path -> id, and lower-cased node name -> ids (names repeat under different parents)
+        self.path_index: Dict[str, int] = {}
+        self.name_index: Dict[str, List[int]] = {}
+        for node, name in enumerate(names):
+            self.path_index[self.path(node)] = node
+            self.name_index.setdefault(name.lower(), []).append(node)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_TAXONOMY_PATH) -> 'Taxonomy':
+        """Parse a taxonomy.en-US.txt style file: one full ' > ' separated path per line."""
+        names: List[str] = []
+        parents: List[int] = []
+        version = ''
+        index: Dict[str, int] = {}
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith('#'):
+                    version = line.split(':', 1)[-1].strip()
+                    continue
+                if not line:
+                    continue
+                parts = line.split(SEPARATOR)
+                parent = -1
+                # Walk down the path, adding any level the file has not listed on its own line
+                for depth in range(len(parts)):
+                    key = SEPARATOR.join(parts[:depth + 1])
+                    if key not in index:
+                        index[key] = len(names)
+                        names.append(parts[depth])
+                        parents.append(parent)
+                    parent = index[key]
+        return cls(names, parents, version)
+
+    @classmethod
+    def load(cls, path: str) -> 'Taxonomy':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['names'], data['parents'], data.get('version', ''))
+
+    def save(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'names': self.names, 'parents': self.parents}, f, ensure_ascii=False)
+
+    def ancestors(self, node: int) -> List[int]:
+        """Ids from the root down to the node's parent."""
+        chain = []
+        parent = self.parents[node]
+        while parent >= 0:
+            chain.append(parent)
+            parent = self.parents[parent]
+        return chain[::-1]
+
+    def path_names(self, node: int) -> List[str]:
+        return [self.names[ancestor] for ancestor in self.ancestors(node)] + [self.names[node]]
+
+    def path(self, node: int) -> str:
+        return SEPARATOR.join(self.path_names(node))
+
+    def depth(self, node: int) -> int:
+        return len(self.ancestors(node))
+
+    def is_leaf(self, node: int) -> bool:
+        return not self.children[node]
+
+    def leaves(self) -> List[int]:
+        return [node for node in range(len(self.names)) if not self.children[node]]
+
+    def find(self, path: str) -> Optional[int]:
+        """The id of a full ' > ' separated path, or None."""
+        return self.path_index.get(path.strip())
+
+    def lookup(self, name: str) -> List[int]:
+        """Ids of every node with this name, case-insensitively."""
+        return self.name_index.get(name.strip().lower(), [])
+
+    def lookup_paths(self, name: str) -> List[str]:
+        return [self.path(node) for node in self.lookup(name)]
+
+
+def load_taxonomy(path: str = DEFAULT_TAXONOMY_PATH, cache_path: Optional[str] = None) -> Taxonomy:
+    """Parse the taxonomy, or load it from `cache_path` if that is newer than the source file."""
+    if cache_path and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+        return Taxonomy.load(cache_path)
+    taxonomy = Taxonomy.from_file(path)
+    logging.info(f"Parsed {len(taxonomy)} taxonomy nodes from {path}")
+    if cache_path:
+        taxonomy.save(cache_path)
+    return taxonomy
+
+
+@lru_cache(maxsize=None)
+def get_taxonomy(path: str = DEFAULT_TAXONOMY_PATH) -> Taxonomy:
+    """The taxonomy at `path`, parsed once per process."""
+    return load_taxonomy(path)
+
+
+if __name__ == "__main__":
+    taxonomy = get_taxonomy()
+    print(f"{len(taxonomy)} nodes, {len(taxonomy.leaves())} leaves, version {taxonomy.version}")
+    for path in taxonomy.lookup_paths('Breads & Buns'):
+        print(path)
@@ -0,0 +1,118 @@
+import logging
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import torch
+from sentence_transformers import SentenceTransformer, util
+
+from embedding_cache import EmbeddingCache, model_slug, table_hash
+from product_stream import iter_products, open_writer
+from taxonomy import SEPARATOR, Taxonomy, get_taxonomy
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+
+def breadcrumb_path(product: Dict) -> str:
+    """A scraped product's breadcrumbs as one ' > ' separated path ('' if it has none)."""
+    crumbs = product.get('category_data', {}).get('breadcrumbs') or []
+    return SEPARATOR.join(crumb.strip() for crumb in crumbs if crumb and crumb.strip())
+
+
+class TaxonomyMapper:
+    """Maps scraped breadcrumb paths onto Google taxonomy nodes by embedding similarity.
+
+    Every taxonomy path is embedded once into a normalised matrix, cached on disk.
+    Each distinct breadcrumb path is embedded once per mapper, however many products
+    share it, and scored against the whole matrix in one matmul.
+    """
+
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', model=None, taxonomy: Optional[Taxonomy] = None,
+                 top_k: int = 3, batch_size: int = 256, cache_dir: Optional[str] = 'embedding_cache',
+                 within: Optional[str] = None):
+        # As with ProductClassifier, give an injected model a model_name of its own
+        self.model = model if model is not None else SentenceTransformer(model_name)
+        self.model_name = model_name
+        self.taxonomy = taxonomy or get_taxonomy()
+        self.top_k = top_k
+        self.batch_size = batch_size
+
+        # `within` limits the candidates to one subtree, e.g. 'Food, Beverages & Tobacco'
+        nodes = range(len(self.taxonomy))
+        if within:
+            root = self.taxonomy.find(within)
+            if root is None:
+                raise ValueError(f"Unknown taxonomy path: {within}")
+            nodes = [node for node in nodes if node == root or root in self.taxonomy.ancestors(node)]
+        self.nodes: List[int] = list(nodes)
+        self.paths = [self.taxonomy.path(node) for node in self.nodes]
+        self.matrix = self.load_matrix(cache_dir)
+
+        # breadcrumb path -> [(taxonomy node id, score)], best first
+        self.matches: Dict[str, List[Tuple[int, float]]] = {}
+
+    def load_matrix(self, cache_dir: Optional[str]) -> torch.Tensor:
+        cache = None
+        if cache_dir:
+            key = table_hash([self.model_name, self.paths])
+            cache = EmbeddingCache(cache_dir, f"{model_slug(self.model_name)}-taxonomy-{key[:16]}", key=key)
+            cached_paths, matrix = cache.load()
+            if cached_paths == self.paths:
+                return matrix
+
+        logging.info(f"Embedding {len(self.paths)} taxonomy paths")
+        embeddings = self.model.encode(self.paths, batch_size=self.batch_size, convert_to_tensor=True)
+        matrix = util.normalize_embeddings(embeddings)
+        if cache:
+            cache.save(self.paths, matrix)
+        return matrix
+
+    def map_paths(self, paths: Iterable[str]) -> Dict[str, List[Tuple[int, float]]]:
+        """Top-k taxonomy nodes for each path, embedding only the paths not seen before."""
+        paths = list(dict.fromkeys(path for path in paths if path))
+        pending = [path for path in paths if path not in self.matches]
+        if pending:
+            embeddings = self.model.encode(pending, batch_size=self.batch_size, convert_to_tensor=True)
+            k = min(self.top_k, len(self.nodes))
+            for start in range(0, len(pending), self.batch_size):
+                queries = util.normalize_embeddings(embeddings[start:start + self.batch_size].to(self.matrix))
+                scores, rows = torch.topk(queries @ self.matrix.T, k, dim=1)
+                for path, row_scores, row_ids in zip(pending[start:start + self.batch_size], scores.tolist(), rows.tolist()):
+                    self.matches[path] = [(self.nodes[row], score) for row, score in zip(row_ids, row_scores)]
+        return {path: self.matches[path] for path in paths}
+
+    def annotate(self, product: Dict) -> Dict:
+        """Add googleCategory (best path) and googleCategories (top-k with scores) to a product."""
+        matches = self.matches.get(breadcrumb_path(product), [])
+        product['googleCategories'] = [{'path': self.taxonomy.path(node), 'score': round(score, 3)} for node, score in matches]
+        product['googleCategory'] = product['googleCategories'][0]['path'] if matches else ''
+        return product
+
+    def map_products(self, products: Iterable[Dict], chunk_size: int = 1000) -> Iterator[Dict]:
+        """Annotate a stream of products, embedding each chunk's new breadcrumb paths together."""
+        products = iter(products)
+        while True:
+            chunk = list(islice(products, chunk_size))
+            if not chunk:
+                return
+            self.map_paths(breadcrumb_path(product) for product in chunk)
+            for product in chunk:
+                yield self.annotate(product)
+
+    def map_file(self, input_file: str, output_file: str) -> int:
+        """Annotate every product in an NDJSON (or JSON array) file; returns the product count."""
+        with open_writer(output_file) as writer:
+            for product in self.map_products(iter_products(input_file)):
+                writer.write(product)
+            count = writer.count
+        logging.info(f"Mapped {count} products using {len(self.matches)} distinct breadcrumb paths")
+        return count
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        print("Usage: python taxonomy_mapper.py products.ndjson mapped.ndjson")
+        sys.exit(1)
+    TaxonomyMapper().map_file(sys.argv[1], sys.argv[2])
@@ -0,0 +1,153 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+from checkpoint import CheckpointStore
+from fixture_server import FixtureCatalogue, FixtureServer, StubFrappeServer
+from product_stream import iter_products
+
+CATEGORY = 'http://shop/category/pantry?pg=1'
+PAGE_2 = 'http://shop/category/pantry?pg=2'
+
+
+def test_queued_but_unwritten_products_are_crawled_again(tmp_path):
+    path = str(tmp_path / 'checkpoint.sqlite')
+    store = CheckpointStore(path)
+    store.start_page(CATEGORY, CATEGORY)
+    store.page_listed(CATEGORY, ['pk1', 'pk2'])
+    store.start_page(CATEGORY, PAGE_2)
+    store.page_listed(CATEGORY, ['pk3'])
+    store.category_scraped(CATEGORY)
+    store.mark_processed(['pk3'])
+    store.close()  # killed with pk1 and pk2 still queued
+
+    store = CheckpointStore(path)
+    assert not store.is_done(CATEGORY)
+    assert store.resume_url(CATEGORY) == CATEGORY
+    assert store.processed('pk3')
+    assert not store.processed('pk1') and not store.processed('pk2')
+
+
+def test_position_moves_only_past_written_pages(tmp_path):
+    store = CheckpointStore(str(tmp_path / 'checkpoint.sqlite'))
+    store.start_page(CATEGORY, CATEGORY)
+    store.page_listed(CATEGORY, ['pk1', 'pk2'])
+    store.start_page(CATEGORY, PAGE_2)
+    store.page_listed(CATEGORY, ['pk3'])
+    store.mark_processed(['pk1'])
+    assert store.resume_url(CATEGORY) == CATEGORY
+    store.mark_processed(['pk3', 'pk2'])
+    assert store.resume_url(CATEGORY) == PAGE_2
+    assert not store.is_done(CATEGORY)
+    store.category_scraped(CATEGORY)
+    assert store.is_done(CATEGORY)
+
+
+def test_category_with_failed_writes_is_never_done(tmp_path):
+    store = CheckpointStore(str(tmp_path / 'checkpoint.sqlite'))
+    store.start_page(CATEGORY, CATEGORY)
+    store.page_listed(CATEGORY, ['pk1', 'pk2'])
+    store.category_scraped(CATEGORY)
+    store.mark_processed(['pk1'])  # pk2's write failed, so the sink never confirms it
+    assert not store.is_done(CATEGORY)
+    assert store.resume_url(CATEGORY) == CATEGORY
+
+
+def test_stale_checkpoint_is_discarded(tmp_path):
+    path = str(tmp_path / 'checkpoint.sqlite')
+    store = CheckpointStore(path)
+    store.start_page(CATEGORY, CATEGORY)
+    store.page_listed(CATEGORY, ['pk1', 'pk2'])
+    store.mark_processed(['pk1'])  # pk2 is rejected every night, so the crawl never completes
+    store.conn.execute('UPDATE run SET started_at = started_at - 13 * 3600')
+    store.conn.commit()
+    store.close()
+
+    store = CheckpointStore(path, max_age_hours=12)
+    assert not store.processed('pk1')
+    assert store.resume_url(CATEGORY) is None
+
+
+def test_resumed_crawl_keeps_its_output_file(tmp_path):
+    path = str(tmp_path / 'checkpoint.sqlite')
+    store = CheckpointStore(path)
+    assert store.output_path('products-first.ndjson') == 'products-first.ndjson'
+    store.close()
+
+    store = CheckpointStore(path)
+    assert store.output_path('products-second.ndjson') == 'products-first.ndjson'
+    store.finish()
+    store.close()
+
+    assert CheckpointStore(path).output_path('products-third.ndjson') == 'products-third.ndjson'
+
+
+# Runs one crawl of the fixture site; with a product count it kills itself once that many products are queued
+CRAWL_SCRIPT = '''
+import asyncio, os, sys
+from playwright.async_api import async_playwright
+import frappe_api
+from scraper import PaknSaveScraper, ScraperConfig
+
+base_url, frappe_url, workdir, kill_after = sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4])
+frappe_api.FRAPPE_URL = frappe_url
+config = ScraperConfig(base_url=base_url, proxy_list=[], headless=True, page_load_delay=0, host_requests_per_second=0,
+                       concurrent_categories=1, sink_workers=1, metrics_path=None,
+                       checkpoint_path=os.path.join(workdir, 'checkpoint.sqlite'),
+                       change_store_path=os.path.join(workdir, 'hashes.sqlite'),
+                       output_path=os.path.join(workdir, f'products-{kill_after}.ndjson'))
+scraper = PaknSaveScraper(config)
+
+
+async def kill_after_products():
+    while scraper.metrics.counters.get('products', 0) < kill_after:
+        await asyncio.sleep(0.01)
+    os._exit(1)
+
+
+async def main():
+    if kill_after:
+        asyncio.create_task(kill_after_products())
+    async with async_playwright() as p:
+        await scraper.scrape_all_categories(p)
+
+asyncio.run(main())
+'''
+
+
+def crawl(server, frappe, workdir, kill_after=0):
+    return subprocess.run(
+        [sys.executable, '-c', CRAWL_SCRIPT, server.base_url, frappe.resource_url, str(workdir), str(kill_after)],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, timeout=300
+    )
+
+
+def test_crawl_killed_mid_run_resumes_without_losing_products(chromium, tmp_path):
+    catalogue = FixtureCatalogue(categories=2, pages=3, products_per_page=20)
+    expected = sorted(f"pk{number}" for number in catalogue.products)
+    # A slow Frappe keeps products queued in the sink when the crawl dies
+    with FixtureServer(catalogue) as server, StubFrappeServer(latency=0.2) as frappe:
+        killed = crawl(server, frappe, tmp_path, kill_after=40)
+        assert killed.returncode == 1, killed.stderr.decode()[-2000:]
+        assert len(frappe.docs) < len(expected)
+        first_category = f"{server.base_url}/shop/category/{next(iter(catalogue.categories))}?pg=1"
+        store = CheckpointStore(str(tmp_path / 'checkpoint.sqlite'))
+        # Pages 1 and 2 were listed but their products were still queued
+        assert store.resume_url(first_category) == first_category
+        assert not store.is_done(first_category)
+        store.close()
+
+        resumed = crawl(server, frappe, tmp_path)
+        assert resumed.returncode == 0, resumed.stderr.decode()[-2000:]
+
+        written = sorted(doc['product_id'] for doc in frappe.docs.values())
+        assert written == expected  # every product, each created once
+
+    # The resumed crawl appended to the killed crawl's file instead of starting its own
+    assert not (tmp_path / 'products-0.ndjson').exists()
+    streamed = {product['product_id'] for product in iter_products(str(tmp_path / 'products-40.ndjson'))}
+    assert sorted(streamed) == expected
+
+    with sqlite3.connect(str(tmp_path / 'checkpoint.sqlite')) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM categories').fetchone()[0] == 0
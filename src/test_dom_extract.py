@@ -0,0 +1,52 @@
+import asyncio
+
+from playwright.async_api import async_playwright
+
+from dom_extract import TILE_SELECTOR, extract_listing_tiles, extract_product_page
+from fixture_scraper import fixture_config, legacy_extract_product_data
+from fixture_server import FixtureCatalogue, FixtureServer
+from scraper import PaknSaveScraper
+
+
+def without_timestamps(product):
+    return {key: value for key, value in product.items() if key not in ('lastChecked', 'lastUpdated')}
+
+
+def test_bulk_extraction_matches_per_element_reads(chromium):
+    catalogue = FixtureCatalogue(categories=1, pages=1, products_per_page=30)
+
+    async def run(server):
+        scraper = PaknSaveScraper(fixture_config(server))
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            try:
+                page = await browser.new_page()
+                await page.goto(f"{server.base_url}/shop/category/{next(iter(catalogue.categories))}?pg=1")
+
+                legacy = []
+                for element in await page.query_selector_all(TILE_SELECTOR):
+                    product = await legacy_extract_product_data(element)
+                    link = await element.query_selector('a[href]')
+                    legacy.append((product, await link.get_attribute('href')))
+
+                tiles = await extract_listing_tiles(page)
+                bulk = [(without_timestamps(scraper.tile_to_product(tile).to_dict()), tile['href']) for tile in tiles]
+                assert len(bulk) == 30
+                assert bulk == legacy
+
+                number = next(iter(catalogue.products))
+                await page.goto(f"{server.base_url}/shop/product/{number}_ea_000pns")
+                raw = await extract_product_page(page)
+                assert raw['name'] == await page.inner_text('[data-testid="product-title"]')
+                assert raw['breadcrumbs'] == catalogue.products[number]['breadcrumbs']
+                assert raw['nutrition'] == [
+                    [await cell.inner_text() for cell in await row.query_selector_all('td')]
+                    for row in await page.query_selector_all('table.fs-nutritional-info tr')
+                ]
+                assert raw['dollars'] == await page.inner_text('p[data-testid="price-dollars"]')
+                assert raw['cents'] == await page.inner_text('p[data-testid="price-cents"]')
+            finally:
+                await browser.close()
+
+    with FixtureServer(catalogue) as server:
+        asyncio.run(run(server))
@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+import pytest
+import requests
+
+from fixture_server import StubFrappeServer
+from frappe_client import AsyncFrappeClient, FrappeClient
+
+# The stub answers after 0.5s; the clients give up reading after 0.1s
+LATENCY = 0.5
+READ_TIMEOUT = 0.1
+RETRIES = 3
+
+
+def wait_for_stub():
+    """Let the stub finish handling requests the client already gave up on."""
+    time.sleep(LATENCY * 2)
+
+
+def test_timed_out_post_is_sent_once():
+    with StubFrappeServer(latency=LATENCY) as frappe:
+        client = FrappeClient(retries=RETRIES, backoff_factor=0, backoff_jitter=0, timeout=(1, READ_TIMEOUT))
+        with pytest.raises(requests.exceptions.RequestException):
+            client.post(frappe.resource_url, json={'product_id': 'pk1'})
+        wait_for_stub()
+        assert frappe.hits.get('POST') == 1
+        assert len(frappe.docs) == 1
+
+
+def test_timed_out_get_is_retried():
+    with StubFrappeServer(latency=LATENCY) as frappe:
+        client = FrappeClient(retries=RETRIES, backoff_factor=0, backoff_jitter=0, timeout=(1, READ_TIMEOUT))
+        with pytest.raises(requests.exceptions.RequestException):
+            client.get(frappe.resource_url, params={'product_id': 'pk1'})
+        wait_for_stub()
+        assert frappe.hits.get('GET') == RETRIES + 1
+
+
+def async_request(frappe: StubFrappeServer, method: str, **kwargs):
+    async def run():
+        client = AsyncFrappeClient(retries=RETRIES, backoff_factor=0, backoff_jitter=0, timeout=READ_TIMEOUT)
+        try:
+            return await client.request(method, frappe.resource_url, **kwargs)
+        finally:
+            await client.close()
+
+    return asyncio.run(run())
+
+
+def test_async_timed_out_post_is_sent_once():
+    with StubFrappeServer(latency=LATENCY) as frappe:
+        with pytest.raises(asyncio.TimeoutError):
+            async_request(frappe, 'POST', json={'product_id': 'pk1'})
+        wait_for_stub()
+        assert frappe.hits.get('POST') == 1
+        assert len(frappe.docs) == 1
+
+
+def test_async_timed_out_get_is_retried():
+    with StubFrappeServer(latency=LATENCY) as frappe:
+        with pytest.raises(asyncio.TimeoutError):
+            async_request(frappe, 'GET', params={'product_id': 'pk1'})
+        wait_for_stub()
+        assert frappe.hits.get('GET') == RETRIES + 1
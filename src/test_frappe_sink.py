@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+import frappe_api
+from change_store import ChangeStore
+from fixture_server import StubFrappeServer
+from frappe_client import AsyncFrappeClient
+from frappe_sink import FrappeSink
+
+
+def products(count: int):
+    return [{'product_id': f"pk{number}", 'productname': f"Product {number}", 'current_price': 1.0}
+            for number in range(count)]
+
+
+def run_sink(frappe: StubFrappeServer, count: int, workers: int, queue_size: int):
+    """Queue `count` products through an async-writer sink; return (seconds spent in put, sink, written)."""
+
+    async def run():
+        client = AsyncFrappeClient(pool_size=workers)
+        written = []
+
+        async def write(product):
+            await frappe_api.write_to_frappe_async(client, product)
+
+        sink = FrappeSink(writer=write, workers=workers, queue_size=queue_size, on_written=written.extend)
+        try:
+            started = time.perf_counter()
+            for product in products(count):
+                await sink.put(product)
+            put_time = time.perf_counter() - started
+            await sink.close()
+        finally:
+            await client.close()
+        return put_time, sink, written
+
+    return asyncio.run(run())
+
+
+def test_every_product_reaches_a_slow_frappe(monkeypatch):
+    with StubFrappeServer(latency=0.02) as frappe:
+        monkeypatch.setattr(frappe_api, 'FRAPPE_URL', frappe.resource_url)
+        _, sink, written = run_sink(frappe, 40, workers=4, queue_size=10)
+        assert sink.written == 40 and sink.failed == 0
+        assert sorted(doc['product_id'] for doc in frappe.docs.values()) == sorted(p['product_id'] for p in products(40))
+        assert len(written) == 40
+
+
+def test_scraping_does_not_wait_for_frappe(monkeypatch):
+    # 20 products at 2 requests each and 0.1s per request: writing takes a second or more
+    with StubFrappeServer(latency=0.1) as frappe:
+        monkeypatch.setattr(frappe_api, 'FRAPPE_URL', frappe.resource_url)
+        put_time, sink, _ = run_sink(frappe, 20, workers=4, queue_size=100)
+        assert put_time < 0.1
+        assert sink.written == 20
+
+
+def test_a_full_queue_slows_the_scraper_down(monkeypatch):
+    with StubFrappeServer(latency=0.05) as frappe:
+        monkeypatch.setattr(frappe_api, 'FRAPPE_URL', frappe.resource_url)
+        # One writer, one queue slot: every put past the second waits for a write (two requests)
+        put_time, sink, _ = run_sink(frappe, 6, workers=1, queue_size=1)
+        assert put_time >= 0.3
+        assert sink.written == 6
+
+
+def test_failed_write_is_not_recorded_as_written(monkeypatch, tmp_path):
+    store = ChangeStore(str(tmp_path / 'hashes.sqlite'))
+    product = products(1)[0]
+    with StubFrappeServer() as frappe:
+        # Not the Product Item resource: the existence check finds nothing and the create gets a 404
+        monkeypatch.setattr(frappe_api, 'FRAPPE_URL', f"{frappe.base_url}/api/resource/Missing")
+
+        async def run():
+            sink = FrappeSink(writer=frappe_api.test_write_to_frappe, workers=1, on_written=store.record)
+            await sink.put(product)
+            await sink.close()
+            return sink
+
+        sink = asyncio.run(run())
+    assert sink.written == 0 and sink.failed == 1
+    assert not store.is_unchanged(product)
+    store.close()
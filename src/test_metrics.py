@@ -0,0 +1,44 @@
+import json
+import threading
+
+from metrics import Metrics
+
+
+def test_summary_while_the_loop_adds_stages():
+    metrics = Metrics()
+    errors, done = [], threading.Event()
+
+    def scrape():
+        while not done.is_set():
+            try:
+                metrics.summary()
+                metrics.prometheus_text()
+            except RuntimeError as e:
+                errors.append(e)
+
+    reader = threading.Thread(target=scrape)
+    reader.start()
+    try:
+        for number in range(100000):
+            metrics.observe(f"stage_{number}", 0.01)
+            metrics.inc(f"counter_{number}")
+    finally:
+        done.set()
+        reader.join()
+    assert not errors
+
+
+def test_saved_summary_is_standard_json(tmp_path):
+    metrics = Metrics()
+    metrics.observe('navigate', 0.2)
+    metrics.observe('navigate', 600.0)  # past the largest bucket
+    path = str(tmp_path / 'metrics.json')
+    metrics.save(path)
+
+    def reject(constant):
+        raise ValueError(f"non-standard JSON constant {constant}")
+
+    with open(path, 'r', encoding='utf-8') as f:
+        stages = json.load(f, parse_constant=reject)['stages']
+    assert stages['navigate']['p50_le_s'] == 0.25
+    assert stages['navigate']['p95_le_s'] is None
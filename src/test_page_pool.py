@@ -0,0 +1,126 @@
+import asyncio
+import time
+
+from playwright.async_api import async_playwright
+
+from fixture_server import FixtureCatalogue, FixtureServer
+from scraper import PagePool, PaknSaveScraper, ScraperConfig
+
+
+class FakePage:
+    async def close(self):
+        pass
+
+
+class FakeScraper:
+    """Just what PagePool uses: global page slots and a slow new_page."""
+
+    def __init__(self, slots: int, failures: int = 0):
+        self.page_slots = asyncio.Semaphore(slots)
+        self.failures = failures
+        self.opened = 0
+
+    async def new_page(self):
+        await asyncio.sleep(0.01)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("browser refused to open a page")
+        self.opened += 1
+        return FakePage()
+
+
+async def borrow_all(pool: PagePool, borrowers: int):
+    in_use, peak = [0], [0]
+
+    async def borrow():
+        async with pool.page():
+            in_use[0] += 1
+            peak[0] = max(peak[0], in_use[0])
+            await asyncio.sleep(0.01)
+            in_use[0] -= 1
+
+    results = await asyncio.gather(*(borrow() for _ in range(borrowers)), return_exceptions=True)
+    return results, peak[0]
+
+
+def test_concurrent_borrowers_never_open_more_than_the_pool_size():
+    async def run():
+        scraper = FakeScraper(slots=8)
+        pool = PagePool(scraper, size=4)
+        results, peak = await borrow_all(pool, 50)
+        assert not [result for result in results if result is not None]
+        assert scraper.opened == 4
+        assert len(pool.pages) == 4
+        assert peak <= 4
+
+    asyncio.run(run())
+
+
+def test_a_failed_page_open_frees_its_slot():
+    async def run():
+        scraper = FakeScraper(slots=8, failures=1)
+        pool = PagePool(scraper, size=1)
+        results, _ = await borrow_all(pool, 5)
+        # The first borrower sees the error; the others still get the one page
+        assert sum(isinstance(result, RuntimeError) for result in results) == 1
+        assert results.count(None) == 4
+        assert scraper.opened == 1
+
+    asyncio.run(run())
+
+
+def test_categories_together_use_every_global_slot():
+    async def run():
+        # 3 categories of 4 pages share 8 global slots, like the default config
+        scraper = FakeScraper(slots=8)
+        pools = [PagePool(scraper, size=4) for _ in range(3)]
+        in_use, peak = [0], [0]
+
+        async def borrow(pool):
+            async with pool.page():
+                in_use[0] += 1
+                peak[0] = max(peak[0], in_use[0])
+                await asyncio.sleep(0.05)
+                in_use[0] -= 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(borrow(pool) for pool in pools for _ in range(50)))
+        elapsed = time.perf_counter() - started
+        assert peak[0] == 8
+        # 150 borrows of 50 ms take 0.94 s with all 8 slots busy and twice that with 4
+        assert elapsed < 1.4
+
+    asyncio.run(run())
+
+
+def test_pool_against_fixture_server(chromium):
+    catalogue = FixtureCatalogue(categories=1, pages=1, products_per_page=50)
+
+    async def run(server):
+        config = ScraperConfig(base_url=server.base_url, proxy_list=[], pages_per_category=4, max_concurrent_pages=8,
+                               checkpoint_path=None, skip_unchanged=False, metrics_path=None, headless=True)
+        scraper = PaknSaveScraper(config)
+        pool = PagePool(scraper, config.pages_per_category)
+        in_use, peak, titles = [0], [0], []
+
+        async def fetch(number):
+            async with pool.page() as page:
+                in_use[0] += 1
+                peak[0] = max(peak[0], in_use[0])
+                await page.goto(f"{server.base_url}/shop/product/{number}_ea_000pns")
+                titles.append(await page.title())
+                in_use[0] -= 1
+
+        async with async_playwright() as p:
+            scraper.browser = await p.chromium.launch(headless=True)
+            try:
+                await asyncio.gather(*(fetch(number) for number in catalogue.products))
+                assert len(pool.pages) == 4
+                assert peak[0] <= 4
+                assert sorted(titles) == sorted(product['name'] for product in catalogue.products.values())
+            finally:
+                await pool.close()
+                await scraper.browser.close()
+
+    with FixtureServer(catalogue, latency=0.02) as server:
+        asyncio.run(run(server))
@@ -0,0 +1,72 @@
+import json
+import os
+
+import pytest
+
+from fixture_models import HashingEncoder, fixture_words
+from product_categoriser import ProductClassifier
+from product_stream import NDJSONWriter, iter_products
+
+WORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'unmatched_keywords.txt')
+
+
+class RecordingEncoder(HashingEncoder):
+    """Remembers every word it was asked to encode."""
+
+    def __init__(self):
+        super().__init__()
+        self.encoded = []
+
+    def encode(self, sentences, **kwargs):
+        self.encoded.extend([sentences] if isinstance(sentences, str) else sentences)
+        return super().encode(sentences, **kwargs)
+
+
+def classifier(encoder=None, **kwargs) -> ProductClassifier:
+    return ProductClassifier(model_name='hashing-stub', model=encoder or HashingEncoder(), **kwargs)
+
+
+@pytest.fixture
+def products_file(tmp_path, monkeypatch):
+    # classify_products writes its unmatched analysis to the working directory
+    monkeypatch.chdir(tmp_path)
+    words = fixture_words(WORDS_PATH)
+    keywords = ['milk', 'cheddar', 'bananas', 'chees', 'buttr']
+    path = str(tmp_path / 'products.ndjson')
+    with NDJSONWriter(path, append=False) as writer:
+        for number in range(300):
+            word = keywords[number % len(keywords)] if number % 3 == 0 else words[number % len(words)]
+            writer.write({'productId': str(number), 'name': f"Fixture {words[(number * 7 + 3) % len(words)]} {word}"})
+    return path
+
+
+def classified(path):
+    return [json.dumps(product, sort_keys=True) for product in iter_products(path)]
+
+
+def test_batched_classification_matches_word_at_a_time(products_file, tmp_path):
+    output = str(tmp_path / 'batched.ndjson')
+    classifier(cache_dir=None).classify_products(products_file, output)
+
+    one_at_a_time = classifier(cache_dir=None, memo_size=0)
+    expected = [json.dumps(one_at_a_time.classify_product(product), sort_keys=True)
+                for product in iter_products(products_file)]
+    assert classified(output) == expected
+
+
+def test_parallel_classification_matches_serial(products_file, tmp_path):
+    outputs = {}
+    for workers in (1, 2):
+        outputs[workers] = str(tmp_path / f"classified-{workers}.ndjson")
+        classifier(cache_dir=str(tmp_path / 'cache')).classify_products(products_file, outputs[workers],
+                                                                        workers=workers, chunk_size=40)
+    assert classified(outputs[2]) == classified(outputs[1])
+
+
+def test_only_unresolved_words_are_encoded():
+    encoder = RecordingEncoder()
+    model = classifier(encoder, cache_dir=None)
+    encoder.encoded = []  # forget the keyword table
+    model.prepare_words(['milk', 'cheeses', 'chees', 'buttr', 'qwrtp', 'qwrtp', 'zzzq'])
+    assert encoder.encoded == ['qwrtp', 'zzzq']
+    assert model.find_category('chees')[3] == 'fuzzy'
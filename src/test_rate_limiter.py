@@ -0,0 +1,110 @@
+import asyncio
+import time
+from collections import deque
+
+import pytest
+
+from fixture_server import ThrottledHost
+from rate_limiter import AdaptiveRateLimiter
+from scraper import ScraperConfig
+
+URL = 'https://www.paknsave.co.nz/shop/product/1'
+
+
+def limiter(**kwargs) -> AdaptiveRateLimiter:
+    # Fast rates keep every interval a few milliseconds
+    return AdaptiveRateLimiter(100.0, max_rate=400.0, increase=25.0, **kwargs)
+
+
+async def clean_responses(limiter: AdaptiveRateLimiter, count: int):
+    rates = []
+    for _ in range(count):
+        await asyncio.sleep(0.05)
+        limiter.record(URL, 0.01)
+        rates.append(limiter.rate(URL))
+    return rates
+
+
+def test_responses_arriving_together_grow_the_rate_once():
+    async def run():
+        adaptive = limiter()
+        for _ in range(8):
+            adaptive.record(URL, 0.01)
+        return adaptive.rate(URL)
+
+    assert asyncio.run(run()) == 125.0
+
+
+def test_growth_stops_below_the_rate_that_was_throttled():
+    async def run():
+        adaptive = limiter()
+        adaptive.record(URL, 0.01, ok=False, throttled=True)
+        return await clean_responses(adaptive, 10)
+
+    rates = asyncio.run(run())
+    assert rates[0] == 75.0
+    assert max(rates) == rates[-1] == pytest.approx(90.0)
+
+
+def test_throttling_cap_expires():
+    async def run():
+        adaptive = limiter(ceiling_seconds=0.3)
+        adaptive.record(URL, 0.01, ok=False, throttled=True)
+        return await clean_responses(adaptive, 20)
+
+    rates = asyncio.run(run())
+    assert max(rates[:4]) <= 90.0
+    assert rates[-1] > 200.0
+
+
+def test_errors_and_slow_pages_do_not_cap_the_rate():
+    async def run():
+        adaptive = limiter()
+        adaptive.record(URL, 0.01, ok=False)  # a navigation error
+        await asyncio.sleep(0.05)
+        adaptive.record(URL, 6.0)  # a page slower than slow_seconds
+        assert adaptive.rate(URL) < 100.0
+        return await clean_responses(adaptive, 20)
+
+    assert asyncio.run(run())[-1] == 400.0
+
+
+def test_queueing_host_backs_the_rate_off():
+    async def run():
+        adaptive = limiter(queue_seconds=0.5)
+        adaptive.record(URL, 0.1)
+        await asyncio.sleep(0.05)
+        adaptive.record(URL, 0.8)  # 0.7s slower than the fastest response
+        return adaptive
+
+    adaptive = asyncio.run(run())
+    assert adaptive.rate(URL) == 62.5
+    assert not adaptive.ceilings
+
+
+def test_default_limiter_stays_under_a_throttling_host():
+    # 1 real second is 50 simulated ones; the host serves 4 requests per simulated second
+    scale = 0.02
+
+    async def run():
+        host = ThrottledHost(4.0, 0.3, scale)
+        adaptive = AdaptiveRateLimiter(ScraperConfig.host_requests_per_second / scale, min_rate=0.2 / scale,
+                                       max_rate=ScraperConfig.max_requests_per_second / scale, increase=0.25 / scale,
+                                       slow_seconds=ScraperConfig.slow_response_seconds * scale,
+                                       queue_seconds=ScraperConfig.queue_delay_seconds * scale)
+        urls = deque(range(150))
+
+        async def worker():
+            while urls:
+                urls.popleft()
+                await adaptive.acquire(URL)
+                started = time.perf_counter()
+                status = await host.get()
+                adaptive.record(URL, time.perf_counter() - started, ok=status == 200, throttled=status == 429)
+
+        await asyncio.gather(*(worker() for _ in range(8)))
+        return host
+
+    host = asyncio.run(run())
+    assert host.served == 150
+    assert host.throttled == 0
@@ -0,0 +1,46 @@
+import asyncio
+from fnmatch import fnmatchcase
+
+from playwright.async_api import async_playwright
+
+from fixture_scraper import fixture_config
+from fixture_server import FixtureCatalogue, FixtureServer
+from resource_blocking import blocked_url_patterns
+from scraper import PaknSaveScraper
+
+
+def blocked(patterns, url):
+    return any(fnmatchcase(url, pattern) for pattern in patterns)
+
+
+def test_patterns_cover_types_and_trackers_only():
+    patterns = blocked_url_patterns(['image', 'font'], ['googletagmanager.com'])
+    assert blocked(patterns, 'https://a.fsimg.co.nz/product/retail/fan/image/400x400/5201479.png')
+    assert blocked(patterns, 'https://www.paknsave.co.nz/fonts/brand.woff2?v=3')
+    assert blocked(patterns, 'https://www.googletagmanager.com/gtm.js?id=GTM-1')
+    assert not blocked(patterns, 'https://www.paknsave.co.nz/_next/static/chunks/main.js')
+    assert not blocked(patterns, 'https://www.paknsave.co.nz/shop/product/5201479_ea_000pns')
+
+
+def test_blocking_keeps_the_http_cache(chromium):
+    catalogue = FixtureCatalogue(categories=1, pages=1, products_per_page=5)
+
+    async def run(server):
+        scraper = PaknSaveScraper(fixture_config(server))
+        async with async_playwright() as p:
+            scraper.browser = await p.chromium.launch(headless=True)
+            try:
+                page = await scraper.new_page()
+                for number in catalogue.products:
+                    await page.goto(f"{server.base_url}/shop/product/{number}_ea_000pns", wait_until='load')
+            finally:
+                await scraper.browser.close()
+        return scraper.metrics.counters
+
+    with FixtureServer(catalogue, image_bytes=1024, script_bytes=4096) as server:
+        counters = asyncio.run(run(server))
+        assert 'image' not in server.hits
+        assert server.hits['static'] == 2  # the script and stylesheet, once each
+    assert counters['blocked_image'] == len(catalogue.products)
+    assert counters['cached_requests'] >= 2 * (len(catalogue.products) - 1)
+    assert counters['transferred_bytes'] > 2 * 4096
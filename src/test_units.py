@@ -0,0 +1,31 @@
+import pytest
+
+from units import extract_unit_info
+
+# (name, subtitle, price) -> (size, unit_name, quantity, pack_count, unit_price)
+CASES = [
+    (('Pams Standard Milk', '2L', 3.99), ('2l', 'l', 2.0, 1, 2.0)),
+    (('Beef Mince', '500g', 8.99), ('500g', 'kg', 0.5, 1, 17.98)),
+    (('Coke Zero', '6 x 330ml', 9.5), ('6x330ml', 'l', 1.98, 6, 4.8)),
+    (('Coke Zero', '330ml x 6', 9.5), ('6x330ml', 'l', 1.98, 6, 4.8)),
+    (('Free Range Eggs', '12pk', 7.49), ('12ea', 'ea', 12.0, 12, 0.62)),
+    (('Greek Yoghurt Pottles', '6 pack', 5.0), ('6ea', 'ea', 6.0, 6, 0.83)),
+    (('Bananas', 'kg', 3.49), ('', 'kg', 1.0, 1, 3.49)),
+    (('Gift Card', '', 20.0), ('', 'ea', 1.0, 1, 20.0)),
+    (('Whittakers Creamy Milk Chocolate 250g', '', 5.0), ('250g', 'kg', 0.25, 1, 20.0)),
+    (('Pams Standard Milk 1L', '2L', 3.99), ('2l', 'l', 2.0, 1, 2.0)),
+    (('Sealord Tuna 95g 3pk', '', 4.5), ('3x95g', 'kg', 0.285, 3, 15.79)),
+    (('Sealord Tuna', '3pk 95g', 4.5), ('3x95g', 'kg', 0.285, 3, 15.79)),
+    (('Sealord Tuna', '95g', None), ('95g', 'kg', 0.095, 1, None)),
+]
+
+
+@pytest.mark.parametrize('product, expected', CASES, ids=[f"{name} | {subtitle}" for (name, subtitle, _), _ in CASES])
+def test_extract_unit_info(product, expected):
+    info = extract_unit_info(*product)
+    size, unit_name, quantity, pack_count, unit_price = expected
+    assert info['size'] == size
+    assert info['unit_name'] == unit_name
+    assert info['quantity'] == pytest.approx(quantity)
+    assert info['pack_count'] == pack_count
+    assert info['unit_price'] == unit_price
@@ -0,0 +1,100 @@
+import re
+from typing import Dict, Optional, Tuple
+
+# Every spelling we accept, mapped to its canonical unit
+UNIT_ALIASES = {
+    'kg': 'kg', 'kgs': 'kg', 'kilo': 'kg', 'kilos': 'kg', 'kilogram': 'kg', 'kilograms': 'kg',
+    'g': 'g', 'gm': 'g', 'gms': 'g', 'gr': 'g', 'gram': 'g', 'grams': 'g',
+    'l': 'l', 'lt': 'l', 'ltr': 'l', 'litre': 'l', 'litres': 'l', 'liter': 'l', 'liters': 'l',
+    'ml': 'ml', 'mls': 'ml', 'millilitre': 'ml', 'millilitres': 'ml', 'milliliter': 'ml', 'milliliters': 'ml',
+    'ea': 'ea', 'each': 'ea', 'unit': 'ea', 'units': 'ea', 'pk': 'ea', 'pack': 'ea', 'packs': 'ea',
+    'pc': 'ea', 'pcs': 'ea', 'piece': 'ea', 'pieces': 'ea',
+}
+
+# Canonical unit -> (unit the unit price is quoted in, how many of those one canonical unit is)
+BASE_UNITS = {
+    'kg': ('kg', 1.0),
+    'g': ('kg', 0.001),
+    'l': ('l', 1.0),
+    'ml': ('l', 0.001),
+    'ea': ('ea', 1.0),
+}
+
+# "500g", "1.5 L", "6 x 330ml", "330ml x 6", "12pk". Units are any run of letters, looked up in UNIT_ALIASES.
+SIZE_PATTERN = re.compile(
+    r'(?:\b(\d+)\s*[x×*]\s*)?(\d+(?:\.\d+)?)\s*([a-z]+)(?:\s*[x×*]\s*(\d+)\b)?'
+)
+
+
+def _number(value: str) -> str:
+    """'1.50' -> '1.5', '2.0' -> '2', for building size strings."""
+    return value.rstrip('0').rstrip('.') if '.' in value else value
+
+
+def _last_size(text: str) -> Optional[Tuple[int, str, str]]:
+    """(pack count, size value, canonical unit) of the last size in `text`, or None.
+
+    A pack count next to a weight or volume ("95g 3pk", "3pk 95g") is that many
+    packs of it, like "3 x 95g".
+    """
+    sizes = [(match, UNIT_ALIASES[match.group(3)]) for match in SIZE_PATTERN.finditer(text.lower())
+             if match.group(3) in UNIT_ALIASES]
+    if not sizes:
+        return None
+    match, unit = sizes[-1]
+    if len(sizes) > 1:
+        previous, previous_unit = sizes[-2]
+        if 'ea' in (unit, previous_unit) and unit != previous_unit and not text[previous.end():match.start()].strip():
+            pack, measure, measure_unit = (match, previous, previous_unit) if unit == 'ea' else (previous, match, unit)
+            if not any(m.group(1) or m.group(4) for m in (pack, measure)):
+                return int(float(pack.group(2))), measure.group(2), measure_unit
+    return int(match.group(1) or match.group(4) or 1), match.group(2), unit
+
+
+def extract_unit_info(name: str, subtitle: str, current_price: Optional[float] = None) -> Dict:
+    """Parse the pack size out of a product name and subtitle.
+
+    The last size found wins, so a subtitle ("6 x 330ml") overrides a size in the
+    name; a bare unit subtitle ("kg") means the price is for one of that unit.
+    Returns size (e.g. '6x330ml'), unit_name (the unit the price is quoted per:
+    kg, l or ea), quantity (the pack's size in that unit), pack_count and
+    unit_price (current_price / quantity, or None without a price).
+    """
+    unit_info = {
+        'size': '',
+        'unit_name': 'ea',
+        'quantity': 1.0,
+        'pack_count': 1,
+        'unit_price': None
+    }
+
+    # The subtitle comes last, so only scan the (longer) name when the subtitle has no size
+    found = _last_size(subtitle) or _last_size(name)
+    if found:
+        count, value, unit = found
+    else:
+        # Loose produce has just "kg" (or "ea") as its subtitle: the price is for one unit
+        unit = UNIT_ALIASES.get(subtitle.strip().lower())
+        count, value = 1, ''
+
+    if unit:
+        base_unit, factor = BASE_UNITS[unit]
+        quantity = float(value or 1)
+        if value:
+            size = f"{_number(value)}{unit}"
+            unit_info['size'] = f"{count}x{size}" if count > 1 else size
+        unit_info['unit_name'] = base_unit
+        unit_info['quantity'] = count * quantity * factor
+        unit_info['pack_count'] = count if unit != 'ea' else int(count * quantity)
+
+    if current_price and unit_info['quantity'] > 0:
+        unit_info['unit_price'] = round(current_price / unit_info['quantity'], 2)
+
+    return unit_info
+
+
+if __name__ == "__main__":
+    for title, subtitle, price in [('Pams Milk', '2L', 3.99), ('Coke Zero', '6 x 330ml', 9.5),
+                                   ('Beef Mince', '500g', 8.99), ('Free Range Eggs', '12pk', 7.49),
+                                   ('Bananas', 'kg', 3.49)]:
+        print(title, subtitle, extract_unit_info(title, subtitle, price))
@@ -0,0 +1,78 @@
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+
+class WordMemo:
+    """A bounded LRU map of word -> find_category result, with hit/miss counters.
+
+    With a `path` it is loaded at start and saved as JSON, but only reused when
+    `key` matches. The key should capture everything the results depend on
+    (model, keyword table, threshold).
+    """
+
+    def __init__(self, max_size: int = 100000, path: Optional[str] = None, key: str = ''):
+        self.max_size = max_size
+        self.path = path
+        self.key = key
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.entries
+
+    def get(self, word: str) -> Optional[Tuple]:
+        result = self.entries.get(word)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(word)
+        return result
+
+    def put(self, word: str, result: Tuple):
+        if self.max_size <= 0:
+            return
+        self.entries[word] = result
+        self.entries.move_to_end(word)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not read word memo {self.path}: {e}")
+            return
+        if saved.get('key') != self.key:
+            logging.info(f"Word memo {self.path} was built with different settings, starting empty")
+            return
+        for word, result in saved.get('entries', []):
+            self.put(word, tuple(result))
+        logging.info(f"Loaded {len(self.entries)} memoised words from {self.path}")
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            # Least recently used first, so loading restores the same LRU order
+            json.dump({'key': self.key, 'entries': list(self.entries.items())}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def summary(self) -> str:
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups * 100 if lookups else 0.0
+        return f"{self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate), {len(self.entries)} words memoised"